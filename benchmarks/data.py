@@ -0,0 +1,121 @@
+"""Детерминированные синтетические данные для бенчмарков.
+
+Одинаковые kind, count и seed всегда дают одни и те же записи, поэтому
+результаты разных запусков и разных версий кода можно сравнивать.
+"""
+import csv
+import random
+from decimal import Decimal
+
+PRIORITIES = ["Высокий", "Средний", "Низкий"]
+CATEGORIES = ["Продукты", "Транспорт", "Жильё", "Зарплата", "Развлечения", "Здоровье"]
+KINDS = ("notes", "tasks", "contacts", "finance")
+
+
+def random_date(rng):
+    return f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{rng.randint(2020, 2024)}"
+
+
+def make_row(kind, record_id, rng):
+    if kind == "notes":
+        return {
+            "id": record_id,
+            "title": f"Заметка {record_id}",
+            "content": f"Текст заметки {rng.random()}",
+            "timestamp": f"{random_date(rng)} {rng.randint(0, 23):02d}:00:00",
+        }
+    if kind == "tasks":
+        return {
+            "id": record_id,
+            "title": f"Задача {record_id}",
+            "description": f"Описание {rng.random()}",
+            "done": rng.random() < 0.3,
+            "priority": rng.choice(PRIORITIES),
+            "due_date": random_date(rng),
+        }
+    if kind == "contacts":
+        return {
+            "id": record_id,
+            "name": f"Контакт {record_id}",
+            "phone": f"8{rng.randint(10 ** 9, 10 ** 10 - 1)}",
+            "email": f"user{record_id}@example.com",
+        }
+    return {
+        "id": record_id,
+        "amount_minor": round(rng.uniform(-5000, 5000) * 100),
+        "currency": None,
+        "category": rng.choice(CATEGORIES),
+        "date": random_date(rng),
+        "description": f"Операция {record_id}",
+    }
+
+
+def iter_rows(kind, count, seed=42, start_id=1):
+    rng = random.Random(seed)
+    for record_id in range(start_id, start_id + count):
+        yield make_row(kind, record_id, rng)
+
+
+def make_rows(kind, count, seed=42):
+    return list(iter_rows(kind, count, seed))
+
+
+def csv_row(row):
+    """Строка CSV как в экспорте: сумма в основных единицах, а не в копейках."""
+    if "amount_minor" in row:
+        row = dict(row)
+        row["amount"] = str(Decimal(row.pop("amount_minor")).scaleb(-2))
+    return row
+
+
+def write_csv(kind, count, path, seed=42):
+    """CSV для import_from_csv: те же записи, но без id (id выдаёт менеджер)."""
+    rows = map(csv_row, iter_rows(kind, count, seed))
+    first = next(rows)
+    fieldnames = [field for field in first if field != "id"]
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerow(first)
+        writer.writerows(rows)
+
+
+def make_queries(kind, count, seed=7):
+    """Запросы для поиска и фильтрации, согласованные с make_rows."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        if kind == "contacts":
+            queries.append(rng.choice([
+                f"Контакт {rng.randint(1, 999)}",
+                f"8{rng.randint(100, 999)}",
+                f"user{rng.randint(1, 99)}@",
+            ]))
+        elif kind == "tasks":
+            queries.append({
+                "status": rng.choice([None, True, False]),
+                "priority": rng.choice([None] + PRIORITIES),
+                "due_date": rng.choice([None, random_date(rng)]),
+            })
+        elif kind == "finance":
+            year = rng.randint(2020, 2024)
+            start_month = rng.randint(1, 12)
+            end_month = rng.randint(start_month, 12)
+            queries.append((f"01-{start_month:02d}-{year}", f"28-{end_month:02d}-{year}"))
+    return queries
+
+
+def make_expressions(count, seed=11):
+    """Разные арифметические выражения, чтобы кэш калькулятора не скрывал разбор."""
+    rng = random.Random(seed)
+    operators = "+-*/"
+    expressions = []
+    for _ in range(count):
+        terms = [str(rng.randint(1, 1000)) for _ in range(rng.randint(2, 6))]
+        expression = terms[0]
+        for term in terms[1:]:
+            expression += f" {rng.choice(operators)} {term}"
+        if rng.random() < 0.3:
+            expression = f"({expression}) * {rng.randint(1, 9)}"
+        expressions.append(expression)
+    return expressions
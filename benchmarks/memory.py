@@ -0,0 +1,56 @@
+"""Замер памяти на одну запись для Note, Task, Contact и FinanceRecord.
+
+Запуск: python benchmarks/memory.py [число записей]
+
+Для каждого типа строится count записей из синтетических данных так же, как
+это делает загрузка хранилища (через from_dict), и с помощью tracemalloc
+измеряется занятая ими память. Для сравнения приводится стоимость тех же
+данных в виде обычных словарей, как их возвращает json.load.
+"""
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import make_rows  # noqa: E402
+from personal_assistant import Contact, FinanceRecord, Note, Task  # noqa: E402
+
+MODELS = {
+    "notes": Note,
+    "tasks": Task,
+    "contacts": Contact,
+    "finance": FinanceRecord,
+}
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def main(count=100_000):
+    print(f"Записей каждого типа: {count}")
+    print(f"{'Тип':<10} {'объекты, Б/зап.':>16} {'словари, Б/зап.':>16} {'экономия':>9}")
+    for kind, model in MODELS.items():
+        # Данные разбираются из JSON внутри замера, как при обычной загрузке,
+        # поэтому каждая строка — отдельный объект, если её не интернировать.
+        text = json.dumps(make_rows(kind, count))
+        # Первая запись подгружает модули, нужные from_dict (например, разбор дат),
+        # и их память не должна попасть в замер.
+        model.from_dict(json.loads(text)[0])
+        dict_bytes, _ = measure(lambda: json.loads(text))
+        object_bytes, _ = measure(lambda: [model.from_dict(row) for row in json.loads(text)])
+        print(
+            f"{kind:<10} {object_bytes / count:>16.1f} {dict_bytes / count:>16.1f} "
+            f"{dict_bytes / object_bytes:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,109 @@
+"""Время запуска: от старта интерпретатора до первого приглашения меню.
+
+Запуск: python benchmarks/startup.py [--records 100000] [--runs 5] [--budget 0.15]
+
+В пустом каталоге создаются большие хранилища (по records записей каждого
+типа), и в нём runs раз запускается python -m personal_assistant. Замеряется
+время до появления приглашения «Введите номер действия», после чего меню
+закрывается. Ещё один запуск с -X importtime показывает, какие модули
+импортируются при старте и сколько это стоит. Если медиана времени больше
+budget секунд или при старте загрузился модуль из HEAVY_MODULES, скрипт
+завершается с кодом 1.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data import iter_rows  # noqa: E402
+from personal_assistant.common import STORES  # noqa: E402
+from personal_assistant.storage import JsonStorage  # noqa: E402
+
+PROMPT = "Введите номер действия".encode()
+EXIT_CHOICE = b"7\n"
+# Модули, которые нужны только отдельным пунктам меню или командам.
+HEAVY_MODULES = ("numpy", "asyncio", "sqlite3", "concurrent.futures", "cProfile", "gzip")
+
+
+def write_stores(directory, records):
+    for store, (_, filename) in STORES.items():
+        storage = JsonStorage(os.path.join(directory, filename))
+        storage.save(list(iter_rows(store, records)))
+
+
+def time_to_prompt(directory, extra_args=()):
+    """Секунды до первого приглашения меню и stderr процесса."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, *extra_args, "-m", "personal_assistant"],
+        cwd=directory, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    output = b""
+    while PROMPT not in output:
+        chunk = os.read(process.stdout.fileno(), 4096)
+        if not chunk:
+            raise RuntimeError("меню завершилось, не показав приглашение:\n" + process.stderr.read().decode())
+        output += chunk
+    elapsed = time.perf_counter() - start
+    _, stderr = process.communicate(EXIT_CHOICE)
+    return elapsed, stderr.decode()
+
+
+def parse_importtime(stderr):
+    """[(модуль, собственное время, суммарное время в микросекундах)]."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if self_us.isdigit():
+            modules.append((name, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер времени запуска меню.")
+    parser.add_argument("--records", type=int, default=100_000, help="записей в каждом хранилище")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=0.15, help="допустимая медиана, секунд")
+    parser.add_argument("--top", type=int, default=10, help="сколько самых дорогих импортов показать")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pa-startup-") as directory:
+        write_stores(directory, args.records)
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"Хранилища: {args.records} записей каждого типа, {size / (1024 * 1024):.1f} МиБ")
+        timings = [time_to_prompt(directory)[0] for _ in range(args.runs)]
+        _, stderr = time_to_prompt(directory, ["-X", "importtime"])
+
+    median = statistics.median(timings)
+    print(f"До первого приглашения: медиана {median * 1000:.1f} мс, лучший {min(timings) * 1000:.1f} мс (бюджет {args.budget * 1000:.0f} мс)")
+    modules = parse_importtime(stderr)
+    package = [module for module in modules if module[0].strip() == "personal_assistant"]
+    if package:
+        print(f"Импорт пакета: {package[0][2] / 1000:.1f} мс")
+    print(f"Самые дорогие импорты (всего модулей: {len(modules)}):")
+    for name, _, cumulative in sorted(modules, key=lambda module: -module[2])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} мс  {name.strip()}")
+
+    loaded = {name.strip() for name, _, _ in modules}
+    heavy = [name for name in HEAVY_MODULES if name in loaded]
+    failed = False
+    if heavy:
+        print(f"При запуске загружены лишние модули: {', '.join(heavy)}")
+        failed = True
+    if median > args.budget:
+        print("Бюджет времени запуска превышен.")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,355 @@
+"""Бенчмарки горячих путей менеджеров и калькулятора.
+
+Запуск:
+    python benchmarks/suite.py [--sizes 1k,100k,1m] [--only load,find_contacts]
+                               [--storage json] [--repeat 3] [--no-allocations]
+                               [--save-baseline FILE] [--baseline FILE] [--threshold 0.25]
+
+Сценарии (для каждого размера хранилища):
+    <store>.load        — создание менеджера: чтение хранилища и построение индексов
+    <store>.save        — полная запись хранилища (save_*) и flush
+    <store>.create      — CREATE_COUNT вызовов create_*/add_* в заполненное хранилище
+    <store>.import_csv  — import_from_csv файла из size строк в пустое хранилище
+    <store>.export_csv  — export_to_csv всего хранилища
+    contacts.find_contacts, tasks.filter_tasks, finance.generate_report,
+    finance.group_by_category — QUERY_COUNT запросов к заполненному хранилищу
+    calculator.calculate — size разных выражений через Calculator.calculate
+
+Каждый сценарий выполняется в отдельном процессе, чтобы пиковый RSS
+(ru_maxrss) относился только к нему. Время — лучшее из --repeat повторов,
+каждый на свежей копии данных. Затем, если не указан --no-allocations,
+сценарий повторяется под tracemalloc: alloc_peak — пик выделенной за время
+операции памяти, alloc_retained — сколько осталось занятым после неё.
+Данные строятся генераторами из data.py один раз на размер и копируются
+для каждого повтора.
+
+--save-baseline сохраняет результаты в JSON; --baseline сравнивает с ранее
+сохранёнными и завершается с кодом 1, если какая-то метрика выросла больше
+чем на threshold (и больше порога шума).
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import iter_rows, make_expressions, make_queries, write_csv  # noqa: E402
+import personal_assistant as pa  # noqa: E402
+
+CREATE_COUNT = 1000
+QUERY_COUNT = 1000
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SIZES = "1k,100k"
+METRICS = ("seconds", "peak_rss", "alloc_peak", "alloc_retained")
+# Изменения меньше этих порогов считаются шумом и не считаются регрессией.
+NOISE = {"seconds": 0.005, "peak_rss": 4 * 1024 * 1024, "alloc_peak": 1024 * 1024, "alloc_retained": 1024 * 1024}
+
+STORES = {
+    "notes": (pa.NotesManager, "notes.json", "save_notes"),
+    "tasks": (pa.TasksManager, "tasks.json", "save_tasks"),
+    "contacts": (pa.ContactsManager, "contacts.json", "save_contacts"),
+    "finance": (pa.FinanceManager, "finance.json", "save_records"),
+}
+
+
+def open_manager(store, backend):
+    manager_class, filename, _ = STORES[store]
+    return manager_class(filename, storage=pa.make_storage(filename, backend))
+
+
+def create_items(store, manager, count):
+    rows = iter_rows(store, count, seed=1, start_id=1)
+    if store == "notes":
+        for row in rows:
+            manager.create_note(row["title"], row["content"])
+    elif store == "tasks":
+        for row in rows:
+            manager.create_task(row["title"], row["description"], row["priority"], row["due_date"])
+    elif store == "contacts":
+        for row in rows:
+            manager.add_contact(row["name"], row["phone"], row["email"])
+    else:
+        for row in rows:
+            manager.add_record(pa.from_minor_units(row["amount_minor"]), row["category"], row["date"], row["description"])
+
+
+# Сценарий — функция setup(store, size, backend) -> операция без аргументов.
+# setup выполняется в рабочем каталоге с копией данных и в замер не входит.
+
+def load_case(store, size, backend):
+    return lambda: open_manager(store, backend)
+
+
+def save_case(store, size, backend):
+    manager = open_manager(store, backend)
+    save = getattr(manager, STORES[store][2])
+
+    def run():
+        save()
+        manager.flush()
+    return run
+
+
+def create_case(store, size, backend):
+    manager = open_manager(store, backend)
+
+    def run():
+        create_items(store, manager, CREATE_COUNT)
+        manager.flush()
+    return run
+
+
+def import_case(store, size, backend):
+    for filename in os.listdir():
+        os.remove(filename)
+    write_csv(store, size, "import.csv")
+    manager = open_manager(store, backend)
+
+    def run():
+        manager.import_from_csv("import.csv")
+        manager.flush()
+    return run
+
+
+def export_case(store, size, backend):
+    manager = open_manager(store, backend)
+    return lambda: manager.export_to_csv("export.csv")
+
+
+def find_contacts_case(store, size, backend):
+    manager = open_manager(store, backend)
+    queries = make_queries("contacts", QUERY_COUNT)
+    return lambda: [len(manager.find_contacts(query)) for query in queries]
+
+
+def filter_tasks_case(store, size, backend):
+    manager = open_manager(store, backend)
+    queries = make_queries("tasks", QUERY_COUNT)
+    return lambda: [len(manager.filter_tasks(**query)) for query in queries]
+
+
+def generate_report_case(store, size, backend):
+    manager = open_manager(store, backend)
+    queries = make_queries("finance", QUERY_COUNT)
+    return lambda: [manager.generate_report(start, end).total for start, end in queries]
+
+
+def group_by_category_case(store, size, backend):
+    manager = open_manager(store, backend)
+    return lambda: [manager.group_by_category() for _ in range(QUERY_COUNT)]
+
+
+def calculate_case(store, size, backend):
+    calculator = pa.Calculator()
+    expressions = make_expressions(size)
+    return lambda: [calculator.calculate(expression) for expression in expressions]
+
+
+CASES = {}
+for _store in STORES:
+    CASES[f"{_store}.load"] = (_store, load_case)
+    CASES[f"{_store}.save"] = (_store, save_case)
+    CASES[f"{_store}.create"] = (_store, create_case)
+    CASES[f"{_store}.import_csv"] = (_store, import_case)
+    CASES[f"{_store}.export_csv"] = (_store, export_case)
+CASES["contacts.find_contacts"] = ("contacts", find_contacts_case)
+CASES["tasks.filter_tasks"] = ("tasks", filter_tasks_case)
+CASES["finance.generate_report"] = ("finance", generate_report_case)
+CASES["finance.group_by_category"] = ("finance", group_by_category_case)
+CASES["calculator.calculate"] = (None, calculate_case)
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    if text in SIZES:
+        return SIZES[text]
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(text.rstrip("km")) * multiplier
+
+
+def size_label(size):
+    for label, value in SIZES.items():
+        if value == size:
+            return label
+    return str(size)
+
+
+def build_fixture(store, size, backend, directory):
+    """Заполненное хранилище store размера size в directory (один раз на запуск)."""
+    if os.path.isdir(directory):
+        return
+    os.makedirs(directory)
+    with contextlib.chdir(directory):
+        if store is None:
+            return
+        filename = STORES[store][1]
+        storage = pa.make_storage(filename, backend)
+        storage.save(list(iter_rows(store, size)))
+        storage.save_meta({"next_id": size + 1})
+        storage.flush()
+
+
+@contextlib.contextmanager
+def fresh_copy(fixture):
+    with tempfile.TemporaryDirectory(prefix="pa-bench-") as workdir:
+        shutil.copytree(fixture, workdir, dirs_exist_ok=True)
+        with contextlib.chdir(workdir):
+            yield
+
+
+def run_case(name, size, backend, fixtures, repeat, allocations):
+    """Выполняется в дочернем процессе; возвращает словарь метрик."""
+    store, setup = CASES[name]
+    fixture = os.path.join(fixtures, f"{backend}-{store}-{size}")
+    build_fixture(store, size, backend, fixture)
+    result = {}
+    timings = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            with fresh_copy(fixture):
+                operation = setup(store, size, backend)
+                start = time.perf_counter()
+                operation()
+                timings.append(time.perf_counter() - start)
+                del operation
+        result["seconds"] = min(timings)
+        if resource is not None:
+            # ru_maxrss в Linux — в килобайтах, в macOS — в байтах.
+            scale = 1 if sys.platform == "darwin" else 1024
+            result["peak_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        if allocations:
+            with fresh_copy(fixture):
+                operation = setup(store, size, backend)
+                tracemalloc.start()
+                output = operation()
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                del output, operation
+            result["alloc_peak"] = peak
+            result["alloc_retained"] = current
+    return result
+
+
+def run_worker(name, size, backend, fixtures, repeat, allocations):
+    command = [
+        sys.executable, os.path.abspath(__file__), "--worker", name, str(size),
+        "--storage", backend, "--fixtures", fixtures, "--repeat", str(repeat),
+    ]
+    if not allocations:
+        command.append("--no-allocations")
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{name}@{size_label(size)} завершился с ошибкой:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """Регрессии: (ключ, метрика, было, стало) для метрик, выросших больше чем на threshold."""
+    regressions = []
+    for key, metrics in results.items():
+        old = baseline.get(key)
+        if not old:
+            continue
+        for metric in METRICS:
+            if metric not in metrics or not old.get(metric):
+                continue
+            before, after = old[metric], metrics[metric]
+            if after > before * (1 + threshold) and after - before > NOISE[metric]:
+                regressions.append((key, metric, before, after))
+    return regressions
+
+
+def format_bytes(value):
+    return "-" if value is None else f"{value / (1024 * 1024):.1f}"
+
+
+def print_row(key, metrics, old):
+    ratio = ""
+    if old and old.get("seconds"):
+        ratio = f"{metrics['seconds'] / old['seconds']:.2f}x"
+    print(
+        f"{key:<36} {metrics['seconds']:>10.4f} {format_bytes(metrics.get('peak_rss')):>10} "
+        f"{format_bytes(metrics.get('alloc_peak')):>11} {format_bytes(metrics.get('alloc_retained')):>11} {ratio:>8}",
+        flush=True,
+    )
+
+
+def select_cases(only):
+    if not only:
+        return list(CASES)
+    patterns = [pattern.strip() for pattern in only.split(",") if pattern.strip()]
+    return [name for name in CASES if any(pattern in name for pattern in patterns)]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Бенчмарки персонального помощника.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="размеры через запятую: 1k,100k,1m или числа")
+    parser.add_argument("--only", help="только сценарии, имя которых содержит одну из подстрок через запятую")
+    parser.add_argument("--storage", choices=sorted(pa.STORAGE_BACKENDS), default="json")
+    parser.add_argument("--repeat", type=int, default=1, help="повторов замера времени (берётся лучший)")
+    parser.add_argument("--no-allocations", dest="allocations", action="store_false", help="не запускать замер tracemalloc")
+    parser.add_argument("--baseline", help="JSON с базовыми результатами для сравнения")
+    parser.add_argument("--save-baseline", help="сохранить результаты в JSON")
+    parser.add_argument("--threshold", type=float, default=0.25, help="допустимый относительный рост метрики")
+    parser.add_argument("--fixtures", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", nargs=2, metavar=("CASE", "SIZE"), help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.worker:
+        name, size = args.worker
+        result = run_case(name, int(size), args.storage, args.fixtures, args.repeat, args.allocations)
+        print(json.dumps(result))
+        return 0
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+    sizes = [parse_size(size) for size in args.sizes.split(",") if size.strip()]
+    names = select_cases(args.only)
+    results = {}
+    print(f"Хранилище: {args.storage}, Python {platform.python_version()}")
+    print(f"{'Сценарий':<36} {'время, с':>10} {'RSS, МиБ':>10} {'пик, МиБ':>11} {'осталось':>11} {'к базе':>8}")
+    with tempfile.TemporaryDirectory(prefix="pa-fixtures-") as fixtures:
+        for size in sizes:
+            for name in names:
+                key = f"{name}@{size_label(size)}"
+                results[key] = run_worker(name, size, args.storage, fixtures, args.repeat, args.allocations)
+                print_row(key, results[key], baseline.get(key))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "storage": args.storage,
+                "results": results,
+            }, file, indent=2)
+        print(f"Результаты сохранены в {args.save_baseline}.")
+
+    regressions = compare(results, baseline, args.threshold)
+    for key, metric, before, after in regressions:
+        print(f"Регрессия: {key} {metric}: {before:.4g} -> {after:.4g} (+{(after / before - 1) * 100:.0f}%)")
+    if baseline and not regressions:
+        print("Регрессий нет.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
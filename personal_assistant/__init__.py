@@ -0,0 +1,92 @@
+"""Персональный помощник: заметки, задачи, контакты, финансы и калькулятор.
+
+Запуск: python -m personal_assistant [--help]
+
+Каждая подсистема — отдельный модуль пакета. Имена модулей доступны и как
+атрибуты пакета (personal_assistant.NotesManager и т. п.), но модуль
+импортируется только при первом обращении к его имени, поэтому импорт пакета
+и запуск меню не загружают ни менеджеры, ни SQLite, ни asyncio, ни NumPy.
+"""
+import importlib
+
+_EXPORTS = {
+    "common": (
+        "CSV_CHUNK_SIZE", "MAX_REPORTED_ERRORS", "DATE_FORMAT", "FLUSH_DELAY", "EXPORT_BUFFER_SIZE",
+        "EXPORT_GZIP_LEVEL", "EXPORT_COMPRESSION", "MONEY_DIGITS", "MONEY_SCALE", "intern_string",
+        "now_timestamp", "parse_timestamp", "InvalidDateError", "ChangeConflict", "parse_date",
+        "parse_date_or_none", "to_minor_units", "from_minor_units", "format_money", "parse_currency",
+        "iter_chunks", "SERVICE_ADDRESS", "STORES", "manager_class", "upgrade_records", "open_manager",
+    ),
+    "metrics": (
+        "LATENCY_BUCKETS", "PROFILE_SAMPLE_INTERVAL", "PROFILE_REPORT_LINES", "Metrics", "prometheus_label",
+        "METRICS", "measured", "Profiler", "PROFILER",
+    ),
+    "csv_io": (
+        "ImportReport", "require_fields", "read_csv_chunks", "import_csv_rows", "open_export",
+        "export_csv_rows",
+    ),
+    "storage": (
+        "JSON_WHITESPACE_RE", "iter_json_array", "atomic_write", "atomic_write_json", "FileLock",
+        "read_generation", "bump_generation", "merge_change", "report_merge", "JsonStorage", "JournalStorage",
+        "sqlite_storage", "binary_storage", "STORAGE_BACKENDS", "next_free_id", "make_storage", "StoreManager",
+    ),
+    "binary": (
+        "BINARY_MAGIC", "BINARY_VERSION", "BINARY_HEADER", "BINARY_COLUMN", "BINARY_ALIGNMENT", "FLAG_HAS_NUL",
+        "BINARY_SCHEMAS", "FIXED_KINDS", "CONVERTERS", "SnapshotFormatError", "write_snapshot",
+        "BinarySnapshot", "BinaryStorage", "json_to_binary", "binary_to_json", "convert_stores",
+    ),
+    "sqlite": (
+        "SQLITE_DATABASE", "SQLITE_TABLES", "SqliteStorage", "migrate_to_sqlite",
+    ),
+    "notes": (
+        "Note", "TOKEN_RE", "STEM_SUFFIXES", "stem_word", "tokenize", "NotesIndex", "StorageSearch",
+        "NotesManager",
+    ),
+    "tasks": (
+        "Task", "TasksIndex", "PRIORITY_RANKS", "NO_DUE_DATE", "TaskScheduler", "TasksManager",
+    ),
+    "contacts": (
+        "Contact", "NgramIndex", "phone_key", "ContactsIndex", "ContactsManager",
+    ),
+    "finance": (
+        "FinanceRecord", "FinanceColumns", "FinanceTotals", "FinanceReport", "FinanceManager",
+    ),
+    "calculator": (
+        "CALC_MAX_LENGTH", "CALC_MAX_DEPTH", "CALC_MAX_INT_BITS", "CALC_TIME_LIMIT", "CALC_CACHE_SIZE",
+        "CalculationError", "EvaluationContext", "checked_multiply", "checked_power", "BINARY_OPERATORS",
+        "UNARY_OPERATORS", "CompiledExpression", "compile_expression", "CalculationResult",
+        "CALC_ALLOWED_CHARS", "CALC_NUMBER_RE", "CALC_BATCH_CHUNK_SIZE", "CALC_VECTORIZE_MIN_ROWS",
+        "failed_result", "evaluate_expression", "expression_template", "float_template", "vectorized_values",
+        "evaluate_chunk", "Calculator",
+    ),
+    "presenter": (
+        "OUTPUT_FORMATS", "OUTPUT_BUFFER_LINES", "LineBuffer", "Presenter", "note_line", "note_details",
+        "task_line", "contact_line", "record_line", "calculation_line", "stats_rows", "stats_line",
+        "scan_line",
+    ),
+    "app": (
+        "PersonalAssistant",
+    ),
+    "service": (
+        "item_dict", "ReadWriteLock", "AssistantService", "serve",
+    ),
+    "cli": (
+        "build_parser", "export_store", "main", "run_command",
+    ),
+}
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,513 @@
+"""Интерактивное меню персонального помощника."""
+import os
+
+from .common import ChangeConflict, InvalidDateError, format_money, open_manager
+from .metrics import METRICS, PROFILER, Profiler
+from .presenter import (
+    Presenter,
+    calculation_line,
+    contact_line,
+    note_details,
+    note_line,
+    record_line,
+    scan_line,
+    stats_line,
+    stats_rows,
+    task_line,
+)
+
+
+class PersonalAssistant:
+    """Интерактивное меню. Модули подсистем импортируются, а их файлы читаются
+    только при первом входе в соответствующий пункт меню."""
+
+    def __init__(self, storage_backend="json", presenter=None):
+        self.running = True
+        self.storage_backend = storage_backend
+        self.presenter = presenter or Presenter()
+        self._managers = {}
+        self._calculator = None
+
+    def _get_manager(self, store):
+        manager = self._managers.get(store)
+        if manager is None:
+            manager = self._managers[store] = open_manager(store, self.storage_backend)
+        else:
+            # Другой процесс мог изменить файл с прошлой команды.
+            manager.refresh()
+        return manager
+
+    @property
+    def notes_manager(self):
+        return self._get_manager("notes")
+
+    @property
+    def tasks_manager(self):
+        return self._get_manager("tasks")
+
+    @property
+    def contacts_manager(self):
+        return self._get_manager("contacts")
+
+    @property
+    def finance_manager(self):
+        return self._get_manager("finance")
+
+    @property
+    def calculator(self):
+        if self._calculator is None:
+            from .calculator import Calculator
+
+            self._calculator = Calculator()
+        return self._calculator
+
+    def _import_csv(self, manager, csv_file, title):
+        try:
+            report = manager.import_from_csv(csv_file)
+        except FileNotFoundError:
+            print(f"Файл {csv_file} не найден.")
+            return
+        self.presenter.import_report(report, title)
+
+    @staticmethod
+    def _report_invalid(function, *args):
+        """Ошибку проверки данных менеджером выводит её текстом, а не как неверный выбор пункта меню."""
+        try:
+            return function(*args)
+        except ValueError as e:
+            print(f"Ошибка: {e}.")
+
+    def display_menu(self):
+        print("\nДобро пожаловать в Персональный помощник!")
+        print("Выберите действие:")
+        print("1. Управление заметками")
+        print("2. Управление задачами")
+        print("3. Управление контактами")
+        print("4. Управление финансовыми записями")
+        print("5. Калькулятор")
+        print("6. Статистика и профилирование")
+        print("7. Выход")
+
+    def handle_input(self):
+        try:
+            choice = int(input("Введите номер действия: "))
+            if choice == 1:
+                self.manage_notes()
+            elif choice == 2:
+                self.manage_tasks()
+            elif choice == 3:
+                self.manage_contacts()
+            elif choice == 4:
+                self.manage_finances()
+            elif choice == 5:
+                self.run_calculator()
+            elif choice == 6:
+                self.manage_stats()
+            elif choice == 7:
+                self.exit_app()
+            else:
+                print("Функционал ещё не реализован.")
+        except ValueError:
+            print("Пожалуйста, введите число от 1 до 7.")
+
+    def manage_finances(self):
+        while True:
+            print("\nУправление финансовыми записями:")
+            print("1. Добавить запись")
+            print("2. Просмотреть записи")
+            print("3. Посчитать общий баланс")
+            print("4. Группировать по категориям")
+            print("5. Сгенерировать отчёт")
+            print("6. Импорт из CSV")
+            print("7. Экспорт в CSV")
+            print("8. Группировать по месяцам или дням")
+            print("9. Редактировать запись")
+            print("10. Удалить запись")
+            print("11. Проверить итоги")
+            print("12. Вернуться в главное меню")
+            try:
+                choice = int(input("Выберите действие: "))
+                if choice == 1:
+                    amount = input("Введите сумму операции (положительная для дохода, отрицательная для расхода): ")
+                    currency = input("Введите код валюты (или оставьте пустым): ")
+                    category = input("Введите категорию: ")
+                    date = input("Введите дату операции (ДД-ММ-ГГГГ): ")
+                    description = input("Введите описание: ")
+                    self._report_invalid(
+                        self.finance_manager.add_record, amount, category, date, description, currency or None
+                    )
+                elif choice == 2:
+                    category = input("Введите категорию для фильтрации (или оставьте пустым): ")
+                    date = input("Введите дату для фильтрации (ДД-ММ-ГГГГ или оставьте пустым): ")
+                    self.presenter.items(
+                        self.finance_manager.list_records(category or None, date or None), record_line,
+                        title="\nСписок финансовых записей:", empty="Записей не найдено.",
+                    )
+                elif choice == 3:
+                    self.presenter.rows(
+                        [{"balance": self.finance_manager.calculate_balance()}],
+                        lambda row: f"\nОбщий баланс: {format_money(row['balance'])}",
+                    )
+                elif choice == 4:
+                    self.presenter.rows(
+                        ({"category": category, "total": total}
+                         for category, total in self.finance_manager.group_by_category().items()),
+                        lambda row: f"Категория: {row['category']}, Сумма: {format_money(row['total'])}",
+                        title="\nГруппировка по категориям:",
+                    )
+                elif choice == 5:
+                    start_date = input("Введите начальную дату (ДД-ММ-ГГГГ): ")
+                    end_date = input("Введите конечную дату (ДД-ММ-ГГГГ): ")
+                    report = self.finance_manager.generate_report(start_date, end_date)
+                    if self.presenter.items(
+                        report.records, record_line,
+                        title=f"\nФинансовый отчёт с {start_date} по {end_date}:", empty="Нет записей за указанный период.",
+                    ):
+                        self.presenter.message(f"\nОбщий итог за период: {format_money(report.total)}")
+                elif choice == 6:
+                    csv_file = input("Введите имя CSV-файла для импорта: ")
+                    self._import_csv(self.finance_manager, csv_file, f"Финансовые записи импортированы из файла {csv_file}.")
+                elif choice == 7:
+                    csv_file = input("Введите имя CSV-файла для экспорта: ")
+                    self.finance_manager.export_to_csv(csv_file)
+                elif choice == 8:
+                    period = "day" if input("Период группировки (месяц/день): ").strip().lower() == "день" else "month"
+                    self.presenter.rows(
+                        ({"period": label, "total": total}
+                         for label, total in self.finance_manager.group_by_period(period).items()),
+                        lambda row: f"Период: {row['period']}, Сумма: {format_money(row['total'])}",
+                        title="\nГруппировка по дням:" if period == "day" else "\nГруппировка по месяцам:",
+                        empty="Записей не найдено.",
+                    )
+                elif choice == 9:
+                    record_id = int(input("Введите ID записи: "))
+                    amount = input("Введите новую сумму (оставьте пустым для сохранения текущей): ").strip()
+                    currency = input("Введите новый код валюты (оставьте пустым для сохранения текущего): ")
+                    category = input("Введите новую категорию (оставьте пустым для сохранения текущей): ")
+                    date = input("Введите новую дату ДД-ММ-ГГГГ (оставьте пустым для сохранения текущей): ")
+                    description = input("Введите новое описание (оставьте пустым для сохранения текущего): ")
+                    self._report_invalid(
+                        self.finance_manager.edit_record,
+                        record_id, amount or None, category or None, date or None, description or None, currency or None
+                    )
+                elif choice == 10:
+                    record_id = int(input("Введите ID записи: "))
+                    self.finance_manager.delete_record(record_id)
+                elif choice == 11:
+                    repair = input("Исправить расхождения, если они найдены? (да/нет): ").strip().lower() == "да"
+                    problems = self.finance_manager.check_totals(repair)
+                    if not problems:
+                        print("Итоги согласованы с записями.")
+                    else:
+                        print("Обнаружены расхождения в итогах:")
+                        for problem in problems:
+                            print(f"  {problem}")
+                        if repair:
+                            print("Итоги пересчитаны.")
+                elif choice == 12:
+                    break
+                else:
+                    print("Неверный выбор. Попробуйте снова.")
+            except (InvalidDateError, ChangeConflict) as e:
+                print(f"Ошибка: {e}.")
+            except ValueError:
+                print("Пожалуйста, введите корректное число.")
+
+    def run_calculator(self):
+        print("\nКалькулятор:")
+        print("Введите математическое выражение.")
+        print("Введите 'file', чтобы вычислить выражения из файла (по одному на строку).")
+        print("Введите 'exit', чтобы вернуться в главное меню.")
+        while True:
+            expression = input("Введите выражение: ").strip()
+            if expression.lower() == "exit":
+                break
+            if expression.lower() == "file":
+                self.run_calculator_file(input("Введите имя файла: ").strip())
+                continue
+            result = self.calculator.calculate(expression)
+            print(f"Результат: {result}")
+
+    def run_calculator_file(self, path):
+        try:
+            results = self.calculator.calculate_file(path, workers=os.cpu_count(), vectorize=True)
+            self.presenter.rows(
+                (dict(result._asdict(), number=number) for number, result in enumerate(results, start=1)),
+                calculation_line,
+            )
+        except FileNotFoundError:
+            print(f"Файл {path} не найден.")
+
+
+
+    def manage_contacts(self):
+        while True:
+            print("\nУправление контактами:")
+            print("1. Добавить контакт")
+            print("2. Найти контакт")
+            print("3. Редактировать контакт")
+            print("4. Удалить контакт")
+            print("5. Импорт контактов из CSV")
+            print("6. Экспорт контактов в CSV")
+            print("7. Вернуться в главное меню")
+            try:
+                choice = int(input("Выберите действие: "))
+                if choice == 1:
+                    name = input("Введите имя контакта: ")
+                    phone = input("Введите номер телефона: ")
+                    email = input("Введите адрес электронной почты: ")
+                    self.contacts_manager.add_contact(name, phone, email)
+                elif choice == 2:
+                    query = input("Введите имя, номер телефона или email для поиска: ")
+                    self.presenter.items(
+                        self.contacts_manager.find_contacts(query), contact_line,
+                        title="\nНайденные контакты:", empty="Контакты не найдены.",
+                    )
+                elif choice == 3:
+                    contact_id = int(input("Введите ID контакта: "))
+                    name = input("Введите новое имя (оставьте пустым для сохранения текущего): ")
+                    phone = input("Введите новый номер телефона (оставьте пустым для сохранения текущего): ")
+                    email = input("Введите новый адрес электронной почты (оставьте пустым для сохранения текущего): ")
+                    self.contacts_manager.edit_contact(contact_id, name or None, phone or None, email or None)
+                elif choice == 4:
+                    contact_id = int(input("Введите ID контакта: "))
+                    self.contacts_manager.delete_contact(contact_id)
+                elif choice == 5:
+                    csv_file = input("Введите имя CSV-файла для импорта: ")
+                    self._import_csv(self.contacts_manager, csv_file, f"Контакты импортированы из файла {csv_file}.")
+                elif choice == 6:
+                    csv_file = input("Введите имя CSV-файла для экспорта: ")
+                    self.contacts_manager.export_to_csv(csv_file)
+                elif choice == 7:
+                    break
+                else:
+                    print("Неверный выбор. Попробуйте снова.")
+            except ChangeConflict as e:
+                print(f"Ошибка: {e}.")
+            except ValueError:
+                print("Пожалуйста, введите корректное число.")
+
+
+    def manage_tasks(self):
+        while True:
+            print("\nУправление задачами:")
+            print("1. Добавить задачу")
+            print("2. Просмотреть список задач")
+            print("3. Отметить задачу как выполненную")
+            print("4. Редактировать задачу")
+            print("5. Удалить задачу")
+            print("6. Импорт задач из CSV")
+            print("7. Экспорт задач в CSV")
+            print("8. Фильтровать задачи")
+            print("9. Просроченные задачи")
+            print("10. Задачи на ближайшие дни")
+            print("11. Задачи со сроком в периоде")
+            print("12. Самые срочные задачи")
+            print("13. Вернуться в главное меню")
+            try:
+                choice = int(input("Выберите действие: "))
+                if choice == 1:
+                    title = input("Введите название задачи: ")
+                    description = input("Введите описание задачи: ")
+                    priority = input("Введите приоритет (Высокий, Средний, Низкий): ")
+                    due_date = input("Введите срок выполнения (ДД-ММ-ГГГГ): ")
+                    self.tasks_manager.create_task(title, description, priority, due_date)
+                elif choice == 2:
+                    self.presenter.items(
+                        self.tasks_manager.list_tasks(), task_line, title="\nСписок задач:", empty="Список задач пуст."
+                    )
+                elif choice == 3:
+                    task_id = int(input("Введите ID задачи: "))
+                    self.tasks_manager.mark_task_done(task_id)
+                elif choice == 4:
+                    task_id = int(input("Введите ID задачи: "))
+                    title = input("Введите новый заголовок (оставьте пустым для сохранения текущего): ")
+                    description = input("Введите новое описание (оставьте пустым для сохранения текущего): ")
+                    priority = input("Введите новый приоритет (оставьте пустым для сохранения текущего): ")
+                    due_date = input("Введите новый срок выполнения (оставьте пустым для сохранения текущего): ")
+                    self.tasks_manager.edit_task(task_id, title or None, description or None, priority or None, due_date or None)
+                elif choice == 5:
+                    task_id = int(input("Введите ID задачи: "))
+                    self.tasks_manager.delete_task(task_id)
+                elif choice == 6:
+                    csv_file = input("Введите имя CSV-файла для импорта: ")
+                    self._import_csv(self.tasks_manager, csv_file, f"Задачи импортированы из файла {csv_file}.")
+                elif choice == 7:
+                    csv_file = input("Введите имя CSV-файла для экспорта: ")
+                    self.tasks_manager.export_to_csv(csv_file)
+                elif choice == 8:
+                    status = input("Фильтр по статусу (Выполнена/Не выполнена или оставьте пустым): ").strip()
+                    priority = input("Фильтр по приоритету (Высокий, Средний, Низкий или оставьте пустым): ").strip()
+                    due_date = input("Фильтр по сроку (ДД-ММ-ГГГГ или оставьте пустым): ").strip()
+                    tasks = self.tasks_manager.filter_tasks(
+                        status=(status == "Выполнена") if status else None,
+                        priority=priority or None,
+                        due_date=due_date or None
+                    )
+                    self.presenter.items(tasks, task_line, empty="Нет задач, соответствующих критериям фильтрации.")
+                elif choice == 9:
+                    self.presenter.items(
+                        self.tasks_manager.overdue_tasks(), task_line,
+                        empty="Нет задач, соответствующих критериям фильтрации.",
+                    )
+                elif choice == 10:
+                    days = int(input("Введите количество дней: "))
+                    self.presenter.items(
+                        self.tasks_manager.tasks_due_soon(days), task_line,
+                        empty="Нет задач, соответствующих критериям фильтрации.",
+                    )
+                elif choice == 11:
+                    start_date = input("Введите начальную дату (ДД-ММ-ГГГГ): ")
+                    end_date = input("Введите конечную дату (ДД-ММ-ГГГГ): ")
+                    self.presenter.items(
+                        self.tasks_manager.tasks_due_between(start_date, end_date), task_line,
+                        empty="Нет задач, соответствующих критериям фильтрации.",
+                    )
+                elif choice == 12:
+                    count = int(input("Сколько задач показать: "))
+                    self.presenter.items(
+                        self.tasks_manager.most_urgent_tasks(count), task_line,
+                        title="\nСамые срочные задачи:", empty="Нет невыполненных задач.",
+                    )
+                elif choice == 13:
+                    break
+                else:
+                    print("Неверный выбор. Попробуйте снова.")
+            except (InvalidDateError, ChangeConflict) as e:
+                print(f"Ошибка: {e}.")
+            except ValueError:
+                print("Пожалуйста, введите корректное число.")
+
+    def manage_notes(self):
+        while True:
+            print("\nУправление заметками:")
+            print("1. Создать заметку")
+            print("2. Просмотреть список заметок")
+            print("3. Просмотреть подробности заметки")
+            print("4. Редактировать заметку")
+            print("5. Удалить заметку")
+            print("6. Импорт заметок из CSV")
+            print("7. Экспорт заметок в CSV")
+            print("8. Поиск заметок")
+            print("9. Вернуться в главное меню")
+            try:
+                choice = int(input("Выберите действие: "))
+                if choice == 1:
+                    title = input("Введите заголовок заметки: ")
+                    content = input("Введите содержимое заметки: ")
+                    self.notes_manager.create_note(title, content)
+                elif choice == 2:
+                    self.presenter.items(
+                        self.notes_manager.list_notes(), note_line, title="\nСписок заметок:", empty="Список заметок пуст."
+                    )
+                elif choice == 3:
+                    note_id = int(input("Введите ID заметки: "))
+                    note = self.notes_manager.find_note_by_id(note_id)
+                    if note:
+                        self.presenter.items([note], note_details)
+                    else:
+                        print(f"Заметка с ID {note_id} не найдена.")
+                elif choice == 4:
+                    note_id = int(input("Введите ID заметки: "))
+                    title = input("Введите новый заголовок (оставьте пустым для сохранения текущего): ")
+                    content = input("Введите новое содержимое (оставьте пустым для сохранения текущего): ")
+                    self.notes_manager.edit_note(note_id, title or None, content or None)
+                elif choice == 5:
+                    note_id = int(input("Введите ID заметки: "))
+                    self.notes_manager.delete_note(note_id)
+                elif choice == 6:
+                    csv_file = input("Введите имя CSV-файла для импорта: ")
+                    self._import_csv(self.notes_manager, csv_file, f"Заметки импортированы из файла {csv_file}.")
+                elif choice == 7:
+                    csv_file = input("Введите имя CSV-файла для экспорта: ")
+                    self.notes_manager.export_to_csv(csv_file)
+                elif choice == 8:
+                    query = input("Введите слова для поиска: ")
+                    self.presenter.rows(
+                        (dict(note.to_dict(), score=score) for note, score in self.notes_manager.search_notes(query)),
+                        lambda row: f"ID: {row['id']}, Title: {row['title']}, Score: {row['score']:.2f}, Timestamp: {row['timestamp']}",
+                        title="\nНайденные заметки:", empty="Заметки не найдены.",
+                    )
+                elif choice == 9:
+                    break
+                else:
+                    print("Неверный выбор. Попробуйте снова.")
+            except ChangeConflict as e:
+                print(f"Ошибка: {e}.")
+            except ValueError:
+                print("Пожалуйста, введите корректное число.")
+
+    def flush(self):
+        """Сохраняет отложенные изменения всех загруженных менеджеров."""
+        for manager in self._managers.values():
+            manager.flush()
+
+    def manage_stats(self):
+        while True:
+            print("\nСтатистика и профилирование:")
+            print("1. Показать статистику")
+            print(f"2. {'Выключить' if METRICS.enabled else 'Включить'} сбор статистики")
+            print("3. Сбросить статистику")
+            print("4. Сохранить статистику в файл (.prom — формат Prometheus, иначе JSON)")
+            print(f"5. {'Остановить' if PROFILER.running else 'Запустить'} профилировщик")
+            print("6. Вернуться в главное меню")
+            try:
+                choice = int(input("Выберите действие: "))
+                if choice == 1:
+                    self.show_stats()
+                elif choice == 2:
+                    METRICS.enabled = not METRICS.enabled
+                    print("Сбор статистики включён." if METRICS.enabled else "Сбор статистики выключен.")
+                elif choice == 3:
+                    METRICS.reset()
+                    print("Статистика сброшена.")
+                elif choice == 4:
+                    filename = input("Введите имя файла: ").strip()
+                    METRICS.dump(filename)
+                    print(f"Статистика сохранена в файл {filename}.")
+                elif choice == 5:
+                    if PROFILER.running:
+                        filename = None
+                        if PROFILER.mode == "cprofile":
+                            filename = input("Файл для данных cProfile (или оставьте пустым): ").strip() or None
+                        print(PROFILER.stop(filename=filename))
+                    else:
+                        mode = input("Режим профилирования (cprofile/sampling): ").strip().lower() or "cprofile"
+                        if mode in Profiler.MODES:
+                            PROFILER.start(mode)
+                            print(f"Профилировщик {mode} запущен.")
+                        else:
+                            print("Неизвестный режим профилирования.")
+                elif choice == 6:
+                    break
+                else:
+                    print("Неверный выбор. Попробуйте снова.")
+            except ValueError:
+                print("Пожалуйста, введите корректное число.")
+            except OSError as e:
+                print(f"Не удалось сохранить файл: {e}.")
+
+    def show_stats(self):
+        if not METRICS.enabled:
+            self.presenter.message("Сбор статистики выключен.")
+        self.presenter.rows(
+            stats_rows(METRICS), stats_line,
+            title="\nОперации:", empty="Статистика пуста.",
+        )
+        self.presenter.rows(
+            ({"operation": name, **counts} for name, counts in METRICS.to_dict()["records"].items()),
+            scan_line, title="\nПросмотрено и возвращено записей:",
+        )
+        for title, counts in (("Прочитано", METRICS.bytes_read), ("Записано", METRICS.bytes_written)):
+            for filename, size in sorted(counts.items()):
+                self.presenter.message(f"{title}: {filename} — {size} байт")
+
+    def exit_app(self):
+        self.flush()
+        print("Выход из приложения. До свидания!")
+        self.running = False
+
+    def run(self):
+        while self.running:
+            self.display_menu()
+            self.handle_input()
@@ -0,0 +1,360 @@
+"""Двоичный снимок хранилища с загрузкой через mmap и преобразование из JSON и обратно.
+
+Формат файла <хранилище>.bin (все числа little-endian, секции выровнены по 8 байт):
+
+    заголовок   BINARY_HEADER: сигнатура, версия, число столбцов, хранилище, число записей
+    описатели   BINARY_COLUMN на каждый столбец: имя, тип, флаги и три секции
+                (смещение, длина): данные, дополнительные данные и маска пустых значений
+    секции      данные столбцов
+
+Типы столбцов: q — int64, d — float64, B — флаг (1 байт), i — int32 (номер дня
+даты, см. parse_date), s — строки, c — повторяющиеся строки (коды uint32 и
+словарь значений в JSON). Для строк данные — UTF-8 значения, каждое с нулевым
+байтом в конце, а дополнительная секция — смещения uint64 начала каждого
+значения и конца последнего. Маска — по байту на запись (1 — значение пустое,
+None); её нет, если пустых значений в столбце нет.
+
+Столбцы фиксированной ширины читаются из отображённого в память файла без
+копирования. Номера дней дат хранятся готовыми: при загрузке они передаются
+в модели, и даты не разбираются заново.
+"""
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+from itertools import accumulate
+
+from .common import STORES, parse_date_or_none, upgrade_records
+from .metrics import METRICS, measured
+from .storage import JsonStorage, atomic_write
+
+BINARY_MAGIC = b"PASNAP\r\n"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<8sHH12sQ")
+BINARY_COLUMN = struct.Struct("<24scB6x6Q")
+BINARY_ALIGNMENT = 8
+# В значениях строкового столбца встречается нулевой байт: разбирать по смещениям.
+FLAG_HAS_NUL = 1
+
+# Столбцы снимков: поля записей по порядку to_dict и вычисляемые столбцы для
+# запросов (номер дня даты), которые в записи не попадают.
+BINARY_SCHEMAS = {
+    "notes": {
+        "columns": [("id", "q"), ("title", "s"), ("content", "s"), ("timestamp", "s"), ("updated_at", "s")],
+        "derived": {},
+    },
+    "tasks": {
+        "columns": [
+            ("id", "q"), ("title", "s"), ("description", "s"), ("done", "B"), ("priority", "c"),
+            ("due_date", "s"), ("updated_at", "s"),
+        ],
+        "derived": {"due_ordinal": "due_date"},
+    },
+    "contacts": {
+        "columns": [("id", "q"), ("name", "s"), ("phone", "s"), ("email", "s"), ("updated_at", "s")],
+        "derived": {},
+    },
+    "finance": {
+        "columns": [
+            ("id", "q"), ("amount_minor", "q"), ("currency", "c"), ("category", "c"), ("date", "s"),
+            ("description", "s"), ("updated_at", "s"),
+        ],
+        "derived": {"date_ordinal": "date"},
+    },
+}
+
+# Типы столбцов фиксированной ширины -> код array/memoryview и значение вместо None.
+FIXED_KINDS = {"q": ("q", 0), "d": ("d", 0.0), "B": ("B", 0), "i": ("i", 0)}
+CONVERTERS = {"q": int, "d": float, "B": bool, "i": int}
+
+
+class SnapshotFormatError(json.JSONDecodeError):
+    """Файл не является двоичным снимком или повреждён.
+    Наследует JSONDecodeError, чтобы хранилище обработало его как любой повреждённый файл."""
+
+    def __init__(self, message, filename):
+        super().__init__(message, filename, 0)
+
+
+def _aligned(size):
+    return -size % BINARY_ALIGNMENT
+
+
+def _pack(typecode, values):
+    data = array.array(typecode, values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _encode(name, kind, values):
+    """Байты столбца: (данные, дополнительные данные, маска, флаги)."""
+    mask = b""
+    if None in values:
+        mask = bytes(value is None for value in values)
+    flags = 0
+    try:
+        if kind in FIXED_KINDS:
+            typecode, default = FIXED_KINDS[kind]
+            convert = CONVERTERS[kind]
+            data = _pack(typecode, [default if value is None else convert(value) for value in values])
+            return data, b"", mask, flags
+        if kind == "c":
+            codes = {}
+            data = _pack("I", [codes.setdefault(value, len(codes)) if value is not None else 0 for value in values])
+            dictionary = sorted(codes, key=codes.get)
+            return data, json.dumps(dictionary, ensure_ascii=False).encode("utf-8"), mask, flags
+        parts = [("" if value is None else value).encode("utf-8") for value in values]
+    except (TypeError, ValueError, OverflowError, AttributeError):
+        raise ValueError(f"значения поля {name} не подходят для двоичного формата")
+    blob = b"\x00".join(parts) + b"\x00" if parts else b""
+    if blob.count(b"\x00") != len(parts):
+        flags |= FLAG_HAS_NUL
+    offsets = _pack("Q", accumulate((len(part) + 1 for part in parts), initial=0))
+    return blob, offsets, mask, flags
+
+
+def write_snapshot(filename, store, records):
+    """Записывает записи хранилища store в двоичный снимок (атомарно, как JSON-снимок)."""
+    schema = BINARY_SCHEMAS[store]
+    fields = [name for name, _ in schema["columns"]]
+    known = set(fields)
+    records = records if isinstance(records, list) else list(records)
+    for record in records:
+        if not record.keys() <= known:
+            extra = ", ".join(sorted(record.keys() - known))
+            raise ValueError(f"поля {extra} не поддерживаются двоичным форматом")
+    columns = [(name, kind, [record.get(name) for record in records]) for name, kind in schema["columns"]]
+    for name, source in schema["derived"].items():
+        columns.append((name, "i", [parse_date_or_none(value) for value in columns[fields.index(source)][2]]))
+
+    position = BINARY_HEADER.size + BINARY_COLUMN.size * len(columns)
+    position += _aligned(position)
+    descriptors = []
+    sections = []
+    for name, kind, values in columns:
+        *parts, flags = _encode(name, kind, values)
+        locations = []
+        for part in parts:
+            locations += [position, len(part)]
+            sections += [part, bytes(_aligned(len(part)))]
+            position += len(part) + _aligned(len(part))
+        descriptors.append(BINARY_COLUMN.pack(name.encode(), kind.encode(), flags, *locations))
+    header = BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(columns), store.encode(), len(records))
+
+    def write(file):
+        file.write(header)
+        file.writelines(descriptors)
+        file.write(bytes(_aligned(file.tell())))
+        file.writelines(sections)
+
+    atomic_write(filename, write, binary=True)
+
+
+class BinarySnapshot:
+    """Двоичный снимок, открытый только для чтения через mmap.
+
+    column() возвращает столбец фиксированной ширины как memoryview без
+    копирования (подходит и для numpy.frombuffer); values() и iter_records()
+    разбирают столбцы целиком. Представления, полученные через column(),
+    действительны до close()."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < BINARY_HEADER.size:
+                raise SnapshotFormatError("файл слишком мал для двоичного снимка", filename)
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        try:
+            self._read_header(size)
+        except BaseException:
+            self.close()
+            raise
+
+    def _read_header(self, size):
+        magic, version, column_count, store, self.count = BINARY_HEADER.unpack_from(self._buffer)
+        if magic != BINARY_MAGIC:
+            raise SnapshotFormatError("нет сигнатуры двоичного снимка", self.filename)
+        if version != BINARY_VERSION:
+            raise SnapshotFormatError(f"неподдерживаемая версия двоичного снимка: {version}", self.filename)
+        self.store = store.rstrip(b"\x00").decode()
+        self.columns = {}
+        self._views = {}
+        self._dictionaries = {}
+        for number in range(column_count):
+            name, kind, flags, *locations = BINARY_COLUMN.unpack_from(
+                self._buffer, BINARY_HEADER.size + number * BINARY_COLUMN.size
+            )
+            name = name.rstrip(b"\x00").decode()
+            sections = list(zip(locations[::2], locations[1::2]))
+            if any(offset + length > size for offset, length in sections):
+                raise SnapshotFormatError(f"столбец {name} выходит за конец файла", self.filename)
+            self.columns[name] = (kind.decode(), flags, sections)
+        schema = BINARY_SCHEMAS.get(self.store)
+        if schema is None:
+            raise SnapshotFormatError(f"неизвестное хранилище в снимке: {self.store}", self.filename)
+        # Поля записей — все столбцы файла, кроме вычисляемых: снимок, записанный
+        # по прежней схеме хранилища, читается с прежними полями.
+        self.fields = [name for name in self.columns if name not in schema["derived"]]
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._mmap is not None:
+            for view in self._views.values():
+                view.release()
+            self._views = {}
+            self._buffer.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def _section(self, name, number, typecode="B"):
+        """Секция столбца как memoryview элементов typecode; представления кэшируются до close()."""
+        key = (name, number, typecode)
+        view = self._views.get(key)
+        if view is None:
+            offset, length = self.columns[name][2][number]
+            view = self._buffer[offset:offset + length]
+            if sys.byteorder == "big" and typecode != "B":
+                data = array.array(typecode, view)
+                data.byteswap()
+                view = memoryview(data)
+            elif typecode != "B":
+                view = view.cast(typecode)
+            self._views[key] = view
+        return view
+
+    def column(self, name):
+        """Столбец фиксированной ширины (q, d, B, i) без копирования; пустые значения — нули."""
+        kind = self.columns[name][0]
+        if kind not in FIXED_KINDS and kind != "c":
+            raise ValueError(f"столбец {name} переменной длины, используйте values()")
+        return self._section(name, 0, "I" if kind == "c" else FIXED_KINDS[kind][0])
+
+    def nulls(self, name):
+        """Маска пустых значений (по байту на запись) или None, если их нет."""
+        mask = self._section(name, 2)
+        return mask if len(mask) else None
+
+    def dictionary(self, name):
+        """Значения категориального столбца по их кодам."""
+        if name not in self._dictionaries:
+            self._dictionaries[name] = json.loads(bytes(self._section(name, 1)))
+        return self._dictionaries[name]
+
+    def values(self, name):
+        """Все значения столбца списком Python-объектов."""
+        kind, flags, _ = self.columns[name]
+        if kind == "s":
+            values = self._strings(name, flags)
+        elif kind == "c":
+            dictionary = self.dictionary(name)
+            values = [dictionary[code] for code in self.column(name)] if dictionary else [None] * self.count
+        elif kind == "B":
+            values = [bool(value) for value in self.column(name)]
+        else:
+            values = self.column(name).tolist()
+        mask = self.nulls(name)
+        if mask is not None:
+            values = [None if empty else value for value, empty in zip(values, mask)]
+        return values
+
+    def _strings(self, name, flags):
+        blob = self._section(name, 0)
+        if not self.count:
+            return []
+        if not flags & FLAG_HAS_NUL:
+            # Все значения разом: одна декодировка и split по разделителям.
+            return bytes(blob[:-1]).decode("utf-8").split("\x00")
+        offsets = self._section(name, 1, "Q")
+        return [bytes(blob[offsets[i]:offsets[i + 1] - 1]).decode("utf-8") for i in range(self.count)]
+
+    def iter_records(self, derived=False):
+        """Записи словарями, как в JSON-снимке; столбцы разбираются целиком.
+        derived — добавить в записи вычисляемые столбцы (номера дней дат), чтобы
+        конструкторы моделей не разбирали даты заново."""
+        names = list(self.columns) if derived else self.fields
+        columns = [self.values(name) for name in names]
+        for values in zip(*columns):
+            yield dict(zip(names, values))
+
+
+class BinaryStorage(JsonStorage):
+    """Хранилище в двоичном снимке <имя>.bin вместо JSON-файла.
+
+    Блокировки, отложенная запись и слияние изменений — как у JsonStorage;
+    служебные данные (<имя>.meta.json) общие с JSON-хранилищем, поэтому после
+    преобразования счётчик id продолжается."""
+
+    def __init__(self, filename, store):
+        super().__init__(filename)
+        self.store = store
+
+    @classmethod
+    def for_store(cls, filename):
+        """Хранилище для JSON-файла менеджера: finance.json -> finance.bin рядом."""
+        stem = os.path.splitext(filename)[0]
+        return cls(stem + ".bin", os.path.basename(stem))
+
+    def iter_records(self):
+        # Менеджерам — записи вместе с номерами дней; слиянию — только поля записей.
+        self.stamp = self.current_stamp()
+        return self._iter_snapshot(derived=True)
+
+    def _iter_snapshot(self, derived=False):
+        try:
+            snapshot = BinarySnapshot(self.filename)
+        except FileNotFoundError:
+            return
+        try:
+            if METRICS.enabled:
+                METRICS.count_read(self.filename, os.path.getsize(self.filename))
+            yield from snapshot.iter_records(derived)
+        finally:
+            snapshot.close()
+
+    def _write_snapshot(self, records):
+        write_snapshot(self.filename, self.store, records)
+
+
+@measured
+def json_to_binary(filename):
+    """Преобразует JSON-хранилище filename в двоичный снимок рядом; число записей."""
+    target = BinaryStorage.for_store(filename)
+    records = upgrade_records(target.store, JsonStorage(filename).load())
+    target.save(records)
+    return len(records)
+
+
+@measured
+def binary_to_json(filename):
+    """Восстанавливает JSON-хранилище filename из двоичного снимка рядом; число записей."""
+    records = BinaryStorage.for_store(filename).load()
+    JsonStorage(filename).save(records)
+    return len(records)
+
+
+def convert_stores(target, stores=None, directory="."):
+    """Преобразует хранилища (по умолчанию все) в формат target: binary или json."""
+    convert = json_to_binary if target == "binary" else binary_to_json
+    unknown = [store for store in stores or () if store not in STORES]
+    if unknown:
+        raise ValueError(f"неизвестное хранилище: {', '.join(unknown)}")
+    for store in stores or STORES:
+        filename = os.path.join(directory, STORES[store][1])
+        source = filename if target == "binary" else BinaryStorage.for_store(filename).filename
+        if not os.path.exists(source):
+            print(f"Файл {source} не найден, пропускаем.")
+            continue
+        print(f"{source}: преобразовано записей: {convert(filename)}.")
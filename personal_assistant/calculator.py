@@ -0,0 +1,330 @@
+"""Безопасный калькулятор выражений с пакетным и векторным режимами."""
+import ast
+import functools
+import operator
+import os
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .common import iter_chunks
+from .metrics import measured
+
+
+CALC_MAX_LENGTH = 10_000
+CALC_MAX_DEPTH = 100
+CALC_MAX_INT_BITS = 10_000
+CALC_TIME_LIMIT = 1.0
+CALC_CACHE_SIZE = 1024
+
+
+class CalculationError(ValueError):
+    """Ошибка вычисления с машиночитаемым кодом (code) и текстом для пользователя."""
+
+    def __init__(self, message, code="invalid"):
+        super().__init__(message)
+        self.code = code
+
+
+class EvaluationContext:
+    __slots__ = ("variables", "deadline")
+
+    def __init__(self, variables, deadline):
+        self.variables = variables
+        self.deadline = deadline
+
+
+def checked_multiply(left, right):
+    if type(left) is int and type(right) is int and left.bit_length() + right.bit_length() > CALC_MAX_INT_BITS:
+        raise CalculationError("Слишком большое число.", "too_large")
+    return left * right
+
+
+def checked_power(base, exponent):
+    if type(base) is int and type(exponent) is int and exponent > 0 and base.bit_length() * exponent > CALC_MAX_INT_BITS:
+        raise CalculationError("Слишком большое число.", "too_large")
+    return base ** exponent
+
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: checked_multiply,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: checked_power,
+}
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+class CompiledExpression:
+    """Выражение, один раз разобранное в дерево замыканий.
+
+    Допускаются только числа, переменные, скобки, унарные +/- и операции
+    + - * / // **. Размер целых чисел, глубина вложенности и время вычисления
+    ограничены, поэтому входы вроде 9**9**9 завершаются ошибкой, а не зависанием."""
+
+    __slots__ = ("source", "variables", "_evaluate")
+
+    def __init__(self, source):
+        if len(source) > CALC_MAX_LENGTH:
+            raise CalculationError("Слишком длинное выражение.", "too_long")
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except (RecursionError, MemoryError):
+            raise CalculationError("Слишком глубокая вложенность выражения.", "too_deep")
+        self.source = source
+        self.variables = set()
+        self._evaluate = self._compile(tree.body, 0)
+
+    def _compile(self, node, depth):
+        if depth > CALC_MAX_DEPTH:
+            raise CalculationError("Слишком глубокая вложенность выражения.", "too_deep")
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            value = node.value
+            if type(value) is int and value.bit_length() > CALC_MAX_INT_BITS:
+                raise CalculationError("Слишком большое число.", "too_large")
+            return lambda context: value
+        if isinstance(node, ast.Name):
+            name = node.id
+            self.variables.add(name)
+            return lambda context: context.variables[name]
+        if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+            apply = UNARY_OPERATORS[type(node.op)]
+            operand = self._compile(node.operand, depth + 1)
+            return lambda context: apply(operand(context))
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            apply = BINARY_OPERATORS[type(node.op)]
+            left = self._compile(node.left, depth + 1)
+            right = self._compile(node.right, depth + 1)
+
+            def evaluate(context):
+                if time.perf_counter() > context.deadline:
+                    raise CalculationError("Превышено время вычисления.", "timeout")
+                return apply(left(context), right(context))
+            return evaluate
+        raise CalculationError("Недопустимая операция в выражении.", "unsupported")
+
+    def evaluate(self, variables=None, time_limit=CALC_TIME_LIMIT):
+        variables = variables or {}
+        for name in self.variables:
+            if name not in variables:
+                raise CalculationError(f"Не задано значение переменной {name}.", "unbound_variable")
+        result = self._evaluate(EvaluationContext(variables, time.perf_counter() + time_limit))
+        if isinstance(result, complex):
+            raise CalculationError("Результат не является действительным числом.", "not_real")
+        return result
+
+
+@functools.lru_cache(maxsize=CALC_CACHE_SIZE)
+def compile_expression(expression):
+    """Компилирует выражение; повторные вызовы берут результат из LRU-кэша."""
+    return CompiledExpression(expression)
+
+
+CalculationResult = namedtuple("CalculationResult", "expression value error message")
+CalculationResult.__doc__ = """Результат вычисления одного выражения: value при успехе,
+либо код ошибки error и сообщение message."""
+
+CALC_ALLOWED_CHARS = frozenset("0123456789+-*/.() ")
+CALC_NUMBER_RE = re.compile(r"\d+(?:\.\d*)?|\.\d+")
+CALC_BATCH_CHUNK_SIZE = 1024
+CALC_VECTORIZE_MIN_ROWS = 32
+# Файлы меньше этого размера считаются в одном процессе: запуск пула дольше самих вычислений.
+CALC_PARALLEL_MIN_BYTES = 1024 * 1024
+
+
+def failed_result(expression, error):
+    if isinstance(error, ZeroDivisionError):
+        return CalculationResult(expression, None, "division_by_zero", "Деление на ноль невозможно.")
+    if isinstance(error, OverflowError):
+        return CalculationResult(expression, None, "too_large", "Слишком большое число.")
+    if isinstance(error, CalculationError):
+        return CalculationResult(expression, None, error.code, str(error))
+    if isinstance(error, SyntaxError):
+        return CalculationResult(expression, None, "syntax", f"Некорректное выражение ({error}).")
+    return CalculationResult(expression, None, "invalid", f"Некорректное выражение ({error}).")
+
+
+def evaluate_expression(expression, variables=None, allow_variables=False):
+    """Вычисляет выражение и всегда возвращает CalculationResult, а не исключение."""
+    try:
+        if not allow_variables and not CALC_ALLOWED_CHARS.issuperset(expression):
+            raise CalculationError("Выражение содержит недопустимые символы.", "invalid_characters")
+        return CalculationResult(expression, compile_expression(expression).evaluate(variables), None, None)
+    except Exception as e:
+        return failed_result(expression, e)
+
+
+def expression_template(expression):
+    """Заменяет числа в выражении переменными _0, _1, ...: "1+2.5*3" -> ("_0+_1*_2", [1, 2.5, 3]).
+    Выражения с одинаковым шаблоном можно вычислить одним векторным проходом."""
+    if not CALC_ALLOWED_CHARS.issuperset(expression):
+        return None, None
+    values = []
+
+    def placeholder(match):
+        text = match.group()
+        values.append(float(text) if "." in text else int(text))
+        return f"_{len(values) - 1}"
+    return CALC_NUMBER_RE.sub(placeholder, expression), values
+
+
+CALC_FLOAT_EXACT_INT = 2 ** 53
+
+
+@functools.lru_cache(maxsize=CALC_CACHE_SIZE)
+def float_template(template, float_names):
+    """Истина, если в шаблоне каждая операция выполняется над float: хотя бы один
+    операнд — float (переменная из float_names или результат такой операции) либо
+    это деление "/". Тогда вычисление в float64 повторяет построчное; целые
+    операции (7//2, 2**60+1) точны только в int и векторно не считаются. Степень
+    тоже не векторизуется: np.power может отличаться от pow в последнем знаке."""
+    def kind(node):
+        if isinstance(node, ast.Name):
+            return float if node.id in float_names else int
+        if isinstance(node, ast.UnaryOp):
+            operand = kind(node.operand)
+            if isinstance(node.op, ast.UAdd) or (isinstance(node.op, ast.USub) and operand is float):
+                return operand
+            # -0 в int — это 0, а в float64 — -0.0: отрицание целого считается построчно.
+            return None
+        if isinstance(node, ast.BinOp) and not isinstance(node.op, ast.Pow):
+            left, right = kind(node.left), kind(node.right)
+            if left and right and (float in (left, right) or isinstance(node.op, ast.Div)):
+                return float
+        return None
+    try:
+        return kind(ast.parse(template, mode="eval").body) is float
+    except (SyntaxError, RecursionError, MemoryError):
+        return False
+
+
+def exact_in_float(values):
+    """Все целые значения строки без потерь представимы в float64."""
+    return all(type(value) is float or abs(value) <= CALC_FLOAT_EXACT_INT for value in values)
+
+
+def vectorized_values(compiled, columns, count):
+    """Вычисляет выражение над массивами NumPy. Возвращает список float,
+    где None стоит на месте строк с нечисловым результатом (деление на ноль и т. п.)."""
+    with np.errstate(all="ignore"):
+        values = compiled.evaluate({name: np.asarray(column, dtype=np.float64) for name, column in columns.items()})
+    values = np.broadcast_to(np.asarray(values, dtype=np.float64), (count,))
+    finite = np.isfinite(values)
+    return [value if ok else None for value, ok in zip(values.tolist(), finite.tolist())]
+
+
+def evaluate_chunk(expressions, vectorize=False):
+    """Вычисляет пачку выражений по порядку. При vectorize=True выражения с общим
+    шаблоном и дробным результатом (см. float_template) считаются одним векторным
+    проходом в float64; целочисленные выражения, строки с целыми больше 2**53 и
+    строки, которые не дали конечного числа, считаются по одной, поэтому результаты
+    совпадают с evaluate_expression."""
+    results = [None] * len(expressions)
+    if vectorize and np is not None:
+        groups = {}
+        for position, expression in enumerate(expressions):
+            template, values = expression_template(expression)
+            if template is not None and exact_in_float(values):
+                float_names = frozenset(f"_{i}" for i, value in enumerate(values) if type(value) is float)
+                groups.setdefault((template, float_names), []).append((position, values))
+        for (template, float_names), rows in groups.items():
+            if len(rows) < CALC_VECTORIZE_MIN_ROWS or not float_template(template, float_names):
+                continue
+            try:
+                compiled = compile_expression(template)
+                columns = {f"_{i}": [values[i] for _, values in rows] for i in range(len(rows[0][1]))}
+                values = vectorized_values(compiled, columns, len(rows))
+            except Exception:
+                continue
+            for (position, _), value in zip(rows, values):
+                if value is not None:
+                    results[position] = CalculationResult(expressions[position], value, None, None)
+    for position, expression in enumerate(expressions):
+        if results[position] is None:
+            results[position] = evaluate_expression(expression)
+    return results
+
+
+class Calculator:
+    def __init__(self):
+        pass
+
+    @measured
+    def calculate(self, expression):
+        result = evaluate_expression(expression)
+        if result.error:
+            return f"Ошибка: {result.message}"
+        return result.value
+
+    def calculate_batch(self, expressions, workers=None, chunk_size=CALC_BATCH_CHUNK_SIZE, vectorize=False):
+        """Потоково вычисляет выражения из любого итерируемого источника и отдаёт
+        CalculationResult в исходном порядке. При workers > 1 пачки выражений
+        распределяются по пулу процессов; одновременно в работе держится не больше
+        нескольких пачек на процесс, поэтому вход не читается в память целиком."""
+        chunks = iter_chunks(expressions, chunk_size)
+        if not workers or workers <= 1:
+            for chunk in chunks:
+                yield from evaluate_chunk(chunk, vectorize)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for window in iter_chunks(chunks, workers * 4):
+                for results in executor.map(evaluate_chunk, window, [vectorize] * len(window)):
+                    yield from results
+
+    def calculate_file(self, path, workers=None, vectorize=False):
+        """Вычисляет выражения из текстового файла, по одному на строку (пустые строки пропускаются).
+        Пул процессов запускается только для файлов от CALC_PARALLEL_MIN_BYTES."""
+        with open(path, "r") as file:
+            if os.fstat(file.fileno()).st_size < CALC_PARALLEL_MIN_BYTES:
+                workers = None
+            expressions = (line.strip() for line in file if line.strip())
+            yield from self.calculate_batch(expressions, workers=workers, vectorize=vectorize)
+
+    @measured
+    def calculate_many(self, expressions):
+        """Вычисляет список выражений; одинаковые выражения компилируются один раз."""
+        return list(self.calculate_batch(expressions))
+
+    def calculate_bindings(self, expression, bindings):
+        """Вычисляет одно выражение с переменными для каждого словаря значений из bindings."""
+        return [evaluate_expression(expression, variables, allow_variables=True) for variables in bindings]
+
+    @staticmethod
+    def _float_columns(expression, columns):
+        float_names = set()
+        for name, column in columns.items():
+            array = np.asarray(column)
+            if array.dtype.kind == "f":
+                float_names.add(name)
+            elif array.dtype.kind not in "iu" or (array.size and np.abs(array).max() > CALC_FLOAT_EXACT_INT):
+                return False
+        return float_template(expression, frozenset(float_names))
+
+    def calculate_vectorized(self, expression, columns):
+        """Вычисляет выражение над столбцами значений переменных {имя: последовательность}.
+        С NumPy выражение с дробным результатом (см. float_template) считается одним
+        векторным проходом в float64, остальные — построчно, как evaluate_expression."""
+        names = list(columns)
+        count = len(columns[names[0]]) if names else 1
+        if np is None or not self._float_columns(expression, columns):
+            return self.calculate_bindings(expression, ({name: columns[name][i] for name in names} for i in range(count)))
+        try:
+            values = vectorized_values(compile_expression(expression), columns, count)
+        except Exception as e:
+            return [failed_result(expression, e)] * count
+        return [
+            CalculationResult(expression, value, None, None) if value is not None
+            else evaluate_expression(expression, {name: columns[name][i] for name in names}, allow_variables=True)
+            for i, value in enumerate(values)
+        ]
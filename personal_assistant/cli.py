@@ -0,0 +1,106 @@
+"""Командная строка: меню, сервис, перенос в SQLite, преобразование форматов и экспорт."""
+import argparse
+import os
+import sys
+
+from .common import SERVICE_ADDRESS, STORES, open_manager
+from .metrics import METRICS, PROFILER, Profiler
+from .presenter import OUTPUT_FORMATS, Presenter
+from .storage import STORAGE_BACKENDS
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="personal_assistant", description="Персональный помощник.")
+    parser.add_argument(
+        "--storage", choices=sorted(STORAGE_BACKENDS), default=os.environ.get("PA_STORAGE", "json"),
+        help="тип хранилища (по умолчанию PA_STORAGE или json)",
+    )
+    parser.add_argument(
+        "--output", choices=OUTPUT_FORMATS, default=os.environ.get("PA_OUTPUT", "text"),
+        help="формат вывода списков в меню",
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=int(os.environ.get("PA_PAGE_SIZE", 0)),
+        help="строк на страницу при выводе списков (0 — без разбиения)",
+    )
+    parser.add_argument(
+        "--metrics", action="store_true", default=METRICS.enabled,
+        help="собирать статистику операций (по умолчанию — если задана PA_METRICS)",
+    )
+    parser.add_argument("--metrics-file", help="при завершении сохранить статистику: .prom — Prometheus, иначе JSON")
+    parser.add_argument("--profile", choices=Profiler.MODES, help="профилировать всю работу и вывести отчёт при завершении")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("migrate-sqlite", help="перенести JSON-хранилища в SQLite")
+    convert_parser = commands.add_parser("convert", help="преобразовать хранилища в двоичные снимки или обратно в JSON")
+    convert_parser.add_argument("--to", dest="target", choices=["binary", "json"], required=True)
+    convert_parser.add_argument("stores", nargs="*", help=f"хранилища: {', '.join(STORES)} (по умолчанию все)")
+    serve_parser = commands.add_parser("serve", help="запустить сервис JSON Lines")
+    serve_parser.add_argument("address", nargs="?", default=SERVICE_ADDRESS, help="путь к Unix-сокету или хост:порт")
+    export_parser = commands.add_parser("export", help="выгрузить хранилище в CSV")
+    export_parser.add_argument("store", choices=list(STORES))
+    export_parser.add_argument("csv_file", help="файл CSV; .gz и .zst включают сжатие")
+    export_parser.add_argument("--columns", help="столбцы через запятую")
+    export_parser.add_argument("--since", help="только записи, изменённые после ГГГГ-ММ-ДД[TЧЧ:ММ:СС]")
+    export_parser.add_argument("--compression", choices=["gzip", "zstd", "none"])
+    export_parser.add_argument("--open-only", action="store_true", help="задачи: только невыполненные")
+    export_parser.add_argument("--from", dest="start_date", help="финансы: с даты ДД-ММ-ГГГГ")
+    export_parser.add_argument("--to", dest="end_date", help="финансы: по дату ДД-ММ-ГГГГ")
+    export_parser.add_argument("--category", help="финансы: только эта категория")
+    return parser
+
+
+def export_store(args):
+    options = {}
+    if args.store == "tasks":
+        options["open_only"] = args.open_only
+    elif args.store == "finance":
+        options.update(start_date=args.start_date, end_date=args.end_date, category=args.category)
+    manager = open_manager(args.store, args.storage)
+    columns = [column.strip() for column in args.columns.split(",")] if args.columns else None
+    manager.export_to_csv(args.csv_file, columns=columns, since=args.since, compression=args.compression, **options)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    METRICS.enabled = args.metrics or bool(args.metrics_file)
+    if args.profile:
+        PROFILER.start(args.profile, all_threads=args.command == "serve")
+    try:
+        run_command(args)
+    finally:
+        if PROFILER.running:
+            print(PROFILER.stop(), file=sys.stderr)
+        if args.metrics_file:
+            METRICS.dump(args.metrics_file)
+
+
+def run_command(args):
+    if args.command == "migrate-sqlite":
+        from .sqlite import migrate_to_sqlite
+
+        migrate_to_sqlite()
+    elif args.command == "convert":
+        from .binary import convert_stores
+
+        try:
+            convert_stores(args.target, args.stores)
+        except ValueError as e:
+            sys.exit(f"Ошибка: {e}.")
+    elif args.command == "serve":
+        import asyncio
+        from .service import serve
+
+        try:
+            asyncio.run(serve(args.address, args.storage))
+        except KeyboardInterrupt:
+            print("Сервис остановлен.")
+    elif args.command == "export":
+        try:
+            export_store(args)
+        except ValueError as e:
+            sys.exit(f"Ошибка: {e}.")
+    else:
+        from .app import PersonalAssistant
+
+        presenter = Presenter(output_format=args.output, page_size=args.page_size or None)
+        PersonalAssistant(storage_backend=args.storage, presenter=presenter).run()
@@ -0,0 +1,165 @@
+"""Общие константы, разбор дат и денежных сумм, реестр хранилищ."""
+import functools
+import importlib
+import sys
+from datetime import datetime
+
+
+CSV_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 20
+DATE_FORMAT = "%d-%m-%Y"
+# Разных дат в хранилищах немного, а разбираются они при каждой загрузке.
+DATE_CACHE_SIZE = 64 * 1024
+FLUSH_DELAY = 0.5
+EXPORT_BUFFER_SIZE = 1024 * 1024
+EXPORT_GZIP_LEVEL = 6
+EXPORT_COMPRESSION = {".gz": "gzip", ".zst": "zstd"}
+# Суммы хранятся целым числом минимальных единиц (копеек, центов).
+MONEY_DIGITS = 2
+MONEY_SCALE = 10 ** MONEY_DIGITS
+
+
+def intern_string(value):
+    """Повторяющиеся строковые поля (приоритеты, категории, даты) хранятся
+    в общей таблице интернирования, чтобы одинаковые значения не дублировались."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def now_timestamp():
+    """Время изменения записи (updated_at) в ISO-формате с точностью до секунды."""
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def parse_timestamp(value):
+    """Приводит дату или дату со временем в ISO-формате к виду updated_at."""
+    try:
+        return datetime.fromisoformat(value.strip()).isoformat(timespec="seconds")
+    except (AttributeError, ValueError):
+        raise ValueError(f"некорректная метка времени '{value}', ожидается ГГГГ-ММ-ДД или ГГГГ-ММ-ДДTЧЧ:ММ:СС")
+
+
+class InvalidDateError(ValueError):
+    pass
+
+
+class ChangeConflict(ValueError):
+    """Изменение записи отменено: ту же запись успел изменить другой процесс."""
+
+    def __init__(self, record_id):
+        super().__init__(f"запись с ID {record_id} изменена другим процессом, изменение отменено")
+        self.record_id = record_id
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def _date_ordinal(value):
+    return datetime.strptime(value.strip(), DATE_FORMAT).toordinal()
+
+
+def parse_date(value):
+    """Переводит дату ДД-ММ-ГГГГ в порядковый номер дня (date.toordinal).
+    Результаты кэшируются: strptime заметно дороже поиска в кэше."""
+    try:
+        return _date_ordinal(value)
+    except (AttributeError, TypeError, ValueError):
+        raise InvalidDateError(f"некорректная дата '{value}', ожидается ДД-ММ-ГГГГ")
+
+
+def parse_date_or_none(value):
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+def to_minor_units(value, exact=True):
+    """Переводит сумму (строку, int, float или Decimal) в целое число минимальных
+    единиц без ошибок округления: float берётся по его десятичной записи (repr).
+    Сумма точнее MONEY_DIGITS знаков — ValueError, а при exact=False она
+    округляется до ближайшей единицы (к чётной)."""
+    # decimal нужен только при разборе и выводе сумм, поэтому не загружается при старте.
+    from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
+
+    number = value
+    if isinstance(value, float):
+        number = repr(value)
+    elif isinstance(value, str):
+        number = value.strip().replace(",", ".")
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        number = Decimal(number)
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(f"некорректная сумма '{value}'")
+    if not number.is_finite():
+        raise ValueError(f"некорректная сумма '{value}'")
+    units = number.scaleb(MONEY_DIGITS)
+    rounded = units.to_integral_value(rounding=ROUND_HALF_EVEN)
+    if exact and rounded != units:
+        raise ValueError(f"сумма '{value}' задана точнее {MONEY_DIGITS} знаков после запятой")
+    return int(rounded)
+
+
+def from_minor_units(units):
+    """Decimal с MONEY_DIGITS знаками после запятой: 12345 -> Decimal('123.45')."""
+    from decimal import Decimal
+
+    return Decimal(units).scaleb(-MONEY_DIGITS)
+
+
+def format_money(units, currency=None):
+    text = str(from_minor_units(units))
+    return f"{text} {currency}" if currency else text
+
+
+def parse_currency(value):
+    """Код валюты ISO 4217 (три буквы) в верхнем регистре; пустое значение — None."""
+    if value is None or not value.strip():
+        return None
+    code = value.strip().upper()
+    if len(code) != 3 or not code.isalpha():
+        raise ValueError(f"некорректный код валюты '{value}', ожидается три буквы, например RUB")
+    return code
+
+
+def iter_chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+SERVICE_ADDRESS = "assistant.sock"
+
+# Хранилища: имя (оно же модуль пакета) -> (класс менеджера, файл по умолчанию).
+STORES = {
+    "notes": ("NotesManager", "notes.json"),
+    "tasks": ("TasksManager", "tasks.json"),
+    "contacts": ("ContactsManager", "contacts.json"),
+    "finance": ("FinanceManager", "finance.json"),
+}
+
+
+def manager_class(store):
+    """Класс менеджера хранилища; его модуль импортируется при первом обращении."""
+    class_name, _ = STORES[store]
+    return getattr(importlib.import_module(f".{store}", __package__), class_name)
+
+
+def upgrade_records(store, records):
+    """Приводит записи старого формата к текущему перед переносом в другое хранилище.
+    Модуль хранилища может объявить для этого функцию upgrade_records(records)."""
+    if store not in STORES:
+        return records
+    upgrade = getattr(importlib.import_module(f".{store}", __package__), "upgrade_records", None)
+    return upgrade(records) if upgrade else records
+
+
+def open_manager(store, storage_backend="json", filename=None):
+    from .storage import make_storage
+
+    filename = filename or STORES[store][1]
+    return manager_class(store)(filename, storage=make_storage(filename, storage_backend))
@@ -0,0 +1,271 @@
+"""Контакты: модель, индекс подстрок и менеджер."""
+import re
+from collections import defaultdict
+
+from .common import intern_string, now_timestamp
+from .csv_io import export_csv_rows, require_fields
+from .metrics import METRICS, measured
+from .storage import JsonStorage, StoreManager, next_free_id
+
+
+class Contact:
+    __slots__ = ("id", "name", "phone", "email", "updated_at")
+    FIELDS = __slots__
+
+    def __init__(self, contact_id, name, phone, email, updated_at=None):
+        self.id = contact_id
+        self.name = name
+        self.phone = phone
+        self.email = email
+        self.updated_at = intern_string(updated_at)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "phone": self.phone,
+            "email": self.email,
+            "updated_at": self.updated_at
+        }
+
+    @staticmethod
+    def from_dict(data):
+        return Contact(
+            contact_id=data["id"],
+            name=data["name"],
+            phone=data["phone"],
+            email=data["email"],
+            updated_at=data.get("updated_at")
+        )
+
+
+class NgramIndex:
+    """Индекс подстрок по n-граммам длины N.
+
+    Для запроса длиной от N символов пересекаются множества по n-граммам запроса
+    (начиная с самого маленького), а кандидаты проверяются прямым вхождением
+    подстроки. Более короткие запросы проверяются перебором ключей: хранить
+    для них 1- и 2-граммы втрое дороже при построении, а выигрыш невелик."""
+
+    N = 3
+
+    def __init__(self):
+        self.grams = defaultdict(set)
+        self.keys = {}
+
+    def _grams(self, key):
+        return {key[i:i + self.N] for i in range(len(key) - self.N + 1)}
+
+    def add(self, item_id, key):
+        if not key:
+            return
+        self.keys[item_id] = key
+        grams = self.grams
+        for gram in self._grams(key):
+            grams[gram].add(item_id)
+
+    def remove(self, item_id):
+        key = self.keys.pop(item_id, None)
+        if key is None:
+            return
+        for gram in self._grams(key):
+            ids = self.grams[gram]
+            ids.discard(item_id)
+            if not ids:
+                del self.grams[gram]
+
+    def find(self, query):
+        if not query:
+            return set()
+        if len(query) < self.N:
+            found = {item_id for item_id, key in self.keys.items() if query in key}
+            METRICS.count_records("NgramIndex.find", len(self.keys), len(found))
+            return found
+        sets = sorted(
+            (self.grams.get(query[i:i + self.N], set()) for i in range(len(query) - self.N + 1)),
+            key=len
+        )
+        candidates = set(sets[0])
+        for ids in sets[1:]:
+            if not candidates:
+                break
+            candidates &= ids
+        found = {item_id for item_id in candidates if query in self.keys[item_id]}
+        METRICS.count_records("NgramIndex.find", len(candidates), len(found))
+        return found
+
+
+PHONE_QUERY = re.compile(r"[\d\s+()-]*\d[\d\s+()-]*")
+
+
+def phone_key(phone):
+    return re.sub(r"\D", "", phone)
+
+
+class ContactsIndex:
+    """Поиск контактов по подстроке имени, телефона (только цифры) и email.
+
+    Индекс строится при первом поиске, а не при каждой загрузке: contacts —
+    живое представление контактов менеджера (например, dict.values()), поэтому
+    изменения до построения индекса учитывать не нужно."""
+
+    # Вес поля при ранжировании: совпадение в имени важнее, чем в телефоне или почте.
+    FIELD_WEIGHTS = {"name": 3, "phone": 2, "email": 1}
+
+    def __init__(self, contacts=()):
+        self.contacts = contacts
+        self.fields = None
+
+    def _build(self):
+        self.fields = {field: NgramIndex() for field in self.FIELD_WEIGHTS}
+        for contact in self.contacts:
+            self.add(contact)
+
+    @staticmethod
+    def _keys(contact):
+        return {
+            "name": contact.name.lower(),
+            "phone": phone_key(contact.phone),
+            "email": contact.email.lower(),
+        }
+
+    def add(self, contact):
+        if self.fields is None:
+            return
+        for field, key in self._keys(contact).items():
+            self.fields[field].add(contact.id, key)
+
+    def remove(self, contact_id):
+        if self.fields is None:
+            return
+        for index in self.fields.values():
+            index.remove(contact_id)
+
+    def update(self, contact):
+        self.remove(contact.id)
+        self.add(contact)
+
+    @staticmethod
+    def _match_quality(key, query):
+        if key == query:
+            return 3
+        if key.startswith(query):
+            return 2
+        if any(word.startswith(query) for word in key.split()):
+            return 1.5
+        return 1
+
+    def search(self, query):
+        """Возвращает id контактов, упорядоченные по качеству совпадения.
+        По телефону ищется только запрос, похожий на номер: цифры, пробелы и +()-."""
+        queries = {
+            "name": query.strip().lower(),
+            "email": query.strip().lower(),
+        }
+        if PHONE_QUERY.fullmatch(query.strip()):
+            queries["phone"] = phone_key(query)
+        if self.fields is None:
+            self._build()
+        scores = {}
+        for field, field_query in queries.items():
+            index = self.fields[field]
+            for contact_id in index.find(field_query):
+                score = self._match_quality(index.keys[contact_id], field_query) * self.FIELD_WEIGHTS[field]
+                scores[contact_id] = max(scores.get(contact_id, 0), score)
+        return sorted(scores, key=lambda contact_id: (-scores[contact_id], contact_id))
+
+
+class ContactsManager(StoreManager):
+    record_class = Contact
+    items_attribute = "contacts"
+
+    def __init__(self, filename="contacts.json", storage=None):
+        self.filename = filename
+        self.storage = storage or JsonStorage(filename)
+        self.reload()
+
+    def reload(self):
+        self.contacts = self.load_contacts()
+        self.next_id = next_free_id(self.contacts, self.storage.load_meta())
+        self.index = ContactsIndex(self.contacts.values())
+
+    @measured
+    def load_contacts(self):
+        return self.load_items()
+
+    def _add_contact(self, contact):
+        self.contacts[contact.id] = contact
+        self.index.add(contact)
+        self.next_id = max(self.next_id, contact.id + 1)
+
+    @measured
+    def save_contacts(self):
+        self.storage.save(self.snapshot())
+
+    @measured
+    def add_contact(self, name, phone, email):
+        contact_id = self.next_id
+        contact = Contact(contact_id, name, phone, email, updated_at=now_timestamp())
+        self._add_contact(contact)
+        stored = self._log_change("create", contact.to_dict())
+        contact = self.contacts[stored["id"]]
+        print(f"Контакт с ID {contact.id} добавлен.")
+        return contact
+
+    def list_contacts(self):
+        return self.contacts.values()
+
+    @measured
+    def find_contacts(self, query):
+        """Контакты, подходящие под запрос, лучшие совпадения первыми."""
+        return [self.contacts[contact_id] for contact_id in self.index.search(query)]
+
+    @measured
+    def edit_contact(self, contact_id, name=None, phone=None, email=None):
+        contact = self.find_contact_by_id(contact_id)
+        if contact:
+            base = contact.to_dict()
+            if name:
+                contact.name = name
+            if phone:
+                contact.phone = phone
+            if email:
+                contact.email = email
+            contact.updated_at = now_timestamp()
+            self.index.update(contact)
+            self._log_change("edit", contact.to_dict(), base)
+            print(f"Контакт с ID {contact_id} обновлён.")
+            return contact
+        else:
+            print(f"Контакт с ID {contact_id} не найден.")
+
+    @measured
+    def delete_contact(self, contact_id):
+        contact = self.find_contact_by_id(contact_id)
+        if contact:
+            del self.contacts[contact_id]
+            self.index.remove(contact_id)
+            self.storage.save_meta({"next_id": self.next_id})
+            self._log_change("delete", {"id": contact_id}, contact.to_dict())
+            print(f"Контакт с ID {contact_id} удалён.")
+            return contact
+        else:
+            print(f"Контакт с ID {contact_id} не найден.")
+
+    @staticmethod
+    def contact_from_row(contact_id, row):
+        name, phone, email = require_fields(row, "name", "phone", "email")
+        return Contact(contact_id, name, phone, email, updated_at=now_timestamp())
+
+    @measured
+    def import_from_csv(self, csv_file, save_every=None):
+        return self._import_csv(csv_file, self.contact_from_row, self._add_contact, save_every)
+
+    @measured
+    def export_to_csv(self, csv_file, columns=None, since=None, compression=None):
+        count = export_csv_rows(csv_file, self.contacts.values(), Contact.FIELDS, columns, since, compression)
+        print(f"Контакты экспортированы в файл {csv_file} ({count}).")
+        return count
+
+    def find_contact_by_id(self, contact_id):
+        return self.contacts.get(contact_id)
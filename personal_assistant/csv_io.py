@@ -0,0 +1,131 @@
+"""Пакетный импорт из CSV и потоковый экспорт в CSV."""
+import csv
+import io
+import operator
+import os
+
+from .common import (
+    CSV_CHUNK_SIZE,
+    EXPORT_BUFFER_SIZE,
+    EXPORT_COMPRESSION,
+    EXPORT_GZIP_LEVEL,
+    iter_chunks,
+    parse_timestamp,
+)
+from .metrics import METRICS
+
+
+class ImportReport:
+    """Итог пакетного импорта: число добавленных строк и ошибки по строкам."""
+
+    def __init__(self):
+        self.imported = 0
+        self.errors = []
+
+    def add_error(self, line_number, message):
+        self.errors.append((line_number, message))
+
+    def to_dict(self):
+        return {"imported": self.imported, "errors": [list(error) for error in self.errors]}
+
+
+def require_fields(row, *fields):
+    values = []
+    for field in fields:
+        value = row.get(field)
+        if value is None:
+            raise ValueError(f"отсутствует поле '{field}'")
+        values.append(value)
+    return values
+
+
+def read_csv_chunks(csv_file, chunk_size=CSV_CHUNK_SIZE):
+    """Построчно читает CSV и отдаёт пачки пар (номер строки, строка)."""
+    with open(csv_file, "r", newline="") as file:
+        if METRICS.enabled:
+            METRICS.count_read(csv_file, os.fstat(file.fileno()).st_size)
+        reader = csv.DictReader(file)
+        chunk = []
+        for row in reader:
+            chunk.append((reader.line_num, row))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def import_csv_rows(csv_file, row_to_item, new_id, add_item, save, save_every=None):
+    """Пакетный импорт: id для каждой строки даёт new_id() (add_item сдвигает
+    счётчик менеджера), строки проверяются пачками, а хранилище сохраняется один
+    раз в конце (или каждые save_every строк). Ошибочные строки не прерывают
+    импорт, а попадают в отчёт."""
+    report = ImportReport()
+    unsaved = 0
+    for chunk in read_csv_chunks(csv_file):
+        for line_number, row in chunk:
+            try:
+                item = row_to_item(new_id(), row)
+            except ValueError as e:
+                report.add_error(line_number, str(e))
+                continue
+            add_item(item)
+            unsaved += 1
+            report.imported += 1
+            if save_every and unsaved >= save_every:
+                save()
+                unsaved = 0
+    if unsaved:
+        save()
+    return report
+
+
+def open_export(csv_file, compression=None):
+    """Открывает файл экспорта для записи текста через буфер EXPORT_BUFFER_SIZE.
+    Сжатие (gzip, zstd или none) задаётся явно или по расширению: .gz, .zst."""
+    if compression is None:
+        compression = EXPORT_COMPRESSION.get(os.path.splitext(csv_file)[1], "none")
+    if compression == "gzip":
+        import gzip
+
+        stream = gzip.GzipFile(csv_file, "wb", compresslevel=EXPORT_GZIP_LEVEL)
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("для сжатия zstd нужен пакет zstandard")
+        stream = zstandard.ZstdCompressor().stream_writer(open(csv_file, "wb"))
+    elif compression == "none":
+        stream = open(csv_file, "wb", buffering=0)
+    else:
+        raise ValueError(f"неизвестный тип сжатия '{compression}'")
+    return io.TextIOWrapper(io.BufferedWriter(stream, EXPORT_BUFFER_SIZE), encoding="utf-8", newline="")
+
+
+def export_csv_rows(csv_file, items, fields, columns=None, since=None, compression=None):
+    """Потоково пишет объекты моделей в CSV: значения берутся прямо из атрибутов,
+    без промежуточных словарей, и записываются пачками по CSV_CHUNK_SIZE строк.
+    columns — подмножество fields в нужном порядке; since — только записи,
+    изменённые позже этой метки времени. Возвращает число записанных строк."""
+    columns = list(columns or fields)
+    unknown = [column for column in columns if column not in fields]
+    if unknown:
+        raise ValueError(f"неизвестные столбцы: {', '.join(unknown)}")
+    # Отфильтрованный генератор (например, по категории) не знает исходного размера.
+    scanned = len(items) if hasattr(items, "__len__") else None
+    if since:
+        since = parse_timestamp(since)
+        items = (item for item in items if item.updated_at is not None and item.updated_at > since)
+    getter = operator.attrgetter(*columns)
+    rows = map(getter, items) if len(columns) > 1 else ((getter(item),) for item in items)
+    count = 0
+    with open_export(csv_file, compression) as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for chunk in iter_chunks(rows, CSV_CHUNK_SIZE):
+            writer.writerows(chunk)
+            count += len(chunk)
+    if METRICS.enabled:
+        METRICS.count_written(csv_file, os.path.getsize(csv_file))
+        METRICS.count_records("export_csv_rows", count if scanned is None else scanned, count)
+    return count
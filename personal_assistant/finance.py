@@ -0,0 +1,491 @@
+"""Финансовые записи: модель, колоночная агрегация, итоги и менеджер."""
+import bisect
+import functools
+import zlib
+from array import array
+from collections import namedtuple
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .common import (
+    DATE_FORMAT,
+    MONEY_DIGITS,
+    MONEY_SCALE,
+    format_money,
+    from_minor_units,
+    intern_string,
+    now_timestamp,
+    parse_currency,
+    parse_date,
+    parse_date_or_none,
+    to_minor_units,
+)
+from .csv_io import export_csv_rows, require_fields
+from .metrics import METRICS, measured
+from .storage import JsonStorage, StoreManager, next_free_id
+
+
+class FinanceRecord:
+    """Финансовая запись. Сумма хранится целым числом минимальных единиц
+    (amount_minor), поэтому итоги считаются точно; amount — та же сумма как
+    Decimal для вывода и CSV. currency — необязательный код валюты."""
+
+    __slots__ = ("id", "amount_minor", "currency", "category", "date", "description", "updated_at", "date_ordinal")
+    # Столбцы CSV-экспорта: сумма в нём десятичная, как в импорте.
+    FIELDS = ("id", "amount", "currency", "category", "date", "description", "updated_at")
+
+    def __init__(self, record_id, amount_minor, category, date, description, updated_at=None, currency=None,
+                 date_ordinal=None):
+        self.id = record_id
+        self.amount_minor = amount_minor
+        self.currency = intern_string(currency)
+        self.category = intern_string(category)
+        self.date = intern_string(date)
+        self.description = description
+        self.updated_at = intern_string(updated_at)
+        # Старые записи с некорректной датой загружаются, но не попадают в отчёты.
+        # Уже разобранную дату (при импорте) можно передать в date_ordinal.
+        self.date_ordinal = parse_date_or_none(date) if date_ordinal is None else date_ordinal
+
+    @property
+    def amount(self):
+        return from_minor_units(self.amount_minor)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "amount_minor": self.amount_minor,
+            "currency": self.currency,
+            "category": self.category,
+            "date": self.date,
+            "description": self.description,
+            "updated_at": self.updated_at
+        }
+
+    @staticmethod
+    def from_dict(data):
+        amount_minor = data.get("amount_minor")
+        if amount_minor is None:
+            # Старый формат: сумма числом с плавающей точкой.
+            amount_minor = to_minor_units(data["amount"], exact=False)
+        return FinanceRecord(
+            record_id=data["id"],
+            amount_minor=amount_minor,
+            category=data["category"],
+            date=data["date"],
+            description=data["description"],
+            updated_at=data.get("updated_at"),
+            currency=data.get("currency"),
+            date_ordinal=data.get("date_ordinal")
+        )
+
+
+def upgrade_records(records):
+    """Переводит суммы старого формата (amount числом с плавающей точкой) в amount_minor."""
+    return [FinanceRecord.from_dict(record).to_dict() for record in records]
+
+
+class FinanceColumns:
+    """Колоночное представление финансовых записей для агрегатов.
+
+    amounts — суммы в минимальных единицах, dates — порядковые номера дней
+    (0 у записей без корректной даты). Все суммы целочисленные и точные: с NumPy они
+    считаются векторными операциями над int64, без него — циклами по array."""
+
+    def __init__(self, records):
+        amounts = array("q")
+        dates = array("l")
+        for record in records:
+            amounts.append(record.amount_minor)
+            dates.append(record.date_ordinal or 0)
+        if np is not None:
+            self.amounts = np.array(amounts, dtype=np.int64)
+            self.dates = np.array(dates, dtype=np.int64)
+        else:
+            self.amounts = amounts
+            self.dates = dates
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @staticmethod
+    def _group_sums(keys, amounts):
+        """Суммы amounts по значениям keys: (ключи по возрастанию, суммы).
+        bincount с весами считает во float64, поэтому группы складываются
+        через сортировку и add.reduceat — в int64, без округления."""
+        order = np.argsort(keys, kind="stable")
+        keys, starts = np.unique(keys[order], return_index=True)
+        if not len(keys):
+            return keys, keys
+        return keys, np.add.reduceat(amounts[order], starts)
+
+    def daily_totals(self):
+        """Словарь {порядковый номер дня: сумма} по записям с корректной датой."""
+        if np is not None:
+            dated = self.dates > 0
+            days, totals = self._group_sums(self.dates[dated], self.amounts[dated])
+            return dict(zip(days.tolist(), totals.tolist()))
+        totals = {}
+        for amount, day in zip(self.amounts, self.dates):
+            if day:
+                totals[day] = totals.get(day, 0) + amount
+        return dict(sorted(totals.items()))
+
+
+class FinanceTotals:
+    """Текущие итоги по финансовым записям: баланс, суммы и количество записей
+    по категориям и по месяцам. Суммы — целые минимальные единицы, поэтому
+    итоги не накапливают ошибку округления. Обновляются за O(1) на каждое изменение.
+
+    checksum — сумма контрольных сумм записей, по которым посчитаны итоги.
+    Записи и итоги сохраняются не одной операцией (журнал пишется сразу, а
+    служебные данные — отложенно), поэтому после сбоя сохранённые итоги могут
+    отставать от записей при том же их числе; по checksum это обнаруживается."""
+
+    def __init__(self, balance=0, count=0, categories=None, months=None, checksum=0):
+        self.balance = balance
+        self.count = count
+        self.categories = categories or {}
+        self.months = months or {}
+        self.checksum = checksum
+
+    @staticmethod
+    def month_key(date_ordinal):
+        day = date.fromordinal(date_ordinal)
+        return f"{day.year:04d}-{day.month:02d}"
+
+    @staticmethod
+    def _bump(buckets, key, amount, count):
+        bucket = buckets.setdefault(key, [0, 0])
+        bucket[0] += amount
+        bucket[1] += count
+        if not bucket[1]:
+            del buckets[key]
+
+    @staticmethod
+    def record_checksum(record):
+        """Контрольная сумма полей записи, от которых зависят итоги."""
+        return zlib.crc32(f"{record.id}\x1f{record.amount_minor}\x1f{record.category}\x1f{record.date_ordinal}".encode())
+
+    @classmethod
+    def checksum_of(cls, records):
+        return sum(map(cls.record_checksum, records))
+
+    def add(self, record, sign=1):
+        amount = sign * record.amount_minor
+        self.balance += amount
+        self.count += sign
+        self.checksum += sign * self.record_checksum(record)
+        self._bump(self.categories, record.category, amount, sign)
+        if record.date_ordinal is not None:
+            self._bump(self.months, self.month_key(record.date_ordinal), amount, sign)
+
+    def remove(self, record):
+        self.add(record, -1)
+
+    @classmethod
+    def from_records(cls, records):
+        totals = cls()
+        for record in records:
+            totals.add(record)
+        return totals
+
+    def to_dict(self):
+        return {
+            "balance": self.balance, "count": self.count, "categories": self.categories, "months": self.months,
+            "checksum": self.checksum,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["balance"], data["count"], data["categories"], data["months"], data.get("checksum"))
+
+    def is_exact(self):
+        """Итоги в минимальных единицах; итоги старого формата (float) нужно пересчитать."""
+        return type(self.balance) is int and all(
+            type(total) is int for buckets in (self.categories, self.months) for total, _ in buckets.values()
+        )
+
+    def _bucket_drift(self, label, buckets, expected_buckets):
+        problems = []
+        for key in sorted(set(buckets) | set(expected_buckets)):
+            total, count = buckets.get(key, (0, 0))
+            expected_total, expected_count = expected_buckets.get(key, (0, 0))
+            if total != expected_total or count != expected_count:
+                problems.append(
+                    f"{label} {key}: {format_money(total)} ({count} зап.) "
+                    f"вместо {format_money(expected_total)} ({expected_count} зап.)"
+                )
+        return problems
+
+    def drift(self, expected):
+        """Список расхождений с эталонными итогами (пустой, если их нет)."""
+        problems = []
+        if self.balance != expected.balance:
+            problems.append(f"баланс: {format_money(self.balance)} вместо {format_money(expected.balance)}")
+        if self.count != expected.count:
+            problems.append(f"число записей: {self.count} вместо {expected.count}")
+        problems += self._bucket_drift("категория", self.categories, expected.categories)
+        problems += self._bucket_drift("месяц", self.months, expected.months)
+        return problems
+
+
+FinanceReport = namedtuple("FinanceReport", "start_date end_date records total")
+
+
+class FinanceManager(StoreManager):
+    record_class = FinanceRecord
+    items_attribute = "records"
+
+    def __init__(self, filename="finance.json", storage=None):
+        self.filename = filename
+        self.storage = storage or JsonStorage(filename)
+        self.reload()
+
+    def reload(self):
+        self.records = self.load_records()
+        meta = self.storage.load_meta()
+        self.next_id = next_free_id(self.records, meta)
+        self.totals = self.load_totals(meta)
+        self.date_index = sorted(
+            (record.date_ordinal, record.id) for record in self.records.values()
+            if record.date_ordinal is not None
+        )
+        self._columns = None
+        undated = len(self.records) - len(self.date_index)
+        if undated:
+            print(f"Предупреждение: {undated} финансовых записей с некорректной датой не попадут в отчёты.")
+
+    @measured
+    def load_records(self):
+        migrated = rounded = 0
+
+        def convert(data):
+            nonlocal migrated, rounded
+            record = FinanceRecord.from_dict(data)
+            if "amount_minor" not in data:
+                migrated += 1
+                # Деление int на int округляется корректно, поэтому совпадение
+                # означает, что float был ровно этой суммой в минимальных единицах.
+                if record.amount_minor / MONEY_SCALE != data["amount"]:
+                    rounded += 1
+            return record
+
+        records = self.load_items(convert)
+        if migrated:
+            # Новый формат попадёт в файл при следующем сохранении.
+            print(f"Суммы финансовых записей переведены в минимальные единицы: {migrated}.")
+        if rounded:
+            print(f"Предупреждение: округлено сумм, заданных точнее {MONEY_DIGITS} знаков после запятой: {rounded}.")
+        return records
+
+    def load_totals(self, meta):
+        if "totals" in meta:
+            totals = FinanceTotals.from_dict(meta["totals"])
+            if (
+                totals.is_exact() and totals.count == len(self.records)
+                and totals.checksum == FinanceTotals.checksum_of(self.records.values())
+            ):
+                return totals
+            if totals.is_exact():
+                print("Предупреждение: сохранённые итоги не соответствуют записям и пересчитаны заново.")
+            totals = FinanceTotals.from_records(self.records.values())
+            # Исправленные итоги сохраняются, чтобы не пересчитывать их при каждой загрузке.
+            self.storage.save_meta({"next_id": self.next_id, "totals": totals.to_dict()})
+            return totals
+        return FinanceTotals.from_records(self.records.values())
+
+    def meta(self):
+        return {"next_id": self.next_id, "totals": self.totals.to_dict()}
+
+    @property
+    def columns(self):
+        """Колоночное представление; строится при первом обращении после изменений."""
+        if self._columns is None:
+            self._columns = FinanceColumns(self.records.values())
+        return self._columns
+
+    def _index_record(self, record, bulk=False):
+        """bulk — пакетное добавление: пара (дата, id) дописывается в конец,
+        а date_index сортируется один раз после пакета (см. import_from_csv)."""
+        self._columns = None
+        self.totals.add(record)
+        if record.date_ordinal is not None:
+            if bulk:
+                self.date_index.append((record.date_ordinal, record.id))
+            else:
+                bisect.insort(self.date_index, (record.date_ordinal, record.id))
+
+    def _unindex_record(self, record):
+        self._columns = None
+        self.totals.remove(record)
+        if record.date_ordinal is not None:
+            del self.date_index[bisect.bisect_left(self.date_index, (record.date_ordinal, record.id))]
+
+    def _add_record(self, record, bulk=False):
+        self.records[record.id] = record
+        self._index_record(record, bulk)
+        self.next_id = max(self.next_id, record.id + 1)
+
+    def records_between(self, start_ordinal, end_ordinal):
+        """Записи с датой в диапазоне [start, end] в хронологическом порядке."""
+        start = bisect.bisect_left(self.date_index, (start_ordinal,))
+        end = bisect.bisect_left(self.date_index, (end_ordinal + 1,))
+        return [self.records[record_id] for _, record_id in self.date_index[start:end]]
+
+    @measured
+    def save_records(self):
+        self.storage.save(self.snapshot())
+        self.storage.save_meta(self.meta())
+
+    @measured
+    def add_record(self, amount, category, date, description, currency=None):
+        """amount — сумма в основных единицах (строка, число или Decimal), не точнее копейки.
+        Некорректные сумма, валюта или дата — ValueError."""
+        amount_minor = to_minor_units(amount)
+        currency = parse_currency(currency)
+        date_ordinal = parse_date(date)
+        record_id = self.next_id
+        record = FinanceRecord(
+            record_id, amount_minor, category, date, description, updated_at=now_timestamp(), currency=currency,
+            date_ordinal=date_ordinal,
+        )
+        self._add_record(record)
+        stored = self._log_change("create", record.to_dict())
+        record = self.records[stored["id"]]
+        self.storage.save_meta(self.meta())
+        print(f"Финансовая запись с ID {record.id} добавлена.")
+        return record
+
+    @measured
+    def edit_record(self, record_id, amount=None, category=None, date=None, description=None, currency=None):
+        """Некорректные сумма, валюта или дата — ValueError, запись не меняется."""
+        record = self.find_record_by_id(record_id)
+        if not record:
+            print(f"Финансовая запись с ID {record_id} не найдена.")
+            return
+        amount_minor = record.amount_minor if amount is None else to_minor_units(amount)
+        currency = parse_currency(currency) if currency else record.currency
+        date_ordinal = parse_date(date) if date else record.date_ordinal
+        base = record.to_dict()
+        self._unindex_record(record)
+        record.amount_minor = amount_minor
+        record.currency = intern_string(currency)
+        if category:
+            record.category = intern_string(category)
+        if date:
+            record.date = intern_string(date)
+            record.date_ordinal = date_ordinal
+        if description:
+            record.description = description
+        record.updated_at = now_timestamp()
+        self._index_record(record)
+        self._log_change("edit", record.to_dict(), base)
+        self.storage.save_meta(self.meta())
+        print(f"Финансовая запись с ID {record_id} обновлена.")
+        return record
+
+    @measured
+    def delete_record(self, record_id):
+        record = self.find_record_by_id(record_id)
+        if not record:
+            print(f"Финансовая запись с ID {record_id} не найдена.")
+            return
+        self._unindex_record(record)
+        del self.records[record_id]
+        self._log_change("delete", {"id": record_id}, record.to_dict())
+        self.storage.save_meta(self.meta())
+        print(f"Финансовая запись с ID {record_id} удалена.")
+        return record
+
+    @measured
+    def list_records(self, category=None, date=None):
+        """Записи с фильтром по категории и дате. Некорректная дата — InvalidDateError."""
+        records = self.records.values()
+        if date:
+            date_ordinal = parse_date(date)
+            records = self.records_between(date_ordinal, date_ordinal)
+        if category:
+            scanned = len(records)
+            records = [record for record in records if record.category == category]
+            METRICS.count_records("FinanceManager.list_records", scanned, len(records))
+        return records
+
+    @measured
+    def calculate_balance(self):
+        """Баланс в минимальных единицах (как и все суммы, которые возвращает менеджер)."""
+        return self.totals.balance
+
+    @measured
+    def group_by_category(self):
+        """Суммы по категориям: {категория: сумма}."""
+        return {category: total for category, (total, _) in self.totals.categories.items()}
+
+    @measured
+    def group_by_period(self, period="month"):
+        """Суммы по дням (ДД-ММ-ГГГГ) или месяцам (ММ-ГГГГ) в хронологическом порядке."""
+        if period == "day":
+            return {date.fromordinal(day).strftime(DATE_FORMAT): total for day, total in self.columns.daily_totals().items()}
+        return {f"{month[5:]}-{month[:4]}": total for month, (total, _) in sorted(self.totals.months.items())}
+
+    @measured
+    def generate_report(self, start_date, end_date):
+        """Записи за период [start_date, end_date] и их сумма."""
+        records = self.records_between(parse_date(start_date), parse_date(end_date))
+        # Сумма по выбранным записям: колоночное представление после каждого
+        # изменения строилось бы заново за O(n).
+        return FinanceReport(start_date, end_date, records, sum(record.amount_minor for record in records))
+
+    @staticmethod
+    def record_from_row(record_id, row):
+        amount, category, date, description = require_fields(row, "amount", "category", "date", "description")
+        amount_minor = to_minor_units(amount)
+        currency = parse_currency(row.get("currency"))
+        date_ordinal = parse_date(date)
+        return FinanceRecord(
+            record_id, amount_minor, category, date, description, updated_at=now_timestamp(), currency=currency,
+            date_ordinal=date_ordinal,
+        )
+
+    @measured
+    def import_from_csv(self, csv_file, save_every=None):
+        add_record = functools.partial(self._add_record, bulk=True)
+        try:
+            return self._import_csv(csv_file, self.record_from_row, add_record, save_every)
+        finally:
+            # Одна сортировка вместо insort на каждую строку: импорт остаётся O(n log n).
+            self.date_index.sort()
+
+    @measured
+    def export_to_csv(self, csv_file, columns=None, since=None, compression=None,
+                      start_date=None, end_date=None, category=None):
+        """Экспорт в CSV; start_date/end_date — диапазон дат операций, category — одна категория."""
+        if start_date or end_date:
+            start_ordinal = parse_date(start_date) if start_date else date.min.toordinal()
+            end_ordinal = parse_date(end_date) if end_date else date.max.toordinal()
+            records = self.records_between(start_ordinal, end_ordinal)
+        else:
+            records = self.records.values()
+        if category:
+            records = (record for record in records if record.category == category)
+        count = export_csv_rows(csv_file, records, FinanceRecord.FIELDS, columns, since, compression)
+        print(f"Финансовые записи экспортированы в файл {csv_file} ({count}).")
+        return count
+
+    def find_record_by_id(self, record_id):
+        return self.records.get(record_id)
+
+    @measured
+    def check_totals(self, repair=False):
+        """Пересчитывает итоги по записям и возвращает список расхождений с текущими;
+        при repair расхождения исправляются."""
+        expected = FinanceTotals.from_records(self.records.values())
+        problems = self.totals.drift(expected)
+        if problems and repair:
+            self.totals = expected
+            self.storage.save_meta(self.meta())
+        return problems
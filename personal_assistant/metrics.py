@@ -0,0 +1,277 @@
+"""Статистика операций (METRICS) и профилировщик (PROFILER)."""
+import bisect
+import functools
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+# Верхние границы корзин гистограммы времени операций, в секундах.
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_REPORT_LINES = 25
+
+
+class Metrics:
+    """Необязательная статистика работы: число вызовов, ошибки и гистограммы
+    времени операций менеджеров и хранилищ, байты, прочитанные и записанные
+    по файлам, и число просмотренных и возвращённых записей в запросах.
+
+    По умолчанию выключена: обёртки измеряемых методов тогда сводятся к одной
+    проверке флага. Включается и выключается во время работы (enabled)."""
+
+    def __init__(self, enabled=False, buckets=LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # имя операции -> [вызовы, ошибки, сумма секунд, максимум, счётчики по корзинам]
+            self.operations = {}
+            self.bytes_read = {}
+            self.bytes_written = {}
+            # имя операции -> [просмотрено, возвращено]
+            self.records = {}
+
+    def observe(self, name, seconds, error=False):
+        with self._lock:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = [0, 0, 0.0, 0.0, [0] * (len(self.buckets) + 1)]
+            stats[0] += 1
+            stats[1] += error
+            stats[2] += seconds
+            stats[3] = max(stats[3], seconds)
+            stats[4][bisect.bisect_left(self.buckets, seconds)] += 1
+
+    def count_read(self, filename, size):
+        if self.enabled:
+            with self._lock:
+                self.bytes_read[filename] = self.bytes_read.get(filename, 0) + size
+
+    def count_written(self, filename, size):
+        if self.enabled:
+            with self._lock:
+                self.bytes_written[filename] = self.bytes_written.get(filename, 0) + size
+
+    def count_records(self, name, scanned, returned):
+        if self.enabled:
+            with self._lock:
+                counts = self.records.setdefault(name, [0, 0])
+                counts[0] += scanned
+                counts[1] += returned
+
+    def quantile(self, name, q):
+        """Оценка квантиля времени по гистограмме: верхняя граница корзины."""
+        count, _, _, maximum, histogram = self.operations[name]
+        rank = q * count
+        seen = 0
+        for bound, hits in zip(self.buckets, histogram):
+            seen += hits
+            if seen >= rank:
+                return min(bound, maximum)
+        return maximum
+
+    def to_dict(self):
+        with self._lock:
+            operations = {}
+            for name, (count, errors, total, maximum, histogram) in sorted(self.operations.items()):
+                labels = [str(bound) for bound in self.buckets] + ["+Inf"]
+                operations[name] = {
+                    "count": count, "errors": errors, "total_seconds": total, "max_seconds": maximum,
+                    "buckets": dict(zip(labels, histogram)),
+                }
+            return {
+                "enabled": self.enabled,
+                "operations": operations,
+                "bytes_read": dict(self.bytes_read),
+                "bytes_written": dict(self.bytes_written),
+                "records": {name: {"scanned": scanned, "returned": returned}
+                            for name, (scanned, returned) in sorted(self.records.items())},
+            }
+
+    def to_prometheus(self):
+        """Текстовый формат экспозиции Prometheus."""
+        data = self.to_dict()
+        lines = [
+            "# HELP pa_operation_duration_seconds Время операций менеджеров и хранилищ.",
+            "# TYPE pa_operation_duration_seconds histogram",
+        ]
+        for name, stats in data["operations"].items():
+            label = f'operation="{prometheus_label(name)}"'
+            cumulative = 0
+            for bound, hits in stats["buckets"].items():
+                cumulative += hits
+                lines.append(f'pa_operation_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"pa_operation_duration_seconds_sum{{{label}}} {stats['total_seconds']}")
+            lines.append(f"pa_operation_duration_seconds_count{{{label}}} {stats['count']}")
+        counters = [
+            ("pa_operation_errors_total", "Операции, завершившиеся исключением.", "operation",
+             {name: stats["errors"] for name, stats in data["operations"].items()}),
+            ("pa_bytes_read_total", "Байт прочитано из файлов.", "file", data["bytes_read"]),
+            ("pa_bytes_written_total", "Байт записано в файлы.", "file", data["bytes_written"]),
+            ("pa_records_scanned_total", "Записей просмотрено запросами.", "operation",
+             {name: counts["scanned"] for name, counts in data["records"].items()}),
+            ("pa_records_returned_total", "Записей возвращено запросами.", "operation",
+             {name: counts["returned"] for name, counts in data["records"].items()}),
+        ]
+        for metric, description, label, values in counters:
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} counter")
+            for key, value in values.items():
+                lines.append(f'{metric}{{{label}="{prometheus_label(key)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, filename):
+        """Сохраняет статистику: .prom — в формате Prometheus, иначе в JSON."""
+        if filename.endswith(".prom"):
+            with open(filename, "w", encoding="utf-8") as file:
+                file.write(self.to_prometheus())
+        else:
+            with open(filename, "w", encoding="utf-8") as file:
+                json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
+
+
+def prometheus_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = Metrics(enabled=os.environ.get("PA_METRICS", "") not in ("", "0"))
+
+
+def measured(function):
+    """Декоратор: учитывает время и исключения вызова в METRICS под именем
+    Класс.метод. Генераторы так не измерить — их время уходит потребителю."""
+    name = function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not METRICS.enabled:
+            return function(*args, **kwargs)
+        start = time.perf_counter()
+        error = True
+        try:
+            result = function(*args, **kwargs)
+            error = False
+            return result
+        finally:
+            METRICS.observe(name, time.perf_counter() - start, error)
+
+    return wrapper
+
+
+class Profiler:
+    """Профилировщик, который включается и выключается во время работы.
+
+    cprofile — детерминированный cProfile в потоке, вызвавшем start();
+    sampling — выборочный: отдельный поток раз в interval секунд смотрит стек
+    этого потока (или всех потоков при all_threads) и считает, в каких функциях
+    он находится. Выборочный режим почти не замедляет программу, но точен только
+    статистически."""
+
+    MODES = ("cprofile", "sampling")
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.mode = None
+        self._profile = None
+        self._sampler = None
+        self._stop = threading.Event()
+        self._samples = Counter()
+        self._inclusive = Counter()
+        self._sample_count = 0
+        self._all_threads = False
+
+    @property
+    def running(self):
+        return self.mode is not None
+
+    def start(self, mode="cprofile", all_threads=False):
+        if mode not in self.MODES:
+            raise ValueError(f"Неизвестный режим профилирования: {mode}")
+        if self.running:
+            raise ValueError("Профилировщик уже запущен")
+        self.mode = mode
+        if mode == "cprofile":
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._samples.clear()
+            self._inclusive.clear()
+            self._sample_count = 0
+            self._stop.clear()
+            self._all_threads = all_threads
+            thread_id = None if all_threads else threading.get_ident()
+            self._sampler = threading.Thread(target=self._sample, args=(thread_id,), daemon=True)
+            self._sampler.start()
+
+    def stop(self, limit=PROFILE_REPORT_LINES, filename=None):
+        """Останавливает профилирование и возвращает отчёт о самых затратных
+        функциях. filename — сохранить сырые данные cProfile (для pstats/snakeviz)."""
+        if not self.running:
+            raise ValueError("Профилировщик не запущен")
+        mode, self.mode = self.mode, None
+        if mode == "cprofile":
+            profile, self._profile = self._profile, None
+            profile.disable()
+            if filename:
+                profile.dump_stats(filename)
+            import pstats
+
+            output = io.StringIO()
+            pstats.Stats(profile, stream=output).sort_stats("cumulative").print_stats(limit)
+            return output.getvalue()
+        self._stop.set()
+        self._sampler.join()
+        self._sampler = None
+        return self._sampling_report(limit)
+
+    def _sample(self, thread_id):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if thread_id is not None:
+                frames = {thread_id: frames[thread_id]} if thread_id in frames else {}
+            self._sample_count += 1
+            for frame_thread, frame in frames.items():
+                if frame_thread != own_id:
+                    self._record_stack(frame)
+
+    def _record_stack(self, frame):
+        self._samples[self._frame_key(frame)] += 1
+        seen = set()
+        while frame is not None:
+            key = self._frame_key(frame)
+            if key not in seen:
+                seen.add(key)
+                self._inclusive[key] += 1
+            frame = frame.f_back
+
+    @staticmethod
+    def _frame_key(frame):
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}({code.co_name})"
+
+    def _sampling_report(self, limit):
+        total = self._sample_count or 1
+        lines = [f"Выборок: {self._sample_count}, интервал {self.interval * 1000:g} мс"]
+        if self._all_threads:
+            lines.append("Доли считаются по всем потокам, их сумма может превышать 100%.")
+        lines += ["", "Собственное время:"]
+        for key, hits in self._samples.most_common(limit):
+            lines.append(f"{hits / total:7.1%}  {key}")
+        lines += ["", "С учётом вложенных вызовов:"]
+        for key, hits in self._inclusive.most_common(limit):
+            lines.append(f"{hits / total:7.1%}  {key}")
+        return "\n".join(lines) + "\n"
+
+
+PROFILER = Profiler()
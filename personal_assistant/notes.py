@@ -0,0 +1,349 @@
+"""Заметки: модель, полнотекстовый индекс BM25 и менеджер."""
+import bisect
+import heapq
+import json
+import math
+import os
+import re
+import zlib
+from datetime import datetime
+
+from .common import intern_string, now_timestamp
+from .csv_io import export_csv_rows, require_fields
+from .metrics import METRICS, measured
+from .storage import JsonStorage, StoreManager, atomic_write_json, next_free_id
+
+
+class Note:
+    __slots__ = ("id", "title", "content", "timestamp", "updated_at")
+    FIELDS = __slots__
+
+    def __init__(self, note_id, title, content, timestamp=None, updated_at=None):
+        self.id = note_id
+        self.title = title
+        self.content = content
+        self.timestamp = intern_string(timestamp or datetime.now().strftime("%d-%m-%Y %H:%M:%S"))
+        self.updated_at = intern_string(updated_at)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "content": self.content,
+            "timestamp": self.timestamp,
+            "updated_at": self.updated_at
+        }
+
+    @staticmethod
+    def from_dict(data):
+        return Note(
+            note_id=data["id"],
+            title=data["title"],
+            content=data["content"],
+            timestamp=data["timestamp"],
+            updated_at=data.get("updated_at")
+        )
+
+
+TOKEN_RE = re.compile(r"\w+")
+STEM_SUFFIXES = sorted([
+    "иями", "ями", "ами", "ого", "его", "ому", "ему", "ыми", "ими", "ать", "ять", "ить",
+    "ов", "ев", "ей", "ий", "ый", "ой", "ая", "яя", "ое", "ее", "ые", "ие", "ам", "ям",
+    "ах", "ях", "ом", "ем", "а", "я", "о", "е", "ы", "и", "у", "ю", "ь",
+    "ing", "ed", "es", "s",
+], key=len, reverse=True)
+
+
+def stem_word(word):
+    """Упрощённый стеммер: отрезает типичные окончания русских и английских слов."""
+    for suffix in STEM_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text, stem=False):
+    tokens = TOKEN_RE.findall(text.lower())
+    if stem:
+        return [stem_word(token) for token in tokens]
+    return tokens
+
+
+class NotesIndex:
+    """Инвертированный индекс по заголовку и содержимому заметок с ранжированием BM25.
+
+    Для каждой заметки хранится словарь частот термов и контрольная сумма текста;
+    индекс сохраняется в <notes>.index.json. При загрузке он сверяется с заметками,
+    и заново токенизируются только новые или изменённые заметки."""
+
+    K1 = 1.5
+    B = 0.75
+    TITLE_WEIGHT = 2
+
+    def __init__(self, filename, stem=False):
+        self.filename = filename
+        self.stem = stem
+        self.postings = {}
+        self.doc_terms = {}
+        self.doc_versions = {}
+        self.doc_lengths = {}
+        self.total_length = 0
+        self.terms = []
+        self.dirty = False
+
+    @staticmethod
+    def version(note):
+        return zlib.crc32(f"{note.title}\0{note.content}".encode("utf-8"))
+
+    def _term_frequencies(self, note):
+        frequencies = {}
+        for token in tokenize(note.title, self.stem):
+            frequencies[token] = frequencies.get(token, 0) + self.TITLE_WEIGHT
+        for token in tokenize(note.content, self.stem):
+            frequencies[token] = frequencies.get(token, 0) + 1
+        return frequencies
+
+    def _insert(self, doc_id, frequencies, version, bulk=False):
+        """bulk — пакетная вставка: новые термы не вставляются в terms по одному,
+        и после пакета нужно вызвать sort_terms()."""
+        for term, frequency in frequencies.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                if not bulk:
+                    bisect.insort(self.terms, term)
+            posting[doc_id] = frequency
+        length = sum(frequencies.values())
+        self.doc_terms[doc_id] = frequencies
+        self.doc_versions[doc_id] = version
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+        self.dirty = True
+
+    def add(self, note, bulk=False):
+        self._insert(note.id, self._term_frequencies(note), self.version(note), bulk)
+
+    def sort_terms(self):
+        self.terms = sorted(self.postings)
+
+    def remove(self, doc_id):
+        frequencies = self.doc_terms.pop(doc_id, None)
+        if frequencies is None:
+            return
+        for term in frequencies:
+            posting = self.postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[term]
+                del self.terms[bisect.bisect_left(self.terms, term)]
+        del self.doc_versions[doc_id]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        self.dirty = True
+
+    def update(self, note):
+        self.remove(note.id)
+        self.add(note)
+
+    def sync(self, notes):
+        """Приводит индекс в соответствие со словарём заметок."""
+        for doc_id in [doc_id for doc_id in self.doc_terms if doc_id not in notes]:
+            self.remove(doc_id)
+        changed = [note for note in notes.values() if self.doc_versions.get(note.id) != self.version(note)]
+        for note in changed:
+            self.remove(note.id)
+        if changed:
+            # Одна сортировка термов вместо insort на каждый новый терм.
+            for note in changed:
+                self.add(note, bulk=True)
+            self.sort_terms()
+
+    @measured
+    def load(self, notes):
+        try:
+            with open(self.filename, "r") as file:
+                if METRICS.enabled:
+                    METRICS.count_read(self.filename, os.fstat(file.fileno()).st_size)
+                data = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = None
+        if data and data.get("stem") == self.stem:
+            for doc_id, (version, frequencies) in data["docs"].items():
+                self._insert(int(doc_id), frequencies, version, bulk=True)
+            self.sort_terms()
+            self.dirty = False
+        self.sync(notes)
+
+    @measured
+    def save(self):
+        if not self.dirty:
+            return
+        data = {
+            "stem": self.stem,
+            "docs": {doc_id: [self.doc_versions[doc_id], terms] for doc_id, terms in self.doc_terms.items()},
+        }
+        atomic_write_json(self.filename, data)
+        self.dirty = False
+
+    def _expand(self, token):
+        start = bisect.bisect_left(self.terms, token)
+        end = bisect.bisect_left(self.terms, token + "\U0010ffff")
+        return self.terms[start:end]
+
+    @measured
+    def search(self, query, limit=10, prefix=True):
+        """Возвращает список пар (id, score), отсортированных по убыванию score.
+        При prefix=True каждое слово запроса совпадает и с термами, которые с него начинаются."""
+        doc_count = len(self.doc_terms)
+        if not doc_count:
+            return []
+        average_length = self.total_length / doc_count
+        scores = {}
+        scanned = 0
+        for token in set(tokenize(query, self.stem)):
+            terms = self._expand(token) if prefix else [token]
+            for term in terms:
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                scanned += len(posting)
+                idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, frequency in posting.items():
+                    norm = self.K1 * (1 - self.B + self.B * self.doc_lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0) + idf * frequency * (self.K1 + 1) / (frequency + norm)
+        result = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        METRICS.count_records("NotesIndex.search", scanned, len(result))
+        return result
+
+
+class StorageSearch:
+    """Поиск заметок силами хранилища (FTS5 в SQLite). Полнотекстовый индекс
+    обновляет само хранилище, поэтому методы поддержки индекса ничего не делают."""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def add(self, note):
+        pass
+
+    def remove(self, doc_id):
+        pass
+
+    def update(self, note):
+        pass
+
+    def sync(self, notes):
+        pass
+
+    def save(self):
+        pass
+
+    def search(self, query, limit=10, prefix=True):
+        return self.storage.search(query, limit)
+
+
+class NotesManager(StoreManager):
+    record_class = Note
+    items_attribute = "notes"
+
+    def __init__(self, filename="notes.json", storage=None, stemming=False):
+        self.filename = filename
+        self.storage = storage or JsonStorage(filename)
+        self.notes = self.load_notes()
+        self.next_id = next_free_id(self.notes, self.storage.load_meta())
+        if getattr(self.storage, "supports_search", False):
+            self.index = StorageSearch(self.storage)
+        else:
+            self.index = NotesIndex(os.path.splitext(filename)[0] + ".index.json", stem=stemming)
+            self.index.load(self.notes)
+
+    @measured
+    def load_notes(self):
+        return self.load_items()
+
+    def reload(self):
+        self.notes = self.load_notes()
+        self.next_id = next_free_id(self.notes, self.storage.load_meta())
+        self.index.sync(self.notes)
+
+    def flush(self):
+        super().flush()
+        self.index.save()
+
+    def _add_note(self, note):
+        self.notes[note.id] = note
+        self.next_id = max(self.next_id, note.id + 1)
+
+    @measured
+    def save_notes(self):
+        self.storage.save(self.snapshot())
+
+    @measured
+    def create_note(self, title, content):
+        note_id = self.next_id
+        note = Note(note_id, title, content, updated_at=now_timestamp())
+        self._add_note(note)
+        self.index.add(note)
+        stored = self._log_change("create", note.to_dict())
+        note = self.notes[stored["id"]]
+        print(f"Заметка с ID {note.id} создана.")
+        return note
+
+    def list_notes(self):
+        return self.notes.values()
+
+    @measured
+    def edit_note(self, note_id, title=None, content=None):
+        note = self.find_note_by_id(note_id)
+        if note:
+            base = note.to_dict()
+            if title:
+                note.title = title
+            if content:
+                note.content = content
+            note.timestamp = intern_string(datetime.now().strftime("%d-%m-%Y %H:%M:%S"))
+            note.updated_at = now_timestamp()
+            self.index.update(note)
+            self._log_change("edit", note.to_dict(), base)
+            print(f"Заметка с ID {note_id} обновлена.")
+            return note
+        else:
+            print(f"Заметка с ID {note_id} не найдена.")
+
+    @measured
+    def delete_note(self, note_id):
+        note = self.find_note_by_id(note_id)
+        if note:
+            del self.notes[note_id]
+            self.index.remove(note_id)
+            self.storage.save_meta({"next_id": self.next_id})
+            self._log_change("delete", {"id": note_id}, note.to_dict())
+            print(f"Заметка с ID {note_id} удалена.")
+            return note
+        else:
+            print(f"Заметка с ID {note_id} не найдена.")
+
+    @staticmethod
+    def note_from_row(note_id, row):
+        title, content = require_fields(row, "title", "content")
+        return Note(note_id, title, content, updated_at=now_timestamp())
+
+    @measured
+    def import_from_csv(self, csv_file, save_every=None):
+        report = self._import_csv(csv_file, self.note_from_row, self._add_note, save_every)
+        self.index.sync(self.notes)
+        self.index.save()
+        return report
+
+    @measured
+    def export_to_csv(self, csv_file, columns=None, since=None, compression=None):
+        count = export_csv_rows(csv_file, self.notes.values(), Note.FIELDS, columns, since, compression)
+        print(f"Заметки экспортированы в файл {csv_file} ({count}).")
+        return count
+
+    @measured
+    def search_notes(self, query, limit=10):
+        """Пары (заметка, релевантность), лучшие первыми."""
+        return [(self.notes[note_id], score) for note_id, score in self.index.search(query, limit)]
+
+    def find_note_by_id(self, note_id):
+        return self.notes.get(note_id)
@@ -0,0 +1,169 @@
+"""Вывод результатов: текст, JSON Lines или CSV."""
+import csv
+import itertools
+import json
+import sys
+
+from .common import MAX_REPORTED_ERRORS, format_money
+from .metrics import measured
+
+
+OUTPUT_FORMATS = ("text", "jsonl", "csv")
+OUTPUT_BUFFER_LINES = 1000
+
+
+class LineBuffer(list):
+    """Приёмник для csv.writer: каждая записанная строка становится элементом списка."""
+    write = list.append
+
+
+class Presenter:
+    """Вывод результатов пользователю.
+
+    Менеджеры возвращают данные, а Presenter превращает их в строки и пишет
+    в поток порциями по buffer_lines строк одним вызовом write. Форматы: text —
+    строки для человека, jsonl — JSON Lines, csv — CSV с заголовком. В
+    машиночитаемых форматах выводятся только строки данных, без заголовков и
+    сообщений. При page_size текстовый вывод останавливается после каждой
+    страницы и ждёт Enter (q — прервать)."""
+
+    def __init__(self, stream=None, output_format="text", page_size=None, buffer_lines=OUTPUT_BUFFER_LINES):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Неизвестный формат вывода: {output_format}")
+        self._stream = stream
+        self.output_format = output_format
+        self.page_size = page_size
+        self.buffer_lines = buffer_lines
+
+    @property
+    def stream(self):
+        return self._stream or sys.stdout
+
+    @property
+    def is_text(self):
+        return self.output_format == "text"
+
+    def message(self, text):
+        if self.is_text:
+            self.stream.write(text + "\n")
+
+    def items(self, items, text_line, title=None, empty=None):
+        """Выводит объекты моделей (с методом to_dict)."""
+        return self.rows((item.to_dict() for item in items), text_line, title, empty)
+
+    @measured
+    def rows(self, rows, text_line, title=None, empty=None):
+        """Выводит словари из любого итерируемого источника, не собирая их в список.
+        text_line(row) -> строка для текстового формата. Возвращает число строк."""
+        lines = self._lines(rows, text_line)
+        first = next(lines, None)
+        if first is None:
+            if empty:
+                self.message(empty)
+            return 0
+        if title:
+            self.message(title)
+        paged = self.is_text and self.page_size
+        buffer = [first]
+        count = 1
+        for line in lines:
+            if len(buffer) >= self.buffer_lines or (paged and count % self.page_size == 0):
+                self.stream.write("".join(buffer))
+                buffer = []
+                if paged and count % self.page_size == 0 and not self._next_page():
+                    return count
+            buffer.append(line)
+            count += 1
+        self.stream.write("".join(buffer))
+        self.stream.flush()
+        return count
+
+    def import_report(self, report, title):
+        """Итог импорта CSV; в машиночитаемых форматах — строки с ошибками по строкам файла."""
+        self.message(title)
+        self.message(f"Импортировано записей: {report.imported}, пропущено строк: {len(report.errors)}.")
+        errors = ({"line": line_number, "error": error} for line_number, error in report.errors)
+        if self.is_text:
+            errors = itertools.islice(errors, MAX_REPORTED_ERRORS)
+        self.rows(errors, lambda row: f"  Строка {row['line']}: {row['error']}")
+        if self.is_text and len(report.errors) > MAX_REPORTED_ERRORS:
+            self.message(f"  ... и ещё {len(report.errors) - MAX_REPORTED_ERRORS} ошибок.")
+
+    def _lines(self, rows, text_line):
+        if self.output_format == "jsonl":
+            for row in rows:
+                yield json.dumps(row, ensure_ascii=False) + "\n"
+        elif self.output_format == "csv":
+            buffer = LineBuffer()
+            writer = None
+            for row in rows:
+                if writer is None:
+                    writer = csv.DictWriter(buffer, fieldnames=list(row), lineterminator="\n")
+                    writer.writeheader()
+                writer.writerow(row)
+                # Заголовок приходит вместе с первой строкой данных.
+                yield "".join(buffer)
+                buffer.clear()
+        else:
+            for row in rows:
+                yield text_line(row) + "\n"
+
+    def _next_page(self):
+        self.stream.flush()
+        return input("-- Enter — следующая страница, q — прервать --").strip().lower() != "q"
+
+
+def note_line(row):
+    return f"ID: {row['id']}, Title: {row['title']}, Timestamp: {row['timestamp']}"
+
+
+def note_details(row):
+    return f"\nID: {row['id']}\nTitle: {row['title']}\nContent: {row['content']}\nTimestamp: {row['timestamp']}"
+
+
+def task_line(row):
+    status = "Выполнена" if row["done"] else "Не выполнена"
+    return f"ID: {row['id']}, Title: {row['title']}, Status: {status}, Priority: {row['priority']}, Due Date: {row['due_date']}"
+
+
+def contact_line(row):
+    return f"ID: {row['id']}, Name: {row['name']}, Phone: {row['phone']}, Email: {row['email']}"
+
+
+def record_line(row):
+    amount = format_money(row["amount_minor"], row["currency"])
+    return f"ID: {row['id']}, Amount: {amount}, Category: {row['category']}, Date: {row['date']}, Description: {row['description']}"
+
+
+def calculation_line(row):
+    if row["error"]:
+        return f"{row['number']}. {row['expression']} -> Ошибка: {row['message']}"
+    return f"{row['number']}. {row['expression']} = {row['value']}"
+
+
+def stats_rows(metrics):
+    """Строки статистики по операциям: время в миллисекундах, квантили — по гистограмме."""
+    for name, stats in metrics.to_dict()["operations"].items():
+        yield {
+            "operation": name,
+            "count": stats["count"],
+            "errors": stats["errors"],
+            "mean_ms": stats["total_seconds"] / stats["count"] * 1000,
+            "p50_ms": metrics.quantile(name, 0.5) * 1000,
+            "p95_ms": metrics.quantile(name, 0.95) * 1000,
+            "max_ms": stats["max_seconds"] * 1000,
+        }
+
+
+def stats_line(row):
+    line = (
+        f"{row['operation']}: вызовов {row['count']}, среднее {row['mean_ms']:.2f} мс, "
+        f"p50 ≤ {row['p50_ms']:.2f} мс, p95 ≤ {row['p95_ms']:.2f} мс, макс {row['max_ms']:.2f} мс"
+    )
+    if row["errors"]:
+        line += f", ошибок {row['errors']}"
+    return line
+
+
+def scan_line(row):
+    return f"{row['operation']}: просмотрено {row['scanned']}, возвращено {row['returned']}"
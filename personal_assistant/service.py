@@ -0,0 +1,332 @@
+"""Асинхронный API и сервер JSON Lines."""
+import asyncio
+import contextlib
+import functools
+import json
+
+from .calculator import Calculator, evaluate_expression
+from .common import SERVICE_ADDRESS, STORES, open_manager, parse_date
+from .metrics import METRICS, PROFILER, PROFILE_REPORT_LINES
+
+
+def item_dict(item):
+    return None if item is None else item.to_dict()
+
+
+def encode_response(response):
+    """Строка ответа JSON Lines. Если результат нельзя записать в JSON (комплексное
+    число, NaN и т. п.), вместо него отправляется ошибка, а соединение остаётся рабочим."""
+    try:
+        line = json.dumps(response, ensure_ascii=False, allow_nan=False)
+    except (TypeError, ValueError) as e:
+        line = json.dumps({"id": response.get("id"), "error": f"Результат нельзя передать в JSON ({e})."},
+                          ensure_ascii=False)
+    return line.encode() + b"\n"
+
+
+class ReadWriteLock:
+    """Асинхронная блокировка хранилища: чтения идут параллельно друг с другом,
+    запись — только одна и без чтений. Ожидающая запись не пропускает вперёд
+    новые чтения, чтобы поток запросов на чтение её не откладывал бесконечно."""
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextlib.asynccontextmanager
+    async def reading(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writing and not self._waiting_writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def writing(self):
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writing and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class AssistantService:
+    """Неинтерактивный асинхронный интерфейс к менеджерам и калькулятору.
+
+    Все операции — корутины, возвращающие словари и списки, пригодные для JSON.
+    Работа с менеджерами выполняется в пуле потоков (executor), чтобы чтение и
+    запись файлов не блокировали цикл событий. Изменения каждого хранилища
+    выполняются по одному, чтения идут параллельно (ReadWriteLock). Менеджер
+    загружается при первом обращении и перечитывается, если его файл изменил
+    другой процесс."""
+
+    METHODS = frozenset({
+        "create_note", "get_note", "list_notes", "search_notes", "edit_note", "delete_note",
+        "create_task", "get_task", "list_tasks", "filter_tasks", "tasks_due_between", "most_urgent_tasks",
+        "mark_task_done", "edit_task", "delete_task",
+        "add_contact", "get_contact", "list_contacts", "find_contacts", "edit_contact", "delete_contact",
+        "add_record", "get_record", "list_records", "edit_record", "delete_record", "balance",
+        "group_by_category", "finance_report",
+        "import_csv", "calculate", "calculate_many", "flush",
+        "stats", "set_metrics", "reset_stats", "start_profiler", "stop_profiler",
+    })
+
+    def __init__(self, storage_backend="json", executor=None):
+        self.storage_backend = storage_backend
+        self.executor = executor
+        self.calculator = Calculator()
+        self._managers = {}
+        self._locks = {store: ReadWriteLock() for store in STORES}
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(function, *args))
+
+    def _create_manager(self, store):
+        return open_manager(store, self.storage_backend)
+
+    async def _manager(self, store):
+        manager = self._managers.get(store)
+        if manager is not None and not await self._run(manager.storage.changed):
+            return manager
+        async with self._locks[store].writing():
+            manager = self._managers.get(store)
+            if manager is None:
+                manager = self._managers[store] = await self._run(self._create_manager, store)
+            else:
+                await self._run(manager.refresh)
+        return manager
+
+    async def _read(self, store, function):
+        manager = await self._manager(store)
+        async with self._locks[store].reading():
+            return await self._run(function, manager)
+
+    async def _write(self, store, function):
+        manager = await self._manager(store)
+        async with self._locks[store].writing():
+            return await self._run(function, manager)
+
+    async def flush(self):
+        """Сохраняет отложенные изменения всех загруженных хранилищ."""
+        for store, manager in list(self._managers.items()):
+            async with self._locks[store].writing():
+                await self._run(manager.flush)
+
+    # Заметки
+
+    async def create_note(self, title, content):
+        return await self._write("notes", lambda m: m.create_note(title, content).to_dict())
+
+    async def get_note(self, note_id):
+        return await self._read("notes", lambda m: item_dict(m.find_note_by_id(note_id)))
+
+    async def list_notes(self):
+        return await self._read("notes", lambda m: [note.to_dict() for note in m.list_notes()])
+
+    async def search_notes(self, query, limit=10):
+        return await self._read("notes", lambda m: [
+            dict(note.to_dict(), score=score) for note, score in m.search_notes(query, limit)
+        ])
+
+    async def edit_note(self, note_id, title=None, content=None):
+        return await self._write("notes", lambda m: item_dict(m.edit_note(note_id, title, content)))
+
+    async def delete_note(self, note_id):
+        return await self._write("notes", lambda m: item_dict(m.delete_note(note_id)))
+
+    # Задачи
+
+    async def create_task(self, title, description="", priority="Средний", due_date=None):
+        if due_date:
+            parse_date(due_date)
+        return await self._write("tasks", lambda m: m.create_task(title, description, priority, due_date).to_dict())
+
+    async def get_task(self, task_id):
+        return await self._read("tasks", lambda m: item_dict(m.find_task_by_id(task_id)))
+
+    async def list_tasks(self):
+        return await self._read("tasks", lambda m: [task.to_dict() for task in m.list_tasks()])
+
+    async def filter_tasks(self, status=None, priority=None, due_date=None):
+        return await self._read("tasks", lambda m: [task.to_dict() for task in m.filter_tasks(status, priority, due_date)])
+
+    async def tasks_due_between(self, start_date, end_date):
+        return await self._read("tasks", lambda m: [task.to_dict() for task in m.tasks_due_between(start_date, end_date)])
+
+    async def most_urgent_tasks(self, count=5):
+        return await self._read("tasks", lambda m: [task.to_dict() for task in m.most_urgent_tasks(count)])
+
+    async def mark_task_done(self, task_id):
+        return await self._write("tasks", lambda m: item_dict(m.mark_task_done(task_id)))
+
+    async def edit_task(self, task_id, title=None, description=None, priority=None, due_date=None):
+        if due_date:
+            parse_date(due_date)
+        return await self._write("tasks", lambda m: item_dict(m.edit_task(task_id, title, description, priority, due_date)))
+
+    async def delete_task(self, task_id):
+        return await self._write("tasks", lambda m: item_dict(m.delete_task(task_id)))
+
+    # Контакты
+
+    async def add_contact(self, name, phone, email):
+        return await self._write("contacts", lambda m: m.add_contact(name, phone, email).to_dict())
+
+    async def get_contact(self, contact_id):
+        return await self._read("contacts", lambda m: item_dict(m.find_contact_by_id(contact_id)))
+
+    async def list_contacts(self):
+        return await self._read("contacts", lambda m: [contact.to_dict() for contact in m.list_contacts()])
+
+    async def find_contacts(self, query):
+        return await self._read("contacts", lambda m: [contact.to_dict() for contact in m.find_contacts(query)])
+
+    async def edit_contact(self, contact_id, name=None, phone=None, email=None):
+        return await self._write("contacts", lambda m: item_dict(m.edit_contact(contact_id, name, phone, email)))
+
+    async def delete_contact(self, contact_id):
+        return await self._write("contacts", lambda m: item_dict(m.delete_contact(contact_id)))
+
+    # Финансы. Суммы принимаются в основных единицах (число или строка), а возвращаются,
+    # как и в записях (amount_minor), целым числом минимальных единиц.
+
+    async def add_record(self, amount, category, date, description="", currency=None):
+        return await self._write(
+            "finance", lambda m: m.add_record(amount, category, date, description, currency).to_dict()
+        )
+
+    async def get_record(self, record_id):
+        return await self._read("finance", lambda m: item_dict(m.find_record_by_id(record_id)))
+
+    async def list_records(self, category=None, date=None):
+        return await self._read("finance", lambda m: [record.to_dict() for record in m.list_records(category, date)])
+
+    async def edit_record(self, record_id, amount=None, category=None, date=None, description=None, currency=None):
+        return await self._write(
+            "finance", lambda m: item_dict(m.edit_record(record_id, amount, category, date, description, currency))
+        )
+
+    async def delete_record(self, record_id):
+        return await self._write("finance", lambda m: item_dict(m.delete_record(record_id)))
+
+    async def balance(self):
+        return await self._read("finance", lambda m: m.calculate_balance())
+
+    async def group_by_category(self):
+        return await self._read("finance", lambda m: m.group_by_category())
+
+    async def finance_report(self, start_date, end_date):
+        def report(manager):
+            result = manager.generate_report(start_date, end_date)
+            return {"records": [record.to_dict() for record in result.records], "total": result.total}
+
+        return await self._read("finance", report)
+
+    # Импорт
+
+    async def import_csv(self, store, csv_file):
+        """Импорт CSV в хранилище store; {"imported": число, "errors": [[номер строки, ошибка], ...]}."""
+        if store not in STORES:
+            raise ValueError(f"неизвестное хранилище: {store}")
+        return await self._write(store, lambda m: m.import_from_csv(csv_file).to_dict())
+
+    # Калькулятор
+
+    async def calculate(self, expression):
+        return (await self._run(evaluate_expression, expression))._asdict()
+
+    async def calculate_many(self, expressions):
+        return [result._asdict() for result in await self._run(self.calculator.calculate_many, expressions)]
+
+    # Статистика и профилирование
+
+    async def stats(self, format="json"):
+        """METRICS в виде словаря или текста Prometheus (format="prometheus")."""
+        if format == "prometheus":
+            return METRICS.to_prometheus()
+        return METRICS.to_dict()
+
+    async def set_metrics(self, enabled=True):
+        METRICS.enabled = bool(enabled)
+        return METRICS.enabled
+
+    async def reset_stats(self):
+        METRICS.reset()
+
+    async def start_profiler(self, mode="sampling"):
+        """Операции выполняются в пуле потоков, поэтому выборочный профилировщик
+        смотрит все потоки, а cProfile видит только поток цикла событий."""
+        PROFILER.start(mode, all_threads=True)
+        return mode
+
+    async def stop_profiler(self, limit=PROFILE_REPORT_LINES):
+        return PROFILER.stop(limit)
+
+    # Сетевой интерфейс
+
+    async def handle_request(self, line):
+        """Выполняет один запрос протокола JSON Lines:
+        {"id": 1, "method": "create_task", "params": {"title": "..."}} ->
+        {"id": 1, "result": ...} или {"id": 1, "error": "..."}.
+        params — объект с именованными или список позиционных аргументов."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            method = request.get("method")
+            if method not in self.METHODS:
+                raise ValueError(f"Неизвестный метод: {method}")
+            params = request.get("params") or {}
+            if isinstance(params, list):
+                result = await getattr(self, method)(*params)
+            else:
+                result = await getattr(self, method)(**params)
+        except Exception as e:
+            return {"id": request_id, "error": str(e) or type(e).__name__}
+        return {"id": request_id, "result": result}
+
+    async def handle_connection(self, reader, writer):
+        """Обслуживает одного клиента: запросы одного соединения выполняются
+        по очереди, разные соединения — параллельно."""
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                response = await self.handle_request(line)
+                writer.write(encode_response(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(address=SERVICE_ADDRESS, storage_backend="json"):
+    """Запускает сервис JSON Lines. address — путь к Unix-сокету или "хост:порт" для TCP."""
+    service = AssistantService(storage_backend)
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit():
+        server = await asyncio.start_server(service.handle_connection, host or "127.0.0.1", int(port))
+    else:
+        server = await asyncio.start_unix_server(service.handle_connection, address)
+    print(f"Сервис запущен: {address}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.flush()
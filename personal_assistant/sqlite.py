@@ -0,0 +1,301 @@
+"""Хранилище в SQLite и перенос в него JSON-хранилищ."""
+import itertools
+import json
+import os
+import sqlite3
+import threading
+
+from .common import MONEY_SCALE, parse_date_or_none, upgrade_records
+from .metrics import measured
+from .notes import tokenize
+from .storage import JsonStorage, merge_change
+
+
+SQLITE_DATABASE = "assistant.db"
+
+# Схема таблиц SQLite: обычные поля (тип SQL и преобразование при чтении),
+# вычисляемые поля только для индексов, индексы, поля для полнотекстового поиска
+# и заполнение добавленных столбцов из старых (выражение SQL, старый столбец).
+SQLITE_TABLES = {
+    "notes": {
+        "columns": {
+            "title": ("TEXT", None), "content": ("TEXT", None), "timestamp": ("TEXT", None),
+            "updated_at": ("TEXT", None),
+        },
+        "derived": {},
+        "indexes": [],
+        "fts": ("title", "content"),
+    },
+    "tasks": {
+        "columns": {
+            "title": ("TEXT", None), "description": ("TEXT", None), "done": ("INTEGER", bool),
+            "priority": ("TEXT", None), "due_date": ("TEXT", None), "updated_at": ("TEXT", None),
+        },
+        "derived": {"due_ordinal": ("INTEGER", lambda record: parse_date_or_none(record["due_date"]))},
+        "indexes": ["done", "priority", "due_ordinal"],
+    },
+    "contacts": {
+        "columns": {
+            "name": ("TEXT", None), "phone": ("TEXT", None), "email": ("TEXT", None), "updated_at": ("TEXT", None),
+        },
+        "derived": {},
+        "indexes": ["name COLLATE NOCASE", "phone"],
+    },
+    "finance": {
+        "columns": {
+            "amount_minor": ("INTEGER", None), "currency": ("TEXT", None), "category": ("TEXT", None),
+            "date": ("TEXT", None), "description": ("TEXT", None), "updated_at": ("TEXT", None),
+        },
+        "derived": {"date_ordinal": ("INTEGER", lambda record: parse_date_or_none(record["date"]))},
+        "indexes": ["date_ordinal", "category"],
+        # Суммы REAL в копейках: ROUND убирает погрешность двоичного представления.
+        "backfill": {"amount_minor": (f"CAST(ROUND(amount * {MONEY_SCALE}) AS INTEGER)", "amount")},
+    },
+}
+
+
+class SqliteStorage:
+    """Хранилище в таблице SQLite (режим WAL) с индексами по часто фильтруемым полям.
+
+    Каждая операция create/edit/delete — одна строка в транзакции, без перезаписи
+    всего набора. Для заметок поддерживается полнотекстовая таблица FTS5,
+    которую синхронизируют триггеры."""
+
+    def __init__(self, database, table):
+        if table not in SQLITE_TABLES:
+            raise ValueError(f"Неизвестная таблица SQLite: {table}")
+        self.filename = database
+        self.table = table
+        self.schema = SQLITE_TABLES[table]
+        self.fields = list(self.schema["columns"])
+        self.derived = self.schema["derived"]
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(database, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA busy_timeout=5000")
+        self.stamp = None
+        self.supports_search = False
+        self._create_schema()
+
+    @classmethod
+    def for_store(cls, filename):
+        """Хранилище для JSON-файла менеджера: notes.json -> таблица notes в assistant.db рядом."""
+        table = os.path.splitext(os.path.basename(filename))[0]
+        return cls(os.path.join(os.path.dirname(filename), SQLITE_DATABASE), table)
+
+    def _create_schema(self):
+        columns = {name: sql_type for name, (sql_type, _) in self.schema["columns"].items()}
+        columns.update({name: sql_type for name, (sql_type, _) in self.derived.items()})
+        with self.connection:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} (id INTEGER PRIMARY KEY, "
+                + ", ".join(f"{name} {sql_type}" for name, sql_type in columns.items()) + ")"
+            )
+            existing = {row[1] for row in self.connection.execute(f"PRAGMA table_info({self.table})")}
+            for name, sql_type in columns.items():
+                if name not in existing:
+                    self.connection.execute(f"ALTER TABLE {self.table} ADD COLUMN {name} {sql_type}")
+                    expression, source = self.schema.get("backfill", {}).get(name, (None, None))
+                    if source in existing:
+                        self.connection.execute(f"UPDATE {self.table} SET {name} = {expression}")
+                    elif name in self.derived:
+                        # Вычисляемый столбец для индекса заполняется по уже сохранённым записям.
+                        compute = self.derived[name][1]
+                        rows = self.connection.execute(
+                            f"SELECT id, {', '.join(self.fields)} FROM {self.table}"
+                        ).fetchall()
+                        self.connection.executemany(
+                            f"UPDATE {self.table} SET {name} = ? WHERE id = ?",
+                            [(compute(dict(zip(["id"] + self.fields, row))), row[0]) for row in rows],
+                        )
+            for index in self.schema["indexes"]:
+                column = index.split()[0]
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {self.table}_{column} ON {self.table} ({index})"
+                )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (store TEXT PRIMARY KEY, data TEXT, generation INTEGER NOT NULL DEFAULT 0)"
+            )
+            if "generation" not in {row[1] for row in self.connection.execute("PRAGMA table_info(meta)")}:
+                self.connection.execute("ALTER TABLE meta ADD COLUMN generation INTEGER NOT NULL DEFAULT 0")
+            if self.schema.get("fts"):
+                self._create_fts(self.schema["fts"])
+
+    def _create_fts(self, fields):
+        fts = f"{self.table}_fts"
+        names = ", ".join(fields)
+        new_values = ", ".join(f"new.{field}" for field in fields)
+        old_values = ", ".join(f"old.{field}" for field in fields)
+        try:
+            self.connection.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{self.table}', content_rowid='id')"
+            )
+        except sqlite3.OperationalError:
+            # SQLite собран без FTS5: поиск останется за NotesIndex.
+            return
+        self.connection.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS {self.table}_ai AFTER INSERT ON {self.table} BEGIN
+                INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values});
+            END;
+            CREATE TRIGGER IF NOT EXISTS {self.table}_ad AFTER DELETE ON {self.table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values});
+            END;
+            CREATE TRIGGER IF NOT EXISTS {self.table}_au AFTER UPDATE ON {self.table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values});
+            END;
+        """)
+        self.supports_search = True
+
+    def _row_values(self, record):
+        values = [record["id"]] + [record.get(field) for field in self.fields]
+        values += [compute(record) for _, compute in self.derived.values()]
+        return values
+
+    def _upsert_sql(self):
+        names = ["id"] + self.fields + list(self.derived)
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+        return (
+            f"INSERT INTO {self.table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}"
+        )
+
+    def _row_to_record(self, row):
+        record = {"id": row[0]}
+        for field, value in zip(self.fields, row[1:]):
+            convert = self.schema["columns"][field][1]
+            record[field] = convert(value) if convert and value is not None else value
+        return record
+
+    def current_stamp(self):
+        # Счётчик изменений своей таблицы: PRAGMA data_version общий для всей базы
+        # и менялся бы от записи в любое из четырёх хранилищ.
+        row = self.connection.execute("SELECT generation FROM meta WHERE store = ?", (self.table,)).fetchone()
+        return row[0] if row else 0
+
+    def _bump_generation(self):
+        """Увеличивает счётчик изменений таблицы; вызывается в транзакции записи."""
+        self.connection.execute(
+            "INSERT INTO meta (store, data, generation) VALUES (?, '{}', 1) "
+            "ON CONFLICT(store) DO UPDATE SET generation = generation + 1",
+            (self.table,),
+        )
+        return self.current_stamp()
+
+    def changed(self):
+        return self.stamp is None or self.current_stamp() != self.stamp
+
+    def iter_records(self):
+        self.stamp = self.current_stamp()
+        cursor = self.connection.execute(f"SELECT id, {', '.join(self.fields)} FROM {self.table} ORDER BY id")
+        for row in cursor:
+            yield self._row_to_record(row)
+
+    @measured
+    def load(self):
+        return list(self.iter_records())
+
+    @measured
+    def save(self, records):
+        with self._lock, self.connection:
+            self.connection.execute(f"DELETE FROM {self.table}")
+            self.connection.executemany(self._upsert_sql(), (self._row_values(record) for record in records))
+            self.stamp = self._bump_generation()
+
+    @measured
+    def log_change(self, op, record, snapshot, base=None):
+        return self.log_changes([(op, record, base)], snapshot)[0]
+
+    @measured
+    def log_changes(self, changes, snapshot):
+        with self._lock, self.connection:
+            # Сразу берём блокировку на запись, чтобы проверка и изменение
+            # выполнились без вмешательства других процессов.
+            self.connection.execute("BEGIN IMMEDIATE")
+            merged = self.changed()
+            stored = []
+            if merged:
+                # Каждое изменение пишется сразу после слияния, чтобы следующая
+                # новая запись получила свободный id уже с его учётом.
+                self.stamp = None
+                for op, record, base in changes:
+                    record = self._merge(op, record, base)
+                    stored.append(record)
+                    if record is not None:
+                        self._apply(op, [record])
+            else:
+                stored = [record for _, record, _ in changes]
+                for op, group in itertools.groupby(changes, key=lambda change: change[0]):
+                    self._apply(op, [record for _, record, _ in group])
+            stamp = self._bump_generation()
+            if not merged:
+                self.stamp = stamp
+            return stored
+
+    def _apply(self, op, records):
+        if op == "delete":
+            self.connection.executemany(
+                f"DELETE FROM {self.table} WHERE id = ?", [(record["id"],) for record in records]
+            )
+        else:
+            self.connection.executemany(self._upsert_sql(), map(self._row_values, records))
+
+    def _merge(self, op, record, base):
+        record_id = record["id"]
+        row = self.connection.execute(
+            f"SELECT id, {', '.join(self.fields)} FROM {self.table} WHERE id = ?", (record_id,)
+        ).fetchone()
+        records = {record_id: self._row_to_record(row)} if row else {}
+        free_id = self.connection.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {self.table}").fetchone()[0]
+        return merge_change(records, op, record_id, base, None if op == "delete" else record, free_id)
+
+    def flush(self):
+        # Каждая операция уже зафиксирована своей транзакцией.
+        pass
+
+    def load_meta(self):
+        row = self.connection.execute("SELECT data FROM meta WHERE store = ?", (self.table,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save_meta(self, meta):
+        if self.changed():
+            # Остальные служебные данные посчитаны по устаревшему состоянию.
+            meta = {"next_id": max(meta.get("next_id", 1), self.load_meta().get("next_id", 1))}
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO meta (store, data) VALUES (?, ?) ON CONFLICT(store) DO UPDATE SET data = excluded.data",
+                (self.table, json.dumps(meta)),
+            )
+
+    @measured
+    def search(self, query, limit=10):
+        """Полнотекстовый поиск FTS5 с префиксным совпадением слов; пары (id, score)."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        match = " ".join(f'"{token}"*' for token in tokens)
+        rows = self.connection.execute(
+            f"SELECT rowid, bm25({self.table}_fts) FROM {self.table}_fts WHERE {self.table}_fts MATCH ? "
+            f"ORDER BY bm25({self.table}_fts) LIMIT ?",
+            (match, limit),
+        )
+        return [(row[0], -row[1]) for row in rows]
+
+
+def migrate_to_sqlite(directory=".", database=SQLITE_DATABASE):
+    """Переносит notes.json, tasks.json, contacts.json и finance.json (вместе с
+    их .meta.json) в базу SQLite одной транзакцией на каждое хранилище."""
+    for table in SQLITE_TABLES:
+        filename = os.path.join(directory, f"{table}.json")
+        if not os.path.exists(filename):
+            print(f"Файл {filename} не найден, пропускаем.")
+            continue
+        source = JsonStorage(filename)
+        target = SqliteStorage(os.path.join(directory, database), table)
+        records = upgrade_records(table, source.load())
+        target.save(records)
+        meta = source.load_meta()
+        if meta:
+            target.save_meta(meta)
+        print(f"{filename}: перенесено записей: {len(records)}.")
@@ -0,0 +1,662 @@
+"""Хранилища JSON и журнала операций, блокировки между процессами и выбор хранилища."""
+import atexit
+import json
+import os
+import re
+import shutil
+import threading
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: блокировок между процессами нет, остаётся обнаружение изменений.
+    fcntl = None
+
+from .common import FLUSH_DELAY, ChangeConflict
+from .csv_io import import_csv_rows
+from .metrics import METRICS, measured
+
+
+JSON_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+JSON_DELIMITERS = frozenset(" \t\n\r,]")
+
+
+def iter_json_array(file, chunk_size=64 * 1024):
+    """Потоково разбирает JSON-массив объектов: файл читается кусками,
+    и в памяти одновременно держится только текущий кусок и один объект.
+    Элементы должны разделяться ровно одной запятой, как того требует JSON;
+    значение, дошедшее до конца куска (например, число), дочитывается целиком."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+
+    def peek():
+        """Следующий значащий символ с дочитыванием файла; пустая строка в конце файла."""
+        nonlocal buffer, position
+        while True:
+            position = JSON_WHITESPACE_RE.match(buffer, position).end()
+            if position < len(buffer):
+                return buffer[position]
+            more = file.read(chunk_size)
+            if not more:
+                return ""
+            buffer, position = more, 0
+
+    first = peek()
+    if not first:
+        return
+    if first != "[":
+        raise json.JSONDecodeError("ожидается JSON-массив", buffer, position)
+    position += 1
+    if peek() == "]":
+        return
+    while True:
+        if not peek():
+            raise json.JSONDecodeError("массив не закрыт", buffer, position)
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                error = None
+            except json.JSONDecodeError as e:
+                end, error = None, e
+            # Значение считается полным, только если за ним уже виден разделитель:
+            # иначе число вроде 1.5e3 могло бы оборваться на границе куска.
+            if end is not None and end < len(buffer) and buffer[end] in JSON_DELIMITERS:
+                break
+            more = file.read(chunk_size)
+            if not more:
+                if error is not None:
+                    raise error
+                break
+            buffer, position = buffer[position:] + more, 0
+        yield item
+        position = end
+        separator = peek()
+        if separator == "]":
+            return
+        if separator != ",":
+            message = "массив не закрыт" if not separator else "ожидается ',' или ']'"
+            raise json.JSONDecodeError(message, buffer, position)
+        position += 1
+
+
+def atomic_write(filename, write, binary=False):
+    """Вызывает write(file) для временного файла рядом, делает fsync и атомарно
+    подменяет им исходный файл: после сбоя на диске остаётся либо старая, либо
+    новая версия."""
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "wb" if binary else "w") as file:
+        write(file)
+        file.flush()
+        os.fsync(file.fileno())
+        if METRICS.enabled:
+            METRICS.count_written(filename, os.fstat(file.fileno()).st_size)
+    os.replace(temp_filename, filename)
+    try:
+        directory = os.open(os.path.dirname(os.path.abspath(filename)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(directory)
+    except OSError:
+        pass
+    finally:
+        os.close(directory)
+
+
+def atomic_write_json(filename, data, **dump_options):
+    atomic_write(filename, lambda file: json.dump(data, file, **dump_options))
+
+
+class FileLock:
+    """Рекомендательная блокировка fcntl.flock на файле <filename>.lock.
+
+    Исключительная блокировка берётся на время чтения-изменения-записи,
+    разделяемая — на чтение, которое должно видеть согласованный набор файлов."""
+
+    def __init__(self, filename, exclusive=True):
+        self.filename = filename
+        self.exclusive = exclusive
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.filename, "a+")
+        if fcntl:
+            fcntl.flock(self.file, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Закрытие файла снимает блокировку.
+        self.file.close()
+        self.file = None
+
+
+def read_generation(lock_filename):
+    """Счётчик поколений хранилища: его увеличивает каждый процесс после записи."""
+    try:
+        with open(lock_filename, "r") as file:
+            return int(file.read() or 0)
+    except FileNotFoundError:
+        return 0
+    except ValueError:
+        # Файл читается в момент перезаписи другим процессом.
+        return -1
+
+
+def bump_generation(lock_filename):
+    generation = max(read_generation(lock_filename), 0) + 1
+    with open(lock_filename, "w") as file:
+        file.write(str(generation))
+
+
+def merge_change(records, op, record_id, base, record, free_id=None):
+    """Накладывает локальное изменение одной записи на состояние с диска.
+
+    records — словарь записей по id, base — запись в том виде, в каком её видел
+    этот процесс до изменения, record — новая версия (None для удаления).
+    Если другой процесс успел изменить ту же запись, изменение отбрасывается
+    (конфликт); новая запись с занятым id получает следующий свободный id
+    (free_id или больше всех id в records).
+    Возвращает сохранённую версию записи ({"id": ...} для удаления) или None
+    при конфликте."""
+    current = records.get(record_id)
+    if op == "create":
+        if record is None:
+            # Запись создана и удалена до записи на диск.
+            return {"id": record_id}
+        if current is not None and current != record:
+            record_id = free_id if free_id is not None else max(records) + 1
+            record = dict(record, id=record_id)
+    elif base is not None and current != base:
+        return None
+    if record is None:
+        records.pop(record_id, None)
+        return {"id": record_id}
+    records[record_id] = record
+    return record
+
+
+def report_merge(filename, record_id, stored):
+    """Сообщает об итоге слияния, о котором некому вернуть результат (отложенная запись)."""
+    if stored is None:
+        print(f"Конфликт: запись с ID {record_id} в {filename} изменена другим процессом, локальное изменение отменено.")
+    elif stored["id"] != record_id:
+        print(f"Предупреждение: ID {record_id} в {filename} занят другим процессом, запись сохранена с ID {stored['id']}.")
+
+
+class JsonStorage:
+    """Исходный формат: весь список записей в одном JSON-файле.
+
+    Изменения не пишутся на диск сразу: log_change и save_meta только отмечают
+    хранилище «грязным», и через flush_delay секунд все накопившиеся изменения
+    сохраняются одной атомарной записью. flush() сохраняет их немедленно;
+    он же вызывается при выходе из интерпретатора.
+
+    С одним файлом могут работать несколько процессов: запись идёт под
+    блокировкой <filename>.lock, где хранится и счётчик поколений. По счётчику,
+    времени изменения и размеру файлов changed() дёшево определяет, писал ли
+    кто-то другой. Если писал, flush() не перезаписывает файл своим снимком,
+    а накладывает на прочитанное с диска только свои изменения, по одной записи
+    (см. merge_change). log_change проверяет это под блокировкой сразу: если файл
+    уже изменён, слияние выполняется немедленно, и вызывающий получает его итог."""
+
+    def __init__(self, filename, flush_delay=FLUSH_DELAY):
+        self.filename = filename
+        self.meta_filename = os.path.splitext(filename)[0] + ".meta.json"
+        self.lock_filename = filename + ".lock"
+        self.flush_delay = flush_delay
+        self.stamp = None
+        self._lock = threading.RLock()
+        self._pending_snapshot = None
+        self._pending_meta = None
+        self._dirty = {}
+        self._timer = None
+        atexit.register(self.flush)
+
+    def _stamp_files(self):
+        return [self.filename]
+
+    def current_stamp(self):
+        stamp = [read_generation(self.lock_filename)]
+        for name in self._stamp_files():
+            try:
+                stat = os.stat(name)
+            except FileNotFoundError:
+                stamp.append(None)
+            else:
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(stamp)
+
+    def changed(self):
+        """Изменилось ли хранилище на диске после последней загрузки или записи
+        этим процессом."""
+        return self.stamp is None or self.current_stamp() != self.stamp
+
+    @measured
+    def load(self):
+        self.stamp = self.current_stamp()
+        return self._read_records()
+
+    def _read_records(self):
+        try:
+            return list(self._iter_snapshot())
+        except json.JSONDecodeError:
+            self.quarantine()
+            return []
+
+    def quarantine(self):
+        """Переименовывает повреждённый файл, чтобы следующее сохранение не затёрло данные."""
+        backup = f"{self.filename}.corrupt-{datetime.now():%Y%m%d-%H%M%S}"
+        os.replace(self.filename, backup)
+        print(f"Предупреждение: файл {self.filename} повреждён и сохранён как {backup}.")
+
+    def iter_records(self):
+        """Потоково отдаёт записи, не строя весь список в памяти."""
+        self.stamp = self.current_stamp()
+        return self._iter_snapshot()
+
+    def _iter_snapshot(self):
+        try:
+            with open(self.filename, "r") as file:
+                if METRICS.enabled:
+                    METRICS.count_read(self.filename, os.fstat(file.fileno()).st_size)
+                yield from iter_json_array(file)
+        except FileNotFoundError:
+            return
+
+    @measured
+    def save(self, records):
+        """Перезаписывает хранилище целиком, без слияния с чужими изменениями."""
+        with self._lock, FileLock(self.lock_filename):
+            self._pending_snapshot = None
+            self._dirty = {}
+            self._write_snapshot(records)
+            bump_generation(self.lock_filename)
+            self.stamp = self.current_stamp()
+
+    def log_change(self, op, record, snapshot, base=None):
+        """Фиксирует одну операцию (create/edit/delete).
+        snapshot — функция, возвращающая текущий список записей;
+        base — запись до изменения, по ней при слиянии обнаруживаются конфликты.
+        Возвращает сохранённую запись (при слиянии у новой записи может быть
+        другой id) или None, если изменение отменено из-за конфликта."""
+        return self.log_changes([(op, record, base)], snapshot)[0]
+
+    def log_changes(self, changes, snapshot):
+        """Фиксирует пачку операций [(op, record, base), ...] так же, как log_change,
+        и возвращает список их итогов в том же порядке."""
+        with self._lock:
+            for op, record, base in changes:
+                record_id = record["id"]
+                new_record = None if op == "delete" else record
+                if record_id in self._dirty:
+                    # Для слияния важны первая операция и версия до неё.
+                    op, base = self._dirty[record_id][:2]
+                self._dirty[record_id] = (op, base, new_record)
+            self._pending_snapshot = snapshot
+            with FileLock(self.lock_filename):
+                if self.changed():
+                    # Файл уже изменил другой процесс: сливаем сейчас, чтобы вернуть итог.
+                    if self._timer is not None:
+                        self._timer.cancel()
+                        self._timer = None
+                    merged = self._write_pending()
+                    stored = [merged.get(record["id"]) for _, record, _ in changes]
+                    own = {record["id"] for _, record, _ in changes}
+                    for other_id, other in merged.items():
+                        if other_id not in own:
+                            report_merge(self.filename, other_id, other)
+                    return stored
+            self._schedule_flush()
+            return [record for _, record, _ in changes]
+
+    def _schedule_flush(self):
+        if not self.flush_delay:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @measured
+    def flush(self):
+        """Немедленно сохраняет все отложенные изменения."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending_snapshot is None and self._pending_meta is None:
+                return
+            with FileLock(self.lock_filename):
+                for record_id, stored in self._write_pending().items():
+                    report_merge(self.filename, record_id, stored)
+
+    def _write_pending(self):
+        """Записывает отложенные изменения; вызывается под обеими блокировками.
+        Если файл изменил другой процесс, возвращает итоги слияния {id: запись или None}."""
+        snapshot, self._pending_snapshot = self._pending_snapshot, None
+        meta, self._pending_meta = self._pending_meta, None
+        dirty, self._dirty = self._dirty, {}
+        results = {}
+        fresh = not self.changed()
+        if snapshot is not None:
+            if fresh:
+                records = snapshot()
+            else:
+                merged = {record["id"]: record for record in self._read_records()}
+                for record_id, (op, base, record) in dirty.items():
+                    results[record_id] = merge_change(merged, op, record_id, base, record)
+                records = list(merged.values())
+            self._write_snapshot(records)
+        if meta is not None:
+            atomic_write_json(self.meta_filename, meta if fresh else self._merge_meta(meta))
+        bump_generation(self.lock_filename)
+        # После слияния данные в памяти устарели: менеджер перечитает их.
+        self.stamp = self.current_stamp() if fresh else None
+        return results
+
+    def _write_snapshot(self, records):
+        atomic_write_json(self.filename, records, indent=4)
+
+    def _merge_meta(self, meta):
+        # Остальные служебные данные посчитаны по устаревшему состоянию,
+        # поэтому сохраняется только счётчик id.
+        return {"next_id": max(meta.get("next_id", 1), self.load_meta().get("next_id", 1))}
+
+    def load_meta(self):
+        """Служебные данные хранилища (например, счётчик id)."""
+        try:
+            with open(self.meta_filename, "r") as file:
+                if METRICS.enabled:
+                    METRICS.count_read(self.meta_filename, os.fstat(file.fileno()).st_size)
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_meta(self, meta):
+        with self._lock:
+            self._pending_meta = meta
+            self._schedule_flush()
+
+
+class JournalStorage(JsonStorage):
+    """Снимок в исходном JSON-формате плюс журнал операций в JSON Lines.
+
+    Каждая операция дописывается одной строкой в <filename>.journal. При загрузке
+    журнал проигрывается поверх снимка. Когда журнал превышает compact_threshold
+    байт, он замораживается (<filename>.journal.compacting), а новый снимок
+    пишется в фоновом потоке; после этого замороженный журнал удаляется.
+    Операции идемпотентны (create/edit — upsert по id), поэтому повторное
+    проигрывание после сбоя во время сжатия безопасно.
+
+    Строки журнала дописываются под блокировкой; если с момента загрузки журнал
+    дописывал другой процесс, операция сначала проверяется на конфликт с
+    состоянием на диске."""
+
+    def __init__(self, filename, compact_threshold=1024 * 1024):
+        super().__init__(filename)
+        self.journal_filename = filename + ".journal"
+        self.frozen_filename = self.journal_filename + ".compacting"
+        self.compact_threshold = compact_threshold
+        self._compaction = None
+        try:
+            self._journal_size = os.path.getsize(self.journal_filename)
+        except OSError:
+            self._journal_size = 0
+
+    def _stamp_files(self):
+        return [self.filename, self.frozen_filename, self.journal_filename]
+
+    @measured
+    def load(self):
+        self.wait()
+        with FileLock(self.lock_filename, exclusive=False):
+            return super().load()
+
+    def _read_records(self):
+        records = {record["id"]: record for record in super()._read_records()}
+        for journal in (self.frozen_filename, self.journal_filename):
+            try:
+                with open(journal, "r") as file:
+                    if METRICS.enabled:
+                        METRICS.count_read(journal, os.fstat(file.fileno()).st_size)
+                    for line in file:
+                        self._replay(records, line)
+            except FileNotFoundError:
+                continue
+        return list(records.values())
+
+    def iter_records(self):
+        if os.path.exists(self.journal_filename) or os.path.exists(self.frozen_filename):
+            # Журнал нужно проиграть поверх снимка целиком.
+            yield from self.load()
+        else:
+            yield from super().iter_records()
+
+    @staticmethod
+    def _replay(records, line):
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            # Недописанная последняя строка после аварийного завершения.
+            return
+        record = entry["record"]
+        if entry["op"] == "delete":
+            records.pop(record["id"], None)
+        else:
+            records[record["id"]] = record
+
+    @measured
+    def save(self, records):
+        self.wait()
+        with self._lock, FileLock(self.lock_filename):
+            self._write_snapshot(records)
+            for journal in (self.frozen_filename, self.journal_filename):
+                if os.path.exists(journal):
+                    os.remove(journal)
+            self._journal_size = 0
+            bump_generation(self.lock_filename)
+            self.stamp = self.current_stamp()
+
+    @measured
+    def log_changes(self, changes, snapshot):
+        with self._lock, FileLock(self.lock_filename):
+            fresh = not self.changed()
+            if fresh:
+                stored = [record for _, record, _ in changes]
+            else:
+                records = {item["id"]: item for item in self._read_records()}
+                stored = [
+                    merge_change(records, op, record["id"], base, None if op == "delete" else record)
+                    for op, record, base in changes
+                ]
+            lines = "".join(
+                json.dumps({"op": op, "record": record}) + "\n"
+                for (op, _, _), record in zip(changes, stored) if record is not None
+            )
+            if lines:
+                with open(self.journal_filename, "a") as file:
+                    file.write(lines)
+                self._journal_size += len(lines)
+                METRICS.count_written(self.journal_filename, len(lines))
+                bump_generation(self.lock_filename)
+            self.stamp = self.current_stamp() if fresh else None
+        if self._journal_size >= self.compact_threshold:
+            self.compact(snapshot)
+        return stored
+
+    @measured
+    def compact(self, snapshot, background=True):
+        """Сворачивает журнал в снимок. Снимок данных берётся сразу,
+        а запись на диск выполняется в фоне."""
+        if self._compaction and self._compaction.is_alive():
+            return
+        with self._lock, FileLock(self.lock_filename):
+            fresh = not self.changed()
+            records = snapshot() if fresh else self._read_records()
+            if os.path.exists(self.journal_filename):
+                if os.path.exists(self.frozen_filename):
+                    # Предыдущее сжатие не завершилось: дописываем в тот же файл.
+                    with open(self.journal_filename, "r") as src, open(self.frozen_filename, "a") as dst:
+                        shutil.copyfileobj(src, dst)
+                    os.remove(self.journal_filename)
+                else:
+                    os.replace(self.journal_filename, self.frozen_filename)
+            self._journal_size = 0
+            stamp = self.current_stamp()
+            if fresh:
+                # Переименование журнала — наше собственное изменение, а не чужое.
+                self.stamp = stamp
+            frozen = stamp[2]
+        if background:
+            self._compaction = threading.Thread(target=self._finish_compaction, args=(records, frozen))
+            self._compaction.start()
+        else:
+            self._finish_compaction(records, frozen)
+
+    def _finish_compaction(self, records, frozen):
+        with FileLock(self.lock_filename):
+            before = self.current_stamp()
+            if before[2] != frozen:
+                # Замороженный журнал за это время дополнил или уже свернул
+                # другой процесс: его снимок полнее нашего.
+                return
+            self._write_snapshot(records)
+            if os.path.exists(self.frozen_filename):
+                os.remove(self.frozen_filename)
+            bump_generation(self.lock_filename)
+            if self.stamp == before:
+                self.stamp = self.current_stamp()
+
+    def wait(self):
+        if self._compaction:
+            self._compaction.join()
+            self._compaction = None
+
+    def flush(self):
+        self.wait()
+        super().flush()
+
+
+def sqlite_storage(filename):
+    # sqlite3 загружается только для этого типа хранилища.
+    from .sqlite import SqliteStorage
+
+    return SqliteStorage.for_store(filename)
+
+
+def binary_storage(filename):
+    from .binary import BinaryStorage
+
+    return BinaryStorage.for_store(filename)
+
+
+STORAGE_BACKENDS = {
+    "json": JsonStorage,
+    "journal": JournalStorage,
+    "sqlite": sqlite_storage,
+    "binary": binary_storage,
+}
+
+
+def next_free_id(items, meta):
+    """Следующий id: не меньше сохранённого счётчика и больше любого существующего.
+    Так id не переиспользуются даже после удаления последней записи."""
+    return max(meta.get("next_id", 1), max(items, default=0) + 1)
+
+
+def make_storage(filename, backend="json"):
+    try:
+        return STORAGE_BACKENDS[backend](filename)
+    except KeyError:
+        raise ValueError(f"Неизвестный тип хранилища: {backend}")
+
+
+class StoreManager:
+    """Общая часть менеджеров: записи в словаре по id, их загрузка из хранилища,
+    снимок для отложенной записи и перечитывание, если хранилище изменил
+    другой процесс.
+
+    Подкласс задаёт record_class (модель с from_dict/to_dict), items_attribute —
+    имя атрибута со словарём записей, и reload(), который заново строит
+    состояние менеджера из хранилища."""
+
+    record_class = None
+    items_attribute = None
+
+    def _items(self):
+        return getattr(self, self.items_attribute)
+
+    def load_items(self, convert=None):
+        """Словарь записей из хранилища; convert(data) по умолчанию — record_class.from_dict.
+        Повреждённый файл переносится в сторону, и менеджер начинает с пустого набора."""
+        convert = convert or self.record_class.from_dict
+        items = {}
+        try:
+            for data in self.storage.iter_records():
+                item = convert(data)
+                items[item.id] = item
+        except json.JSONDecodeError:
+            self.storage.quarantine()
+            return {}
+        return items
+
+    def snapshot(self):
+        # list() копирует значения за один шаг, поэтому снимок безопасно
+        # снимать из потока отложенной записи, пока основной поток меняет словарь.
+        return [item.to_dict() for item in list(self._items().values())]
+
+    def flush(self):
+        self.storage.flush()
+
+    def reload(self):
+        raise NotImplementedError
+
+    @measured
+    def refresh(self):
+        """Перечитывает хранилище, если после загрузки его изменил другой процесс."""
+        if self.storage.changed():
+            self.storage.flush()
+            self.reload()
+
+    def _log_change(self, op, record, base=None):
+        """Записывает изменение в хранилище и возвращает сохранённую запись: при
+        создании у неё может оказаться другой id. Если изменение конфликтует с
+        изменением другого процесса или запись получила другой id, менеджер
+        перечитывает хранилище; при конфликте бросается ChangeConflict."""
+        stored = self._log_changes([(op, record, base)])[0]
+        if stored is None:
+            raise ChangeConflict(record["id"])
+        return stored
+
+    def _log_changes(self, changes):
+        """Пачка изменений [(op, record, base), ...]; итоги — как у _log_change,
+        но вместо исключения на месте отменённого изменения стоит None."""
+        stored = self.storage.log_changes(changes, self.snapshot)
+        if any(result is None or result["id"] != record["id"] for (_, record, _), result in zip(changes, stored)):
+            self.refresh()
+        return stored
+
+    def meta(self):
+        return {"next_id": self.next_id}
+
+    def _import_csv(self, csv_file, row_to_item, add_item, save_every=None):
+        """Импорт из CSV без потери чужих изменений: менеджер сначала перечитывает
+        хранилище, чтобы id выдавались после записей других процессов, а новые
+        записи фиксируются пачками операций create через слияние. Если другой
+        процесс всё же успел занять те же id, записи получают следующие свободные."""
+        self.refresh()
+        pending = []
+
+        def add(item):
+            add_item(item)
+            pending.append(("create", item.to_dict(), None))
+
+        def save():
+            self._log_changes(pending)
+            pending.clear()
+            self.storage.save_meta(self.meta())
+            self.flush()
+
+        return import_csv_rows(csv_file, row_to_item, lambda: self.next_id, add, save, save_every)
@@ -0,0 +1,402 @@
+"""Задачи: модель, индексы для фильтрации, планировщик и менеджер."""
+import bisect
+import functools
+import heapq
+from datetime import date, datetime
+
+from .common import intern_string, now_timestamp, parse_date, parse_date_or_none
+from .csv_io import export_csv_rows, require_fields
+from .metrics import METRICS, measured
+from .storage import JsonStorage, StoreManager, next_free_id
+
+
+class Task:
+    __slots__ = ("id", "title", "description", "done", "priority", "_due_date", "_due_ordinal", "updated_at")
+    FIELDS = ("id", "title", "description", "done", "priority", "due_date", "updated_at")
+
+    def __init__(self, task_id, title, description, done=False, priority="Средний", due_date=None, updated_at=None,
+                 due_ordinal=None):
+        self.id = task_id
+        self.title = title
+        self.description = description
+        self.done = done
+        self.priority = intern_string(priority)
+        self.due_date = intern_string(due_date or datetime.now().strftime("%d-%m-%Y"))
+        # Уже разобранный срок (например, из двоичного снимка) можно передать в due_ordinal.
+        self._due_ordinal = due_ordinal
+        self.updated_at = intern_string(updated_at)
+
+    @property
+    def due_date(self):
+        return self._due_date
+
+    @due_date.setter
+    def due_date(self, value):
+        self._due_date = value
+        self._due_ordinal = None
+
+    @property
+    def due_ordinal(self):
+        """Номер дня срока (см. parse_date) или None для некорректной даты; разбирается один раз."""
+        if self._due_ordinal is None:
+            self._due_ordinal = parse_date_or_none(self._due_date)
+        return self._due_ordinal
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "done": self.done,
+            "priority": self.priority,
+            "due_date": self.due_date,
+            "updated_at": self.updated_at
+        }
+
+    @staticmethod
+    def from_dict(data):
+        return Task(
+            task_id=data["id"],
+            title=data["title"],
+            description=data["description"],
+            done=data["done"],
+            priority=data["priority"],
+            due_date=data["due_date"],
+            updated_at=data.get("updated_at"),
+            due_ordinal=data.get("due_ordinal")
+        )
+
+
+class TasksIndex:
+    """Вторичные индексы задач: множества id по статусу, корзины по приоритету
+    и отсортированный список (дата, id) по сроку выполнения.
+
+    Для каждой задачи запоминаются ключи, под которыми она проиндексирована,
+    поэтому удалить её из индексов можно и после изменения полей."""
+
+    def __init__(self, tasks=()):
+        self.by_status = {False: set(), True: set()}
+        self.by_priority = {}
+        self.due_dates = []
+        self.keys = {}
+        for task in tasks:
+            self.add(task, bulk=True)
+        self.sort_due_dates()
+
+    @staticmethod
+    def priority_key(priority):
+        return priority.strip().lower()
+
+    def add(self, task, bulk=False):
+        """bulk — пакетное добавление: пара (срок, id) дописывается в конец
+        due_dates, и после пакета нужно вызвать sort_due_dates()."""
+        keys = (bool(task.done), self.priority_key(task.priority), task.due_ordinal)
+        self.keys[task.id] = keys
+        done, priority, due = keys
+        self.by_status[done].add(task.id)
+        self.by_priority.setdefault(priority, set()).add(task.id)
+        if due is not None:
+            if bulk:
+                self.due_dates.append((due, task.id))
+            else:
+                bisect.insort(self.due_dates, (due, task.id))
+
+    def sort_due_dates(self):
+        self.due_dates.sort()
+
+    def remove(self, task_id):
+        keys = self.keys.pop(task_id, None)
+        if keys is None:
+            return
+        done, priority, due = keys
+        self.by_status[done].discard(task_id)
+        bucket = self.by_priority[priority]
+        bucket.discard(task_id)
+        if not bucket:
+            del self.by_priority[priority]
+        if due is not None:
+            del self.due_dates[bisect.bisect_left(self.due_dates, (due, task_id))]
+
+    def update(self, task):
+        self.remove(task.id)
+        self.add(task)
+
+    def due_between(self, start_ordinal=None, end_ordinal=None):
+        """id задач со сроком в диапазоне [start, end] в порядке срока."""
+        start = 0 if start_ordinal is None else bisect.bisect_left(self.due_dates, (start_ordinal,))
+        end = len(self.due_dates) if end_ordinal is None else bisect.bisect_left(self.due_dates, (end_ordinal + 1,))
+        return [task_id for _, task_id in self.due_dates[start:end]]
+
+    def filter(self, status=None, priority=None, due_ordinal=None):
+        """Пересекает множества кандидатов, начиная с самого маленького.
+        Без критериев возвращает None — подходят все задачи."""
+        candidates = []
+        if status is not None:
+            candidates.append(self.by_status[bool(status)])
+        if priority:
+            candidates.append(self.by_priority.get(self.priority_key(priority), set()))
+        if due_ordinal is not None:
+            candidates.append(set(self.due_between(due_ordinal, due_ordinal)))
+        if not candidates:
+            return None
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for ids in candidates[1:]:
+            if not result:
+                break
+            result &= ids
+        METRICS.count_records("TasksIndex.filter", len(candidates[0]), len(result))
+        return sorted(result)
+
+    def ordered_ids(self):
+        """Все id: сначала по сроку выполнения, затем задачи без корректного срока."""
+        dated = [task_id for _, task_id in self.due_dates]
+        undated = sorted(task_id for task_id, keys in self.keys.items() if keys[2] is None)
+        return dated + undated
+
+
+PRIORITY_RANKS = {"высокий": 0, "средний": 1, "низкий": 2}
+NO_DUE_DATE = date.max.toordinal() + 1
+
+
+class TaskScheduler:
+    """Куча открытых задач, упорядоченная по (срок, ранг приоритета, id).
+
+    При изменении задачи куча не перестраивается: в неё кладётся новая запись,
+    а устаревшая остаётся и отбрасывается при ближайшем peek/pop. Актуальная
+    запись каждой задачи хранится в entries; когда устаревших записей становится
+    больше, чем актуальных, куча собирается заново. Последний элемент записи —
+    номер версии, поэтому старая запись не совпадёт с актуальной, даже если
+    ключ задачи вернулся к прежнему значению (A -> B -> A)."""
+
+    def __init__(self, tasks=()):
+        self.entries = {}
+        self.version = 0
+        for task in tasks:
+            if not task.done:
+                self.entries[task.id] = self.key(task) + (0,)
+        self.heap = list(self.entries.values())
+        heapq.heapify(self.heap)
+
+    @staticmethod
+    def key(task):
+        due = task.due_ordinal
+        rank = PRIORITY_RANKS.get(task.priority.strip().lower(), len(PRIORITY_RANKS))
+        return (NO_DUE_DATE if due is None else due, rank, task.id)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _is_current(self, entry):
+        return self.entries.get(entry[2]) == entry
+
+    def update(self, task):
+        """Добавляет задачу, меняет её место в очереди или убирает выполненную."""
+        if task.done:
+            self.remove(task.id)
+            return
+        key = self.key(task)
+        current = self.entries.get(task.id)
+        if current is not None and current[:3] == key:
+            return
+        self.version += 1
+        entry = key + (self.version,)
+        self.entries[task.id] = entry
+        heapq.heappush(self.heap, entry)
+        if len(self.heap) > 2 * len(self.entries) + 16:
+            self.heap = list(self.entries.values())
+            heapq.heapify(self.heap)
+
+    def remove(self, task_id):
+        self.entries.pop(task_id, None)
+
+    def _prune(self):
+        while self.heap and not self._is_current(self.heap[0]):
+            heapq.heappop(self.heap)
+
+    def peek(self):
+        """id самой срочной задачи или None."""
+        self._prune()
+        return self.heap[0][2] if self.heap else None
+
+    def pop(self):
+        """Убирает самую срочную задачу из очереди и возвращает её id."""
+        self._prune()
+        if not self.heap:
+            return None
+        task_id = heapq.heappop(self.heap)[2]
+        del self.entries[task_id]
+        return task_id
+
+    def top(self, count):
+        """id count самых срочных задач без сортировки всей кучи: обход кучи
+        вспомогательной кучей по индексам узлов, O(count · log count)."""
+        result = []
+        frontier = [(self.heap[0], 0)] if self.heap else []
+        while frontier and len(result) < count:
+            entry, position = heapq.heappop(frontier)
+            if self._is_current(entry):
+                result.append(entry[2])
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(self.heap):
+                    heapq.heappush(frontier, (self.heap[child], child))
+        return result
+
+
+class TasksManager(StoreManager):
+    record_class = Task
+    items_attribute = "tasks"
+
+    def __init__(self, filename="tasks.json", storage=None):
+        self.filename = filename
+        self.storage = storage or JsonStorage(filename)
+        self.reload()
+
+    def reload(self):
+        self.tasks = self.load_tasks()
+        self.next_id = next_free_id(self.tasks, self.storage.load_meta())
+        self.index = TasksIndex(self.tasks.values())
+        self.scheduler = TaskScheduler(self.tasks.values())
+
+    @measured
+    def load_tasks(self):
+        return self.load_items()
+
+    def _add_task(self, task, bulk=False):
+        self.tasks[task.id] = task
+        self.index.add(task, bulk)
+        self.scheduler.update(task)
+        self.next_id = max(self.next_id, task.id + 1)
+
+    @measured
+    def save_tasks(self):
+        self.storage.save(self.snapshot())
+
+    @measured
+    def create_task(self, title, description, priority, due_date):
+        task_id = self.next_id
+        task = Task(task_id, title, description, priority=priority, due_date=due_date, updated_at=now_timestamp())
+        self._add_task(task)
+        stored = self._log_change("create", task.to_dict())
+        task = self.tasks[stored["id"]]
+        print(f"Задача с ID {task.id} создана.")
+        return task
+
+    def list_tasks(self):
+        """Все задачи в порядке срока выполнения."""
+        return (self.tasks[task_id] for task_id in self.index.ordered_ids())
+
+    @measured
+    def mark_task_done(self, task_id):
+        task = self.find_task_by_id(task_id)
+        if task:
+            base = task.to_dict()
+            task.done = True
+            task.updated_at = now_timestamp()
+            self.index.update(task)
+            self.scheduler.update(task)
+            self._log_change("edit", task.to_dict(), base)
+            print(f"Задача с ID {task_id} отмечена как выполненная.")
+            return task
+        else:
+            print(f"Задача с ID {task_id} не найдена.")
+
+    @measured
+    def edit_task(self, task_id, title=None, description=None, priority=None, due_date=None):
+        task = self.find_task_by_id(task_id)
+        if task:
+            base = task.to_dict()
+            if title:
+                task.title = title
+            if description:
+                task.description = description
+            if priority:
+                task.priority = intern_string(priority)
+            if due_date:
+                task.due_date = intern_string(due_date)
+            task.updated_at = now_timestamp()
+            self.index.update(task)
+            self.scheduler.update(task)
+            self._log_change("edit", task.to_dict(), base)
+            print(f"Задача с ID {task_id} обновлена.")
+            return task
+        else:
+            print(f"Задача с ID {task_id} не найдена.")
+
+    @measured
+    def delete_task(self, task_id):
+        task = self.find_task_by_id(task_id)
+        if task:
+            del self.tasks[task_id]
+            self.index.remove(task_id)
+            self.scheduler.remove(task_id)
+            self.storage.save_meta({"next_id": self.next_id})
+            self._log_change("delete", {"id": task_id}, task.to_dict())
+            print(f"Задача с ID {task_id} удалена.")
+            return task
+        else:
+            print(f"Задача с ID {task_id} не найдена.")
+
+    @staticmethod
+    def task_from_row(task_id, row):
+        title, description, priority, due_date = require_fields(row, "title", "description", "priority", "due_date")
+        return Task(task_id, title, description, priority=priority, due_date=due_date, updated_at=now_timestamp())
+
+    @measured
+    def import_from_csv(self, csv_file, save_every=None):
+        add_task = functools.partial(self._add_task, bulk=True)
+        try:
+            return self._import_csv(csv_file, self.task_from_row, add_task, save_every)
+        finally:
+            self.index.sort_due_dates()
+
+    @measured
+    def export_to_csv(self, csv_file, columns=None, since=None, compression=None, open_only=False):
+        """Экспорт в CSV; open_only — только невыполненные задачи."""
+        tasks = self._open_tasks(self.tasks) if open_only else self.tasks.values()
+        count = export_csv_rows(csv_file, tasks, Task.FIELDS, columns, since, compression)
+        print(f"Задачи экспортированы в файл {csv_file} ({count}).")
+        return count
+
+    @measured
+    def filter_tasks(self, status=None, priority=None, due_date=None):
+        """Фильтрация задач. Некорректная дата — InvalidDateError."""
+        due_ordinal = parse_date(due_date) if due_date else None
+        task_ids = self.index.filter(status, priority, due_ordinal)
+        if task_ids is None:
+            METRICS.count_records("TasksManager.filter_tasks", len(self.tasks), len(self.tasks))
+            return self.tasks.values()
+        return [self.tasks[task_id] for task_id in task_ids]
+
+    def _open_tasks(self, task_ids):
+        open_ids = self.index.by_status[False]
+        tasks = [self.tasks[task_id] for task_id in task_ids if task_id in open_ids]
+        METRICS.count_records("TasksManager._open_tasks", len(task_ids), len(tasks))
+        return tasks
+
+    @measured
+    def tasks_due_between(self, start_date, end_date):
+        task_ids = self.index.due_between(parse_date(start_date), parse_date(end_date))
+        return [self.tasks[task_id] for task_id in task_ids]
+
+    @measured
+    def overdue_tasks(self):
+        today = date.today().toordinal()
+        return self._open_tasks(self.index.due_between(end_ordinal=today - 1))
+
+    @measured
+    def tasks_due_soon(self, days):
+        today = date.today().toordinal()
+        return self._open_tasks(self.index.due_between(today, today + days))
+
+    def next_due_task(self):
+        """Самая срочная невыполненная задача или None."""
+        task_id = self.scheduler.peek()
+        return None if task_id is None else self.tasks[task_id]
+
+    @measured
+    def most_urgent_tasks(self, count=5):
+        return [self.tasks[task_id] for task_id in self.scheduler.top(count)]
+
+    def find_task_by_id(self, task_id):
+        return self.tasks.get(task_id)
@@ -0,0 +1,49 @@
+import json
+
+from personal_assistant.binary import FLAG_HAS_NUL, BinarySnapshot, BinaryStorage, binary_to_json, json_to_binary
+from personal_assistant.tasks import TasksManager
+
+
+def write_json(path, records):
+    path.write_text(json.dumps(records, ensure_ascii=False))
+    return str(path)
+
+
+def test_round_trip_keeps_nulls_and_strings_with_nul(tmp_path):
+    records = [
+        {"id": 1, "title": "a\x00b", "content": "", "timestamp": None, "updated_at": None},
+        {"id": 2, "title": "заметка", "content": "x\x00", "timestamp": "01-01-2024", "updated_at": None},
+    ]
+    filename = write_json(tmp_path / "notes.json", records)
+    assert json_to_binary(filename) == 2
+    with BinarySnapshot(BinaryStorage.for_store(filename).filename) as snapshot:
+        assert snapshot.columns["title"][1] & FLAG_HAS_NUL
+        assert list(snapshot.nulls("timestamp")) == [1, 0]
+    (tmp_path / "notes.json").unlink()
+    assert binary_to_json(filename) == 2
+    assert json.loads((tmp_path / "notes.json").read_text()) == records
+
+
+def test_round_trip_of_empty_store(tmp_path):
+    filename = write_json(tmp_path / "finance.json", [])
+    assert json_to_binary(filename) == 0
+    assert binary_to_json(filename) == 0
+    assert json.loads((tmp_path / "finance.json").read_text()) == []
+
+
+def test_tasks_get_stored_due_ordinals(tmp_path):
+    records = [
+        {"id": 1, "title": "t", "description": "", "done": False, "priority": "Высокий",
+         "due_date": "02-01-2024", "updated_at": None},
+        {"id": 2, "title": "u", "description": "", "done": True, "priority": "Низкий",
+         "due_date": "не дата", "updated_at": None},
+    ]
+    filename = write_json(tmp_path / "tasks.json", records)
+    json_to_binary(filename)
+    storage = BinaryStorage.for_store(filename)
+    # Слиянию нужны записи без вычисляемых столбцов, менеджеру — с ними.
+    assert storage.load() == records
+    manager = TasksManager(filename, storage=storage)
+    assert manager.tasks[1]._due_ordinal == 738887
+    assert manager.tasks[2].due_ordinal is None
+    assert [task.id for task in manager.filter_tasks(due_date="02-01-2024")] == [1]
@@ -0,0 +1,36 @@
+import pytest
+
+from personal_assistant import calculator
+from personal_assistant.calculator import Calculator, evaluate_chunk, evaluate_expression
+
+
+def test_complex_result_is_rejected():
+    result = evaluate_expression("(-8)**0.5")
+    assert result.value is None
+    assert result.error == "not_real"
+
+
+def test_real_power_of_negative_base_is_allowed():
+    assert evaluate_expression("(-8)**2").value == 64
+
+
+def test_vectorized_chunk_matches_scalar_results():
+    pytest.importorskip("numpy")
+    expressions = [f"{2 ** 60 + i}+0" for i in range(40)] + [f"{i}//2" for i in range(40)]
+    expressions += [f"{i}.5/2+{i}" for i in range(40)] + [f"{i}/0.5" for i in range(40)]
+    expressions += [f"-{i % 2}*1.5" for i in range(40)] + [f"-{i % 2}.0*1.5" for i in range(40)]
+    for vectorized, scalar in zip(evaluate_chunk(expressions, vectorize=True), map(evaluate_expression, expressions)):
+        assert vectorized == scalar
+        # repr различает 0.0 и -0.0.
+        assert repr(vectorized.value) == repr(scalar.value)
+
+
+def test_small_file_is_calculated_without_process_pool(tmp_path, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("пул процессов не нужен для маленького файла")
+
+    monkeypatch.setattr(calculator, "ProcessPoolExecutor", no_pool)
+    path = tmp_path / "expressions.txt"
+    path.write_text("1+2\n\n7/2\n")
+    results = list(Calculator().calculate_file(str(path), workers=4, vectorize=True))
+    assert [result.value for result in results] == [3, 3.5]
@@ -0,0 +1,45 @@
+from personal_assistant.contacts import ContactsManager
+
+
+def make_manager(tmp_path):
+    manager = ContactsManager(str(tmp_path / "contacts.json"))
+    manager.add_contact("Анна Петрова", "+7 (900) 123-45-67", "anna@example.com")
+    manager.add_contact("Room 12", "+7 (900) 765-43-21", "room@example.com")
+    manager.add_contact("Иван", "8 912 000 11 22", "ivan12@example.com")
+    return manager
+
+
+def search(manager, query):
+    return [contact.id for contact in manager.find_contacts(query)]
+
+
+def test_query_with_letters_does_not_match_phones(tmp_path):
+    manager = make_manager(tmp_path)
+    # В телефонах есть «12», но запрос с буквами ищется только по имени и почте.
+    assert search(manager, "room 12") == [2]
+    assert search(manager, "n12") == [3]
+
+
+def test_phone_query_ignores_formatting(tmp_path):
+    manager = make_manager(tmp_path)
+    assert search(manager, "123-45") == [1]
+    assert search(manager, "(900)") == [1, 2]
+    assert search(manager, "12") == [2, 1, 3]
+
+
+def test_short_queries_and_ranking(tmp_path):
+    manager = make_manager(tmp_path)
+    assert search(manager, "ан") == [1, 3]
+    assert search(manager, "иван") == [3]
+    assert search(manager, "") == []
+
+
+def test_index_follows_changes_before_and_after_first_search(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.edit_contact(1, name="Мария")
+    manager.delete_contact(2)
+    assert search(manager, "мари") == [1]
+    manager.add_contact("Марина", "+7 000", "m@example.com")
+    manager.edit_contact(1, name="Ольга")
+    assert search(manager, "мари") == [4]
+    assert search(manager, "room") == []
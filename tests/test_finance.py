@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from personal_assistant.binary import BinaryStorage, json_to_binary
+from personal_assistant.finance import FinanceManager
+from personal_assistant.sqlite import SqliteStorage, migrate_to_sqlite
+
+LEGACY_RECORDS = [
+    {"id": 1, "amount": 0.1, "category": "еда", "date": "01-01-2024", "description": ""},
+    {"id": 2, "amount": -19.99, "category": "транспорт", "date": "02-01-2024", "description": ""},
+]
+
+
+def write_legacy_store(directory):
+    filename = directory / "finance.json"
+    filename.write_text(json.dumps(LEGACY_RECORDS))
+    return str(filename)
+
+
+def test_migrate_to_sqlite_converts_legacy_amounts(tmp_path):
+    filename = write_legacy_store(tmp_path)
+    migrate_to_sqlite(str(tmp_path))
+    manager = FinanceManager(filename, storage=SqliteStorage.for_store(filename))
+    assert [record.amount_minor for record in manager.records.values()] == [10, -1999]
+    assert manager.calculate_balance() == -1989
+
+
+def test_json_to_binary_converts_legacy_amounts(tmp_path):
+    filename = write_legacy_store(tmp_path)
+    assert json_to_binary(filename) == 2
+    manager = FinanceManager(filename, storage=BinaryStorage.for_store(filename))
+    assert [record.amount_minor for record in manager.records.values()] == [10, -1999]
+
+
+def test_report_total_follows_changes(tmp_path):
+    manager = FinanceManager(str(tmp_path / "finance.json"))
+    manager.add_record("100.50", "еда", "01-01-2024", "")
+    manager.add_record("-20", "еда", "05-01-2024", "")
+    manager.add_record("7", "еда", "10-02-2024", "")
+    report = manager.generate_report("01-01-2024", "31-01-2024")
+    assert [record.id for record in report.records] == [1, 2] and report.total == 8050
+    manager.edit_record(2, amount="-30")
+    manager.delete_record(1)
+    report = manager.generate_report("01-01-2024", "31-12-2024")
+    assert [record.id for record in report.records] == [2, 3] and report.total == -2300
+
+
+def test_invalid_record_raises_and_changes_nothing(tmp_path):
+    manager = FinanceManager(str(tmp_path / "finance.json"))
+    with pytest.raises(ValueError):
+        manager.add_record("1.001", "еда", "01-01-2024", "")
+    record = manager.add_record("5", "еда", "01-01-2024", "")
+    with pytest.raises(ValueError):
+        manager.edit_record(record.id, amount="10", date="32-01-2024")
+    assert not manager.records_between(0, 10 ** 6)[1:] and record.amount_minor == 500
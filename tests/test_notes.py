@@ -0,0 +1,53 @@
+from personal_assistant.notes import Note, NotesIndex
+
+
+def make_notes():
+    return {
+        1: Note(1, "Покупки", "молоко хлеб сыр"),
+        2: Note(2, "Работа", "отчёт по проекту, созвон"),
+        3: Note(3, "Проект", "план проекта и отчёт"),
+    }
+
+
+def test_built_and_loaded_index_agree(tmp_path):
+    filename = str(tmp_path / "notes.index.json")
+    notes = make_notes()
+    built = NotesIndex(filename)
+    built.load(notes)
+    assert built.terms == sorted(built.postings)
+    built.save()
+
+    loaded = NotesIndex(filename)
+    loaded.load(notes)
+    assert loaded.terms == built.terms
+    assert not loaded.dirty
+    assert loaded.search("отчёт") == built.search("отчёт")
+    assert [doc_id for doc_id, _ in loaded.search("прое")] == [3, 2]
+
+
+def test_incremental_changes_keep_terms_sorted(tmp_path):
+    index = NotesIndex(str(tmp_path / "notes.index.json"))
+    notes = make_notes()
+    index.load(notes)
+    index.add(Note(4, "Ягоды", "абрикос"))
+    index.remove(1)
+    index.update(Note(2, "Работа", "встреча"))
+    assert index.terms == sorted(index.postings)
+    assert "молоко" not in index.terms and "абрикос" in index.terms
+    assert [doc_id for doc_id, _ in index.search("встре")] == [2]
+
+
+def test_load_resyncs_changed_notes(tmp_path):
+    filename = str(tmp_path / "notes.index.json")
+    notes = make_notes()
+    index = NotesIndex(filename)
+    index.load(notes)
+    index.save()
+
+    notes[1] = Note(1, "Покупки", "яблоки")
+    del notes[3]
+    index = NotesIndex(filename)
+    index.load(notes)
+    assert index.terms == sorted(index.postings)
+    assert index.search("молоко") == [] and index.search("план") == []
+    assert [doc_id for doc_id, _ in index.search("яблоки")] == [1]
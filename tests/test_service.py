@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+from personal_assistant.service import AssistantService, encode_response
+
+
+def test_unserializable_result_becomes_error():
+    response = json.loads(encode_response({"id": 7, "result": complex(1, 2)}))
+    assert response["id"] == 7
+    assert "error" in response and "result" not in response
+    assert "error" in json.loads(encode_response({"id": 8, "result": float("nan")}))
+
+
+def test_connection_survives_unserializable_result(tmp_path):
+    async def scenario():
+        service = AssistantService()
+        service.calculate = lambda expression: asyncio.sleep(0, complex(expression) if "j" in expression else int(expression))
+        server = await asyncio.start_unix_server(service.handle_connection, str(tmp_path / "service.sock"))
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(str(tmp_path / "service.sock"))
+            for request_id, expression in enumerate(["1+2j", "3"]):
+                writer.write(json.dumps({"id": request_id, "method": "calculate", "params": [expression]}).encode() + b"\n")
+            first, second = json.loads(await reader.readline()), json.loads(await reader.readline())
+            writer.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first["id"] == 0 and "error" in first
+    assert second == {"id": 1, "result": 3}
+
+
+def test_manager_validation_and_import_results(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "import.csv").write_text(
+        "amount,category,date,description\n10.5,еда,01-01-2024,\nabc,еда,01-01-2024,\n", encoding="utf-8"
+    )
+
+    async def scenario():
+        service = AssistantService()
+        invalid = await service.handle_request(json.dumps(
+            {"id": 1, "method": "add_record", "params": {"amount": "1", "category": "еда", "date": "2024-01-01"}}
+        ))
+        imported = await service.handle_request(json.dumps(
+            {"id": 2, "method": "import_csv", "params": ["finance", "import.csv"]}
+        ))
+        records = await service.list_records()
+        await service.flush()
+        return invalid, imported, records
+
+    invalid, imported, records = asyncio.run(scenario())
+    assert "ДД-ММ-ГГГГ" in invalid["error"]
+    assert imported["result"]["imported"] == 1 and [line for line, _ in imported["result"]["errors"]] == [3]
+    assert [record["amount_minor"] for record in records] == [1050]
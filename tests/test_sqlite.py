@@ -0,0 +1,34 @@
+from personal_assistant.sqlite import SqliteStorage
+
+
+def test_change_detection_is_per_table(tmp_path):
+    database = str(tmp_path / "assistant.db")
+    tasks, other_tasks = SqliteStorage(database, "tasks"), SqliteStorage(database, "tasks")
+    notes = SqliteStorage(database, "notes")
+    for storage in (tasks, notes, other_tasks):
+        storage.load()
+    note = {"id": 1, "title": "t", "content": "c", "timestamp": None, "updated_at": None}
+    notes.log_change("create", note, lambda: [note])
+    assert not tasks.changed() and not notes.changed()
+    task = {"id": 1, "title": "t", "description": "", "done": False, "priority": "Средний",
+            "due_date": None, "updated_at": None}
+    other_tasks.log_change("create", task, lambda: [task])
+    assert tasks.changed() and not other_tasks.changed() and not notes.changed()
+    tasks.load()
+    assert not tasks.changed()
+
+
+def test_indexes_are_created_and_user_indexes_kept(tmp_path):
+    database = str(tmp_path / "assistant.db")
+    tasks = SqliteStorage(database, "tasks")
+    tasks.connection.execute("CREATE INDEX my_title ON tasks (title)")
+    task = {"id": 1, "title": "t", "description": "", "done": False, "priority": "Средний",
+            "due_date": "02-01-2024", "updated_at": None}
+    tasks.log_change("create", task, lambda: [task])
+    SqliteStorage(database, "tasks")
+    SqliteStorage(database, "finance")
+    SqliteStorage(database, "contacts")
+    indexes = {row[0] for row in tasks.connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"my_title", "tasks_done", "tasks_priority", "tasks_due_ordinal", "finance_date_ordinal",
+            "finance_category", "contacts_name", "contacts_phone"} <= indexes
+    assert tasks.connection.execute("SELECT due_ordinal FROM tasks").fetchone()[0] == 738887
@@ -0,0 +1,156 @@
+import io
+import json
+import os
+
+import pytest
+
+from personal_assistant.common import ChangeConflict
+from personal_assistant.storage import (
+    STORAGE_BACKENDS,
+    JournalStorage,
+    iter_json_array,
+    make_storage,
+    merge_change,
+)
+from personal_assistant.tasks import TasksManager
+
+
+def test_merge_change_applies_edit_over_unchanged_record():
+    records = {1: {"id": 1, "title": "a"}}
+    stored = merge_change(records, "edit", 1, {"id": 1, "title": "a"}, {"id": 1, "title": "b"})
+    assert stored == {"id": 1, "title": "b"} and records[1] == stored
+
+
+def test_merge_change_rejects_edit_of_changed_record():
+    records = {1: {"id": 1, "title": "other"}}
+    assert merge_change(records, "edit", 1, {"id": 1, "title": "a"}, {"id": 1, "title": "b"}) is None
+    assert merge_change(records, "delete", 1, {"id": 1, "title": "a"}, None) is None
+    assert records == {1: {"id": 1, "title": "other"}}
+
+
+def test_merge_change_renumbers_create_with_taken_id():
+    records = {1: {"id": 1, "title": "other"}}
+    assert merge_change(records, "create", 1, None, {"id": 1, "title": "mine"}) == {"id": 2, "title": "mine"}
+    assert merge_change(records, "create", 1, None, {"id": 1, "title": "again"}, free_id=7)["id"] == 7
+    assert records[1]["title"] == "other"
+
+
+def test_merge_change_delete_returns_id():
+    records = {1: {"id": 1}}
+    assert merge_change(records, "delete", 1, {"id": 1}, None) == {"id": 1}
+    assert merge_change(records, "create", 2, None, None) == {"id": 2}
+    assert records == {}
+
+
+@pytest.mark.parametrize("backend", sorted(STORAGE_BACKENDS))
+def test_two_managers_sharing_one_store(tmp_path, backend):
+    filename = str(tmp_path / "tasks.json")
+    first = TasksManager(filename, storage=make_storage(filename, backend))
+    second = TasksManager(filename, storage=make_storage(filename, backend))
+
+    assert first.create_task("первая", "", "Средний", None).id == 1
+    first.flush()
+    # second загружен до записи first и тоже считает свободным ID 1.
+    created = second.create_task("вторая", "", "Средний", None)
+    assert created.id == 2 and created.title == "вторая"
+    assert sorted(second.tasks) == [1, 2]
+    second.flush()
+
+    first.edit_task(1, title="правка first")
+    first.flush()
+    with pytest.raises(ChangeConflict):
+        second.edit_task(1, title="правка second")
+    assert second.find_task_by_id(1).title == "правка first"
+    second.flush()
+
+    check = TasksManager(filename, storage=make_storage(filename, backend))
+    assert {task.id: task.title for task in check.list_tasks()} == {1: "правка first", 2: "вторая"}
+
+
+@pytest.mark.parametrize("backend", sorted(STORAGE_BACKENDS))
+def test_csv_import_keeps_changes_of_other_manager(tmp_path, backend):
+    filename = str(tmp_path / "tasks.json")
+    first = TasksManager(filename, storage=make_storage(filename, backend))
+    second = TasksManager(filename, storage=make_storage(filename, backend))
+    second.create_task("из second", "", "Средний", None)
+    second.flush()
+
+    csv_file = tmp_path / "import.csv"
+    csv_file.write_text("title,description,priority,due_date\nиз csv,,Низкий,\n")
+    first.import_from_csv(str(csv_file))
+
+    check = TasksManager(filename, storage=make_storage(filename, backend))
+    assert {task.id: task.title for task in check.list_tasks()} == {1: "из second", 2: "из csv"}
+
+
+def test_journal_compaction_keeps_storage_fresh(tmp_path):
+    filename = str(tmp_path / "tasks.json")
+    storage = JournalStorage(filename, compact_threshold=1)
+    manager = TasksManager(filename, storage=storage)
+    manager.create_task("первая", "", "Средний", None)
+    storage.wait()
+    # Своё сжатие не считается чужим изменением: дописывание в журнал остаётся O(1).
+    assert not storage.changed()
+    manager.create_task("вторая", "", "Средний", None)
+    storage.wait()
+    assert storage.stamp is not None and not storage.changed()
+    check = TasksManager(filename, storage=JournalStorage(filename))
+    assert sorted(task.title for task in check.list_tasks()) == ["вторая", "первая"]
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 8))
+def test_iter_json_array_at_any_chunk_size(chunk_size):
+    text = ' [ {"id": 1, "t": "a,]b"}, 12345 ,-1.5e3,\n[1, [2]], null, true, "x"] '
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == json.loads(text)
+    assert list(iter_json_array(io.StringIO(" [ ] "), chunk_size)) == []
+    assert list(iter_json_array(io.StringIO(""), chunk_size)) == []
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 8))
+@pytest.mark.parametrize("text", ["[1,,2]", "[1 2]", "[1,]", "[,1]", "[1,2", "[", "{}", "[12 34]"])
+def test_iter_json_array_rejects_malformed_arrays(chunk_size, text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO(text), chunk_size))
+
+
+def make_task(task_id, title):
+    return {"id": task_id, "title": title, "description": "", "done": False, "priority": "Средний",
+            "due_date": "01-01-2024", "updated_at": None}
+
+
+def test_journal_replays_changes_over_snapshot(tmp_path):
+    filename = str(tmp_path / "tasks.json")
+    storage = JournalStorage(filename)
+    storage.save([make_task(1, "a"), make_task(2, "b")])
+    storage.log_change("edit", make_task(1, "a2"), lambda: [], make_task(1, "a"))
+    storage.log_change("delete", {"id": 2}, lambda: [], make_task(2, "b"))
+    storage.log_change("create", make_task(3, "c"), lambda: [])
+    assert JournalStorage(filename).load() == [make_task(1, "a2"), make_task(3, "c")]
+
+
+def test_journal_ignores_truncated_last_line(tmp_path):
+    filename = str(tmp_path / "tasks.json")
+    storage = JournalStorage(filename)
+    storage.log_change("create", make_task(1, "a"), lambda: [])
+    with open(storage.journal_filename, "a") as file:
+        file.write(json.dumps({"op": "create", "record": make_task(2, "b")})[:40])
+    assert JournalStorage(filename).load() == [make_task(1, "a")]
+
+
+def test_journal_recovers_interrupted_compaction(tmp_path):
+    filename = str(tmp_path / "tasks.json")
+    storage = JournalStorage(filename)
+    storage.save([make_task(1, "a")])
+    storage.log_change("create", make_task(2, "b"), lambda: [])
+    # Сжатие прервалось после переименования журнала, до записи снимка.
+    os.replace(storage.journal_filename, storage.frozen_filename)
+    storage = JournalStorage(filename)
+    storage.load()
+    storage.log_change("create", make_task(3, "c"), lambda: [])
+    assert JournalStorage(filename).load() == [make_task(1, "a"), make_task(2, "b"), make_task(3, "c")]
+
+    # Следующее сжатие дописывает новый журнал к недосжатому и завершает работу.
+    storage.compact(lambda: [make_task(1, "a"), make_task(2, "b"), make_task(3, "c")], background=False)
+    assert not os.path.exists(storage.frozen_filename) and not os.path.exists(storage.journal_filename)
+    with open(filename) as file:
+        assert json.load(file) == [make_task(1, "a"), make_task(2, "b"), make_task(3, "c")]
@@ -0,0 +1,34 @@
+from personal_assistant.tasks import Task, TaskScheduler
+
+
+def make_task(task_id, due_date, priority="Средний"):
+    return Task(task_id, f"Задача {task_id}", "", priority=priority, due_date=due_date)
+
+
+def test_scheduler_orders_by_due_date_and_priority():
+    scheduler = TaskScheduler([
+        make_task(1, "10-01-2024"), make_task(2, "05-01-2024", "Низкий"), make_task(3, "05-01-2024", "Высокий"),
+    ])
+    assert scheduler.top(3) == [3, 2, 1]
+    assert scheduler.pop() == 3
+    assert scheduler.peek() == 2
+
+
+def test_scheduler_top_skips_entry_of_key_changed_back():
+    task = make_task(1, "01-01-2024")
+    scheduler = TaskScheduler([task, make_task(2, "02-01-2024")])
+    task.due_date = "03-01-2024"
+    scheduler.update(task)
+    task.due_date = "01-01-2024"
+    scheduler.update(task)
+    assert len(scheduler) == 2
+    assert scheduler.top(3) == [1, 2]
+    assert [scheduler.pop(), scheduler.pop(), scheduler.pop()] == [1, 2, None]
+
+
+def test_scheduler_drops_done_tasks():
+    task = make_task(1, "01-01-2024")
+    scheduler = TaskScheduler([task, make_task(2, "02-01-2024")])
+    task.done = True
+    scheduler.update(task)
+    assert scheduler.top(5) == [2]